@@ -0,0 +1,230 @@
+# ad_model_selection/local_selector.py
+"""
+LLM-free model selection from our own run history. Every finished run with a
+valid AUROC is stored with its training set's meta-features (DatasetProfile);
+a new dataset is matched against the nearest previously seen datasets of the
+same package, and their results rank the candidate models.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from ad_model_selection.prompts.pygod_ms_prompt import PYGOD_MODEL_OPTIONS
+from ad_model_selection.prompts.pyod_ms_prompt import PYOD_MODEL_OPTIONS
+from ad_model_selection.prompts.timeseries_ms_prompt import TIMESERIES_MODEL_OPTIONS
+from config.config import Config
+
+# Bump when meta_vector() changes; rows stored under another version are ignored
+META_VERSION = 1
+
+# Local picks stay within the models the selection prompts offer
+CANDIDATES = {"pyod": PYOD_MODEL_OPTIONS, "pygod": PYGOD_MODEL_OPTIONS, "darts": TIMESERIES_MODEL_OPTIONS}
+
+# Weight of the AUROC 0.5 prior each model's score is shrunk towards
+_PRIOR_WEIGHT = 0.5
+
+
+def meta_vector(profile) -> dict:
+    """Named, roughly scale-free meta-features of a DatasetProfile computed from the arrays."""
+    rows, columns = max(profile.rows, 1), max(profile.columns, 1)
+    summary = profile.summary()
+    landmarkers = profile.landmarkers
+
+    def value(v, default=0.0):
+        return default if v is None else float(v)
+
+    kurtosis = value(summary["mean_kurtosis"])
+    return {
+        "log_rows": math.log10(rows),
+        "log_columns": math.log10(columns),
+        "contamination": value(profile.contamination),
+        "nan_fraction": profile.nan_count / (rows * columns),
+        "constant_fraction": profile.constant_columns / columns,
+        "log_abs_skewness": math.log1p(value(summary["mean_abs_skewness"])),
+        "log_kurtosis": math.copysign(math.log1p(abs(kurtosis)), kurtosis),
+        "heavy_tailed_fraction": value(summary["heavy_tailed_fraction"]),
+        "pca_top1_variance": value(landmarkers.get("pca_top1_variance")),
+        "pca_components_90": value(landmarkers.get("pca_components_90"), columns) / columns,
+        "mean_abs_correlation": value(landmarkers.get("mean_abs_correlation")),
+        "log_distance_contrast": math.log1p(value(landmarkers.get("distance_contrast"))),
+        "knn_auc": value(landmarkers.get("knn_auc"), 0.5),
+        "log_avg_degree": math.log1p(profile.num_edges / max(profile.num_nodes, 1)) if profile.num_nodes else 0.0,
+    }
+
+
+class RunHistory:
+    """
+    Past runs (package, dataset, meta-features, algorithm, AUROC/AUPRC) in SQLite.
+    One shared connection behind a lock; past max_runs the oldest rows are dropped.
+    """
+
+    def __init__(self, path: str, max_runs: int = 10000):
+        self.path = path
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                package TEXT NOT NULL,
+                dataset TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                features TEXT NOT NULL,
+                algorithm TEXT NOT NULL,
+                auroc REAL NOT NULL,
+                auprc REAL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_package ON runs(package, version)")
+        self._conn.commit()
+
+    def record(self, package: str, dataset: str, features: dict, algorithm: str, auroc: float,
+               auprc: Optional[float] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs (package, dataset, version, features, algorithm, auroc, auprc, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (package, dataset, META_VERSION, json.dumps(features), algorithm, float(auroc),
+                 None if auprc is None else float(auprc), time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM runs WHERE id <= (SELECT MAX(id) FROM runs) - ?", (self.max_runs,)
+            )
+            self._conn.commit()
+
+    def datasets(self, package: str) -> dict:
+        """{dataset: (latest meta-features, {algorithm: best AUROC})} for one package."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT dataset, features, algorithm, auroc FROM runs WHERE package = ? AND version = ? ORDER BY id",
+                (package, META_VERSION),
+            ).fetchall()
+        result = {}
+        for dataset, features, algorithm, auroc in rows:
+            _, scores = result.get(dataset, (None, {}))
+            scores[algorithm] = max(auroc, scores.get(algorithm, auroc))
+            result[dataset] = (json.loads(features), scores)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM runs")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            runs, datasets = self._conn.execute("SELECT COUNT(*), COUNT(DISTINCT dataset) FROM runs").fetchone()
+        return {"runs": runs, "datasets": datasets}
+
+
+@dataclass
+class Selection:
+    algorithm: str
+    confidence: float
+    ranking: list = field(default_factory=list)      # [(algorithm, score)], best first
+    neighbors: list = field(default_factory=list)    # [(dataset, distance)], nearest first
+    seconds: float = 0.0
+
+
+class LocalSelector:
+    """
+    k-nearest-neighbour ranker over RunHistory. Meta-features are z-scored
+    against the package's history; each candidate's score is the
+    similarity-weighted AUROC it reached on the neighbouring datasets.
+
+    confidence = agreement * support, where agreement is the weight share of
+    neighbours whose best model is the pick and reached AUROC 0.5 + min_margin
+    there, and support saturates once the pick was run on min_support neighbours.
+    A pick whose shrunk score does not beat the 0.5 prior by min_margin gets
+    confidence 0, so models that merely keep being re-run are never locked in.
+    Callers use the pick when confidence reaches min_confidence and ask the LLM otherwise.
+    """
+
+    def __init__(self, history: RunHistory, k: int = 5, min_support: int = 3, min_confidence: float = 0.6,
+                 min_margin: float = 0.1):
+        self.history = history
+        self.k = k
+        self.min_support = min_support
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+
+    def rank(self, package: str, profile) -> Optional[Selection]:
+        """Best candidate for the profiled dataset with its confidence, or None without usable history."""
+        start = time.perf_counter()
+        candidates = CANDIDATES.get(package)
+        if not candidates or profile.source != "arrays":
+            return None
+        seen = {name: (features, {a: s for a, s in scores.items() if a in candidates})
+                for name, (features, scores) in self.history.datasets(package).items()}
+        seen = {name: entry for name, entry in seen.items() if entry[1]}
+        if not seen:
+            return None
+
+        query = meta_vector(profile)
+        keys = sorted(query)
+        names = list(seen)
+        M = np.array([[seen[name][0].get(key, 0.0) for key in keys] for name in names])
+        q = np.array([query[key] for key in keys])
+        mu, sd = M.mean(axis=0), M.std(axis=0)
+        sd[sd == 0] = 1.0
+        distance = np.sqrt(np.mean(((M - mu) / sd - (q - mu) / sd) ** 2, axis=1))
+        nearest = np.argsort(distance, kind="stable")[:self.k]
+        weights = {names[i]: math.exp(-distance[i]) for i in nearest}
+
+        totals, support = {}, {}
+        for name, w in weights.items():
+            for algorithm, auroc in seen[name][1].items():
+                s, n = totals.get(algorithm, (0.0, 0.0))
+                totals[algorithm] = (s + w * auroc, n + w)
+                support[algorithm] = support.get(algorithm, 0) + 1
+        ranking = sorted(((a, (s + _PRIOR_WEIGHT * 0.5) / (n + _PRIOR_WEIGHT)) for a, (s, n) in totals.items()),
+                         key=lambda item: -item[1])
+        best, best_score = ranking[0]
+        good = 0.5 + self.min_margin
+
+        agreeing = sum(w for name, w in weights.items()
+                       if max(seen[name][1], key=seen[name][1].get) == best and seen[name][1][best] >= good)
+        confidence = agreeing / sum(weights.values()) * min(1.0, support[best] / self.min_support) \
+            if best_score >= good else 0.0
+        return Selection(best, confidence, ranking, [(names[i], float(distance[i])) for i in nearest],
+                         time.perf_counter() - start)
+
+    def record(self, package: str, dataset: str, profile, algorithm: str, auroc: float,
+               auprc: Optional[float] = None) -> None:
+        if profile.source == "arrays":
+            self.history.record(package, dataset, meta_vector(profile), algorithm, auroc, auprc)
+
+
+_selector = None
+_selector_lock = threading.Lock()
+
+
+def get_local_selector() -> LocalSelector:
+    """Process-wide LocalSelector configured from Config (created on first use)."""
+    global _selector
+    with _selector_lock:
+        if _selector is None:
+            _selector = LocalSelector(
+                RunHistory(Config.MODEL_HISTORY_PATH),
+                k=Config.LOCAL_SELECTOR_K,
+                min_support=Config.LOCAL_SELECTOR_MIN_SUPPORT,
+                min_confidence=Config.LOCAL_SELECTOR_MIN_CONFIDENCE,
+                min_margin=Config.LOCAL_SELECTOR_MIN_MARGIN,
+            )
+        return _selector
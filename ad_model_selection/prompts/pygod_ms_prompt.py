@@ -1,4 +1,26 @@
-def generate_model_selection_prompt_from_pygod(name, num_node, num_edge, num_feature, avg_degree):
+# Models offered in the selection prompt below: name -> title shown to the LLM
+PYGOD_MODEL_DESCRIPTIONS = {
+    "AdONE": "Adversarial Outlier Aware Attributed Network Embedding",
+    "ANOMALOUS": "A Joint Modeling Approach for Anomaly Detection on Attributed Networks",
+    "AnomalyDAE": "Dual Autoencoder for Anomaly Detection on Attributed Networks",
+    "CONAD": "Contrastive Attributed Network Anomaly Detection",
+    "DONE": "Deep Outlier Aware Attributed Network Embedding",
+    "GAAN": "Generative Adversarial Attributed Network Anomaly Detection",
+    "GUIDE": "Higher-order Structure based Anomaly Detection on Attributed Networks",
+    "Radar": "Residual Analysis for Anomaly Detection in Attributed Networks",
+    "SCAN": "Structural Clustering Algorithm for Networks",
+}
+PYGOD_MODEL_OPTIONS = list(PYGOD_MODEL_DESCRIPTIONS)
+
+
+def generate_model_selection_prompt_from_pygod(name, num_node, num_edge, num_feature, avg_degree,
+                                               meta_features=None):
+
+    # Optional DatasetProfile.meta_features(), listed with the dataset information
+    meta_lines = "".join(f"- {key}: {value}\n" for key, value in (meta_features or {}).items())
+    options = "\n".join(f"- {title} ({model})" for model, title in PYGOD_MODEL_DESCRIPTIONS.items())
+    option_names = ", ".join(f'"{model}"' for model in PYGOD_MODEL_OPTIONS[:-1]) \
+        + f', and "{PYGOD_MODEL_OPTIONS[-1]}."'
 
     user_message = f"""
 You are an expert in model selection for anomaly detection on graph data.
@@ -12,20 +34,12 @@ You are an expert in model selection for anomaly detection on graph data.
 - Number of Edges: {num_edge}
 - Number of Features: {num_feature}
 - Average Degree: {avg_degree}
-
+{meta_lines}
 ## Model Options:
-- Adversarial Outlier Aware Attributed Network Embedding (AdONE)
-- A Joint Modeling Approach for Anomaly Detection on Attributed Networks (ANOMALOUS)
-- Dual Autoencoder for Anomaly Detection on Attributed Networks (AnomalyDAE)
-- Contrastive Attributed Network Anomaly Detection (CONAD)
-- Deep Outlier Aware Attributed Network Embedding (DONE)
-- Generative Adversarial Attributed Network Anomaly Detection (GAAN)
-- Higher-order Structure based Anomaly Detection on Attributed Networks (GUIDE)
-- Residual Analysis for Anomaly Detection in Attributed Networks (Radar)
-- Structural Clustering Algorithm for Networks (SCAN)
+{options}
 
 ## Rules:
-1. Availabel options include "AdONE", "ANOMALOUS", "AnomalyDAE", "CONAD", "DONE", "GAAN", "GUIDE", "Radar", and "SCAN."
+1. Availabel options include {option_names}
 2. Treat all models equally and evaluate them based on their compatibility with the dataset characteristics and the anomaly detection task.
 3. Response Format:
     - Provide responses in a strict **JSON** format with the keys "reason" and "choice."
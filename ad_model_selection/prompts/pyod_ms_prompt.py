@@ -1,4 +1,26 @@
-def generate_model_selection_prompt_from_pyod(name, size, dim):
+# Models offered in the selection prompt below: name -> title shown to the LLM
+PYOD_MODEL_DESCRIPTIONS = {
+    "ALAD": "Adversarially Learned Anomaly Detection",
+    "AnoGAN": "Anomaly Detection with Generative Adversarial Networks",
+    "AE": "AutoEncoder",
+    "AE1SVM": "Autoencoder-based One-class Support Vector Machine",
+    "DeepSVDD": "Deep One-Class Classification",
+    "DevNet": "Deep Anomaly Detection with Deviation Networks",
+    "LUNAR": "Unifying Local Outlier Detection Methods via Graph Neural Networks",
+    "MO-GAAL": "Multiple-Objective Generative Adversarial Active Learning",
+    "SO-GAAL": "Single-Objective Generative Adversarial Active Learning",
+    "VAE": "Variational AutoEncoder",
+}
+PYOD_MODEL_OPTIONS = list(PYOD_MODEL_DESCRIPTIONS)
+
+
+def generate_model_selection_prompt_from_pyod(name, size, dim, meta_features=None):
+
+    # Optional DatasetProfile.meta_features(), listed with the dataset information
+    meta_lines = "".join(f"- {key}: {value}\n" for key, value in (meta_features or {}).items())
+    options = "\n".join(f"- {title} ({model})" for model, title in PYOD_MODEL_DESCRIPTIONS.items())
+    option_names = ", ".join(f'"{model}"' for model in PYOD_MODEL_OPTIONS[:-1]) \
+        + f', and "{PYOD_MODEL_OPTIONS[-1]}."'
 
     user_message = f"""
 You are an expert in model selection for anomaly detection on multivariate data.
@@ -13,21 +35,12 @@ You are an expert in model selection for anomaly detection on multivariate data.
 - Dataset Name: {name}
 - Dataset Size: {size}
 - Data Dimension: {dim}
-
+{meta_lines}
 ## Model Options:
-- Adversarially Learned Anomaly Detection (ALAD)
-- Anomaly Detection with Generative Adversarial Networks (AnoGAN)
-- AutoEncoder (AE)
-- Autoencoder-based One-class Support Vector Machine (AE1SVM)
-- Deep One-Class Classification (DeepSVDD)
-- Deep Anomaly Detection with Deviation Networks (DevNet)
-- Unifying Local Outlier Detection Methods via Graph Neural Networks (LUNAR)
-- Multiple-Objective Generative Adversarial Active Learning (MO-GAAL)
-- Single-Objective Generative Adversarial Active Learning (SO-GAAL)
-- Variational AutoEncoder (VAE)
+{options}
 
 ## Rules:
-1. Availabel options include "ALAD", "AnoGAN", "AE", "AE1SVM", "DeepSVDD", "DevNet", "LUNAR", "MO-GAAL", "SO-GAAL", and "VAE."
+1. Availabel options include {option_names}
 2. Treat all models equally and evaluate them based on their compatibility with the dataset characteristics and the anomaly detection task.
 3. Response Format:
     - Provide responses in a strict **JSON** format with the keys "reason" and "choice."
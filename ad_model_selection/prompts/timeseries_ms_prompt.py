@@ -1,4 +1,26 @@
-def generate_model_selection_prompt_from_timeseries(name, size, dim, type):
+# Models offered in the selection prompt below: name -> title shown to the LLM
+TIMESERIES_MODEL_DESCRIPTIONS = {
+    "Autoformer": "Decomposition Transformers with Auto-Correlation for Long-Term Series Forecasting",
+    "DLinear": "Are Transformers Effective for Time Series Forecasting?",
+    "ETSformer": "Exponential Smoothing Transformers for Time-series Forecasting",
+    "FEDformer": "Frequency Enhanced Decomposed Transformer for Long-term Series Forecasting",
+    "Informer": "Beyond Efficient Transformer for Long Sequence Time-Series Forecasting",
+    "LightTS": "Less Is More: Fast Multivariate Time Series Forecasting with Light Sampling-oriented MLP Structures",
+    "Pyraformer": "Low-complexity Pyramidal Attention for Long-range Time Series Modeling and Forecasting",
+    "Reformer": "The Efficient Transformer",
+    "TimesNet": "Temporal 2D-Variation Modeling for General Time Series Analysis",
+    "Transformer": "Attention is All You Need",
+}
+TIMESERIES_MODEL_OPTIONS = list(TIMESERIES_MODEL_DESCRIPTIONS)
+
+
+def generate_model_selection_prompt_from_timeseries(name, size, dim, type, meta_features=None):
+
+    # Optional DatasetProfile.meta_features(), listed with the dataset information
+    meta_lines = "".join(f"- {key}: {value}\n" for key, value in (meta_features or {}).items())
+    options = "\n".join(f"- {title} ({model})" for model, title in TIMESERIES_MODEL_DESCRIPTIONS.items())
+    option_names = ", ".join(f'"{model}"' for model in TIMESERIES_MODEL_OPTIONS[:-1]) \
+        + f', and "{TIMESERIES_MODEL_OPTIONS[-1]}."'
 
     user_message = f"""
 You are an expert in model selection for anomaly detection on time series data.
@@ -11,20 +33,12 @@ You are an expert in model selection for anomaly detection on time series data.
 - Dataset Size: {size}
 - Data Dimension: {dim}
 - Data Type: {type}
-
+{meta_lines}
 ## Model Options:
-- Decomposition Transformers with Auto-Correlation for Long-Term Series Forecasting (Autoformer)
-- Are Transformers Effective for Time Series Forecasting? (DLinear)
-- Exponential Smoothing Transformers for Time-series Forecasting (ETSformer)
-- Frequency Enhanced Decomposed Transformer for Long-term Series Forecasting (FEDformer)
-- Beyond Efficient Transformer for Long Sequence Time-Series Forecasting (Informer)
-- Low-complexity Pyramidal Attention for Long-range Time Series Modeling and Forecasting (Pyraformer)
-- The Efficient Transformer (Reformer)
-- Temporal 2D-Variation Modeling for General Time Series Analysis (TimesNet)
-- Attention is All You Need (Transformer)
+{options}
 
 ## Rules:
-1. Availabel options include "Autoformer", "DLinear", "ETSformer", "FEDformer", "Informer", "LightTS", "Pyraformer", "Reformer", "TimesNet", and "Transformer."
+1. Availabel options include {option_names}
 2. Treat all models equally and evaluate them based on their compatibility with the dataset characteristics and the anomaly detection task.
 3. Response Format:
     - Provide responses in a strict **JSON** format with the keys "reason" and "choice."
@@ -4,12 +4,9 @@ import re
 import sys
 import ast
 import subprocess
-import importlib
-import inspect
 from datetime import datetime, timedelta
 from typing import Optional
 
-import google.generativeai as genai
 from langchain_core.prompts import PromptTemplate
 from pygments import highlight
 from pygments.lexers import PythonLexer
@@ -17,10 +14,9 @@ from pygments.formatters import TerminalFormatter
 
 from entity.code_quality import CodeQuality
 from config.config import Config
-from utils.gemini_client import query_gemini_with_retry  # retry-aware Gemini call
-
-# Configure Gemini client
-genai.configure(api_key=Config.GEMINI_API_KEY)
+from utils.gemini_client import query_gemini_with_retry, query_gemini_stream  # retry-aware Gemini call
+from utils.prompt_budget import prompt_budget
+from utils.param_schema import param_registry
 
 # ---- Helpers --------------------------------------------------------------
 
@@ -93,6 +89,88 @@ def extract_python_code(response_text: str) -> str:
     return cleaned_code
 
 
+class StreamingCodeExtractor:
+    """
+    Incrementally extracts the Python block from a streamed Gemini response
+    and checks it while it is still being written, so clearly malformed
+    generations can be aborted before the model finishes.
+    """
+
+    # SyntaxErrors that only mean "not finished yet"
+    _INCOMPLETE = ("unterminated", "was never closed", "unexpected eof", "expected an indented block")
+
+    def __init__(self, prose_limit: int = 400):
+        self.buffer = ""
+        self.prose_limit = prose_limit
+        self._emitted_lines = 0
+
+    def feed(self, chunk: str) -> None:
+        self.buffer += chunk
+
+    @property
+    def opened(self) -> bool:
+        return re.search(r"```(?:python)?[^\n]*\n", self.buffer, re.IGNORECASE) is not None
+
+    @property
+    def closed(self) -> bool:
+        return re.search(r"```(?:python)?[^\n]*\n.*?```", self.buffer, re.DOTALL | re.IGNORECASE) is not None
+
+    @property
+    def code(self) -> str:
+        """Code seen so far: inside the fence if there is one, else the raw text."""
+        m = re.search(r"```(?:python)?[^\n]*\n(.*?)(?:```|$)", self.buffer, re.DOTALL | re.IGNORECASE)
+        return m.group(1) if m else self.buffer
+
+    def new_lines(self) -> list:
+        """Complete code lines not yet reported (for partial-output logging)."""
+        lines = self.code.split("\n")
+        complete = lines if self.closed else lines[:-1]
+        fresh = complete[self._emitted_lines:]
+        self._emitted_lines = len(complete)
+        return fresh
+
+    def check(self, final: bool = False):
+        """
+        Return a reason string if the output is already clearly unusable, else None.
+        final=True means the stream has ended, so the whole code must compile.
+        """
+        if not self.opened:
+            # Unfenced output is accepted only if it starts like Python
+            head = self.buffer.lstrip()
+            if head.startswith("`") and not final:
+                return None
+            if not head.startswith(("import ", "from ", "#", "def ", "class ", "\"\"\"")):
+                if final or len(head) > self.prose_limit:
+                    return "response does not start with a Python code block"
+                return None
+
+        code = self.code
+        if self.closed or final:
+            try:
+                compile(code, "<generated>", "exec")
+            except SyntaxError as e:
+                return f"syntax error at line {e.lineno}: {e.msg}"
+            return None
+
+        # Still streaming: compile the prefix that ends before the last top-level statement
+        lines = code.split("\n")[:-1]
+        cut = None
+        for i in range(len(lines) - 1, 0, -1):
+            line = lines[i]
+            if line and not line[0].isspace() and not line.startswith((")", "]", "}", "#", "else", "elif", "except", "finally")):
+                cut = i
+                break
+        if not cut:
+            return None
+        prefix = "\n".join(lines[:cut])
+        try:
+            compile(prefix, "<generated>", "exec")
+        except SyntaxError as e:
+            if not any(token in str(e.msg).lower() for token in self._INCOMPLETE):
+                return f"syntax error at line {e.lineno}: {e.msg}"
+        return None
+
+
 # ---- Prompt templates -----------------------------------------------------
 
 # PyOD
@@ -114,7 +192,7 @@ Requirements:
 - All code must be compatible with the environment above.
 - Import sys, os and add sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 - from data_loader.data_loader import DataLoader
-- Instantiate DataLoader for train/test, call load_data(split_data=False) to obtain X_train, y_train, X_test, y_test
+- Instantiate DataLoader for train/test, call load_data(split_data=False) to obtain X_train, y_train, X_test, y_test{loader_hint}
 - Initialize `model = {algorithm}(<only use parameters from {parameters} that match the class signature>)`
 - Fit model on X_train
 - Compute train/test scores and compute AUROC/AUPRC and print them
@@ -136,7 +214,7 @@ Environment:
 
 Requirements:
 - All code must be compatible with the environment above.
-- Load dataset using DataLoader, assign X_train
+- Load dataset using DataLoader, assign X_train{loader_hint}
 - Initialize `{algorithm}` and fit on X_train
 - Compute scores on X_train and print placeholders AUROC/AUPRC (if labels absent)
 - Output runnable Python only.
@@ -158,7 +236,7 @@ Environment:
 - pygod
 
 Requirements:
-- Use DataLoader to load train/test datasets
+- Use DataLoader to load train/test datasets{loader_hint}
 - Initialize `{algorithm}` with matching parameters
 - Fit model, compute train/test scores, print AUROC/AUPRC
 - Output only executable Python code
@@ -173,7 +251,7 @@ Doc excerpt:
 {algorithm_doc}
 
 Requirements:
-- Use DataLoader to load train data
+- Use DataLoader to load train data{loader_hint}
 - Initialize `{algorithm}`, fit on X_train
 - Compute scores and print placeholders AUROC/AUPRC
 """)
@@ -189,7 +267,7 @@ Doc excerpt:
 {algorithm_doc}
 
 Requirements:
-- Use DataLoader to load datasets
+- Use DataLoader to load datasets{loader_hint}
 - Initialize `{algorithm}` with matching parameters
 - Fit model and compute predictions
 - Print results
@@ -206,7 +284,7 @@ Doc excerpt:
 {algorithm_doc}
 
 Requirements:
-- Load datasets with DataLoader
+- Load datasets with DataLoader{loader_hint}
 - Initialize `{algorithm}` with parameters
 - Fit model on train, predict on test
 - Compute metrics (AUROC/AUPRC if labels present)
@@ -222,7 +300,7 @@ Doc excerpt:
 {algorithm_doc}
 
 Requirements:
-- Load dataset with DataLoader
+- Load dataset with DataLoader{loader_hint}
 - Fit `{algorithm}` on train only
 - Compute scores, print placeholders AUROC/AUPRC
 """)
@@ -287,63 +365,28 @@ class AgentCodeGenerator:
         data_path_test: Optional[str],
         algorithm_doc: str,
         input_parameters: dict,
-        package_name: str
+        package_name: str,
+        stream: bool = False,
+        log_fn=None,
+        dtype_policy: Optional[str] = None
     ) -> str:
-        """Generate runnable Python code for the specified algorithm and dataset(s)."""
-
-        # ---- Step 0: Dynamic parameter filtering ----
-        def filter_valid_params(pkg: str, alg: str, params: dict) -> dict:
-            filtered = {}
-            try:
-                if pkg == "pyod":
-                    mod = importlib.import_module(f"pyod.models.{alg.lower()}")
-                    cls = getattr(mod, alg)
-                    sig = inspect.signature(cls.__init__)
-                    filtered = {k: v for k, v in (params or {}).items() if k in sig.parameters}
-                elif pkg == "darts":
-                    mod = importlib.import_module(f"darts.models.forecasting.{alg.lower()}")
-                    cls = getattr(mod, alg)
-                    sig = inspect.signature(cls.__init__)
-                    filtered = {k: v for k, v in (params or {}).items() if k in sig.parameters}
-                else:
-                    filtered = params or {}
-            except Exception as e:
-                print(f"[Warning] Could not filter params for {alg}: {e}")
-                filtered = params or {}
-            return filtered
+        """
+        Generate runnable Python code for the specified algorithm and dataset(s).
+        With stream=True the response is validated while it arrives and partial
+        code lines are forwarded to log_fn.
+        """
 
-        filtered_params = filter_valid_params(package_name, algorithm, input_parameters)
+        # ---- Step 0: Keep only arguments the constructor accepts ----
+        schema = param_registry.get(algorithm, package_name)
+        filtered_params = schema.filter(input_parameters) if schema else (input_parameters or {})
 
         # ---- Step 0.5: Inject n_features for DeepSVDD ----
         if package_name == "pyod" and algorithm.lower() == "deepsvdd" and 'n_features' not in filtered_params:
             try:
-                # Attempt to use project's DataLoader if available
+                # Header-only probe: the feature count is all DeepSVDD needs
                 from data_loader.data_loader import DataLoader
-                dl = DataLoader(data_path_train)
-                df_train = dl.load_data(split_data=False)
-                # if load_data returns a tuple (X, y, ...) or np.ndarray, handle safely
-                if hasattr(df_train, "columns"):
-                    df_tmp = df_train
-                elif isinstance(df_train, tuple):
-                    # sometimes load_data returns (X, y) arrays; convert to shape
-                    # can't deduce column names from numpy arrays, so infer n_features directly
-                    if hasattr(df_train[0], "shape"):
-                        n_features = df_train[0].shape[1]
-                        filtered_params['n_features'] = n_features
-                        print(f"[INFO] Injected n_features={n_features} for DeepSVDD (from tuple load_data)")
-                else:
-                    # if it's a pandas-like object convertible to DataFrame
-                    try:
-                        import pandas as pd
-                        df_tmp = pd.DataFrame(df_train)
-                    except Exception:
-                        df_tmp = None
-
-                if 'n_features' not in filtered_params and df_tmp is not None:
-                    for c in ['Time', 'Class']:
-                        if c in df_tmp.columns:
-                            df_tmp = df_tmp.drop(columns=c)
-                    n_features = df_tmp.shape[1]
+                n_features = DataLoader(data_path_train, store_script=False).probe()["columns"]
+                if n_features:
                     filtered_params['n_features'] = n_features
                     print(f"[INFO] Injected n_features={n_features} for DeepSVDD")
             except Exception as e:
@@ -364,8 +407,9 @@ class AgentCodeGenerator:
             "algorithm": algorithm,
             "data_path_train": data_path_train,
             "data_path_test": data_path_test or "",
-            "algorithm_doc": algorithm_doc or "",
-            "parameters": filtered_params
+            "algorithm_doc": prompt_budget.doc_for(algorithm_doc, "code_generator", algorithm),
+            "parameters": filtered_params,
+            "loader_hint": self.loader_hint(dtype_policy),
         }
         prompt = tpl.format(**prompt_vars)
 
@@ -374,7 +418,10 @@ class AgentCodeGenerator:
         print(prompt[:2000] + ("..." if len(prompt) > 2000 else ""))
 
         # ---- Step 4: Query Gemini ----
-        raw_text = query_gemini_with_retry(prompt)
+        if stream:
+            raw_text = self._generate_streaming(prompt, log_fn)
+        else:
+            raw_text = query_gemini_with_retry(prompt, stage="code_generator")
 
         # ---- Step 5: Debug raw output ----
         print("\n[DEBUG] GEMINI RAW TEXT (codegen):\n")
@@ -389,6 +436,54 @@ class AgentCodeGenerator:
 
         return final_code
 
+    @staticmethod
+    def loader_hint(dtype_policy: Optional[str]) -> str:
+        """Suffix for the template's DataLoader line so the script loads with the selector's dtype policy."""
+        if not dtype_policy or dtype_policy == "keep":
+            return ""
+        return f" (construct every DataLoader with dtype_policy='{dtype_policy}')"
+
+    MAX_STREAM_ATTEMPTS = 2
+
+    def _generate_streaming(self, prompt: str, log_fn=None) -> str:
+        """
+        Stream the codegen response, aborting and re-prompting as soon as the
+        output is clearly malformed. Falls back to a plain call if every
+        streamed attempt is aborted.
+        """
+        attempt_prompt = prompt
+        for attempt in range(1, self.MAX_STREAM_ATTEMPTS + 1):
+            extractor = StreamingCodeExtractor()
+            problem = None
+            stream = query_gemini_stream(attempt_prompt, stage="code_generator", use_cache=(attempt == 1))
+            try:
+                for chunk in stream:
+                    extractor.feed(chunk)
+                    if log_fn:
+                        for line in extractor.new_lines():
+                            log_fn(f"[CodeGen] | {line}")
+                    problem = extractor.check()
+                    if problem:
+                        break
+            finally:
+                stream.close()
+
+            if not problem:
+                problem = extractor.check(final=True)
+            if not problem:
+                return extractor.buffer.strip()
+
+            print(f"[CodeGen] Aborted streamed attempt {attempt}: {problem}")
+            if log_fn:
+                log_fn(f"[CodeGen] Aborted malformed generation ({problem}), re-prompting…")
+            attempt_prompt = (
+                prompt
+                + f"\n\nA previous answer was rejected ({problem}). "
+                  "Return one complete, syntactically valid Python script inside a single ```python block."
+            )
+
+        return query_gemini_with_retry(prompt, stage="code_generator")
+
     def revise_code(self, code_quality: CodeQuality, algorithm_doc: str) -> str:
         """
         Request Gemini to fix a failing script using CoT-style prompt and retry logic.
@@ -406,6 +501,7 @@ class AgentCodeGenerator:
         # Prepare the CoT-based fix prompt using the template_fix PromptTemplate
         # We'll attempt multiple times if Gemini returns code that still errors.
         MAX_FIX_ATTEMPTS = 3
+        doc_excerpt = prompt_budget.doc_for(algorithm_doc, "code_generator", alg_name)
         last_cleaned = code_quality.code or ""
         last_raw = ""
         for attempt in range(1, MAX_FIX_ATTEMPTS + 1):
@@ -413,14 +509,14 @@ class AgentCodeGenerator:
             prompt = template_fix.format(
                 code=last_cleaned,
                 error_message=code_quality.error_message or "",
-                algorithm_doc=algorithm_doc or ""
+                algorithm_doc=doc_excerpt
             )
 
             print("\n[DEBUG] Sending fix prompt to Gemini (truncated 2k chars):\n")
             print(prompt[:2000] + ("..." if len(prompt) > 2000 else ""))
 
             try:
-                raw_fix = query_gemini_with_retry(prompt)
+                raw_fix = query_gemini_with_retry(prompt, stage="code_generator", use_cache=False)
                 last_raw = raw_fix
                 print("\n[DEBUG] GEMINI RAW TEXT (fix):\n")
                 print_python_code(raw_fix)
@@ -466,6 +562,13 @@ class AgentCodeGenerator:
         code = re.sub(r"```(?:python)?", "", code, flags=re.IGNORECASE)
         return re.sub(r"```", "", code).strip()
 
+    def init_params(self, algorithm: str, package_name: str, algorithm_doc: str) -> dict:
+        """Constructor defaults from the parameter schema, falling back to the doc's params dict."""
+        schema = param_registry.get(algorithm, package_name)
+        if schema:
+            return schema.defaults()
+        return self._extract_init_params_dict(algorithm_doc)
+
     @staticmethod
     def _extract_init_params_dict(response_text: str) -> dict:
         match = re.search(r"```python\s*({.*?})\s*```", response_text, re.DOTALL)
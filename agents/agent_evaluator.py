@@ -81,7 +81,7 @@ TASK:
 2. Keep variable names and logic unchanged.
 3. Output only executable Python code (no markdown or explanation).
 """
-                raw_fix = query_gemini_quota_safe(prompt)
+                raw_fix = query_gemini_quota_safe(prompt, stage="evaluator", use_cache=False)
                 cleaned_code = self._clean_markdown(raw_fix)
 
         # If all retries fail, return last error
@@ -1,15 +1,12 @@
 from langchain_core.prompts import PromptTemplate
-from datetime import datetime, timedelta
-import json
-from filelock import FileLock
-import google.generativeai as genai
 from utils.gemini_client import query_gemini  # Assuming you already wrote this
+from utils.doc_index import doc_index
+from utils.doc_store import get_doc_store
 import time
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from config.config import Config
-genai.configure(api_key=Config.GEMINI_API_KEY)
 
 
 web_search_prompt_pyod = PromptTemplate.from_template("""
@@ -107,36 +104,26 @@ python -u run.py \
 class AgentInfoMiner:
     def __init__(self):
         pass
-    def query_docs(self, algorithm, vectorstore, package_name, cache_path="cache.json"):
-        """Search for relevant documentation using Gemini, with vectorstore fallback and caching."""
-
-        lock_path = cache_path + ".lock"
-        lock = FileLock(lock_path)
-
-    # Ensure cache file exists
-        if not os.path.exists(cache_path):
-            with open(cache_path, "w", encoding="utf-8") as f:
-                json.dump({}, f)
-
-    # Step 1: Try cache first
-        with lock:
-            with open(cache_path, "r", encoding="utf-8") as f:
-                try:
-                    cache = json.load(f)
-                except json.JSONDecodeError:
-                    print("[Cache Error] cache.json corrupted, resetting...")
-                    cache = {}
-
-            if algorithm in cache:
-                try:
-                    cached_time = datetime.fromisoformat(cache[algorithm]["query_datetime"])
-                    if datetime.now() - cached_time < timedelta(days=7):
-                        print(f"[Cache Hit] Using cached docs for {algorithm}")
-                        return cache[algorithm]["document"]
-                    else:
-                        print(f"[Cache Expired] Re-querying {algorithm}")
-                except Exception:
-                    print(f"[Cache Warning] Datetime parse error for {algorithm}, re-querying.")
+    def query_docs(self, algorithm, vectorstore, package_name, cache_path=None):
+        """Search for relevant documentation: offline doc index first, then cache, Gemini and vectorstore."""
+
+    # Step 0: Offline index parsed from docs/*_models_page.txt (no LLM call)
+        if Config.DOC_INDEX_ENABLED and package_name != "tslib":
+            try:
+                indexed_doc = doc_index.get_doc(algorithm, package_name)
+            except Exception as e:
+                print(f"[DocIndex Error] {e}")
+                indexed_doc = None
+            if indexed_doc:
+                print(f"[DocIndex Hit] Using offline docs for {algorithm}")
+                return indexed_doc
+
+    # Step 1: Try the doc store (per-key reads, no lock shared with other runs)
+        store = get_doc_store(cache_path)
+        cached_doc = store.get(algorithm, package_name)
+        if cached_doc is not None:
+            print(f"[Cache Hit] Using cached docs for {algorithm}")
+            return cached_doc
 
     # Step 2: Build prompt
         match package_name:
@@ -157,7 +144,7 @@ class AgentInfoMiner:
         algorithm_doc = None
         for attempt in range(2):
             try:
-                algorithm_doc = query_gemini(prompt)
+                algorithm_doc = query_gemini(prompt, stage="info_miner")
                 if algorithm_doc:
                     break
             except Exception as e:
@@ -180,20 +167,7 @@ class AgentInfoMiner:
             algorithm_doc = "No documentation found."
 
     # Step 6: Update cache
-        with lock:
-            with open(cache_path, "r", encoding="utf-8") as f:
-                try:
-                    cache = json.load(f)
-                except json.JSONDecodeError:
-                    cache = {}
-
-            cache[algorithm] = {
-            "query_datetime": datetime.now().isoformat(),
-            "document": algorithm_doc
-            }
-            with open(cache_path, "w", encoding="utf-8") as f:
-                json.dump(cache, f, ensure_ascii=False, indent=2)
-
+        store.put(algorithm, algorithm_doc, package_name)
         print(f"[Cache Updated] Stored docs for {algorithm}")
         return algorithm_doc
 
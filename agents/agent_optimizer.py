@@ -4,15 +4,15 @@ import re
 import subprocess
 from typing import Any, Dict, List, Optional
 import sys
-import google.generativeai as genai
 from utils.gemini_client import query_gemini
+from utils.prompt_budget import prompt_budget
+from utils.param_schema import param_registry
 
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from entity.code_quality import CodeQuality
 from config.config import Config
 # os.environ['OPENAI_API_KEY'] = Config.OPENAI_API_KEY
-genai.configure(api_key=Config.GEMINI_API_KEY)
 
 SYSTEM_PROMPT_TMPL = """
 You are an expert Python engineer specialising in anomaly‑detection libraries.
@@ -127,7 +127,8 @@ class AgentOptimizer:
         self,
         quality: CodeQuality,
         algorithm_doc: str,
-        max_steps: int = 8
+        max_steps: int = 8,
+        package_name: str = "pyod"
     ) -> CodeQuality:
         from utils.gemini_client import query_gemini
         """Run the optimization loop using the given inputs and return CodeQuality."""
@@ -136,6 +137,11 @@ class AgentOptimizer:
         std_output = quality.std_output
         algorithm_name = quality.algorithm
         final_params = parameters 
+        # A re-ask sends the same prompt again, so it must bypass the response cache
+        reask = False
+        # Proposed parameters are checked against the constructor before running anything
+        schema = param_registry.get(algorithm_name, package_name)
+        feedback = ""
         # system_prompt = SYSTEM_PROMPT_TMPL.format(
         #     code=code,
         #     parameter=parameters,
@@ -152,13 +158,16 @@ class AgentOptimizer:
             # messages.append(ai_response)
 
             # content = ai_response.content or ""
+            # Only the parameter-relevant part of the doc is re-sent on every step
+            doc_excerpt = prompt_budget.doc_for(algorithm_doc, "optimizer", algorithm_name)
             prompt = SYSTEM_PROMPT_TMPL.format(
             code=code,
             parameter=final_params,
-            std_output=std_output,
-            algorithm_doc=algorithm_doc,
+            std_output=feedback + std_output,
+            algorithm_doc=doc_excerpt,
             )
-            content = query_gemini(prompt)
+            content = query_gemini(prompt, use_cache=not reask, stage="optimizer")
+            reask = False
             # response = query_gemini(system_prompt)
             # messages.append(response)
             # content = response
@@ -166,10 +175,17 @@ class AgentOptimizer:
             self._print_thought_and_action(content, step)
 
             param_dict = self._extract_param_dict(content)
+            feedback = ""
+            if param_dict and schema:
+                param_dict, rejected = schema.validate(param_dict)
+                if rejected:
+                    feedback = "[Rejected parameters] " + "; ".join(rejected) + "\n"
+                    print(f"[Agent] {feedback.strip()}")
             if param_dict:
                 final_params = param_dict 
             else:
                 print("[Agent] No parameter change detected. Asking again...")
+                reask = True
                 continue
 
             if "Final:" in content:
@@ -55,7 +55,7 @@ class AgentProcessor:
             "parameters": {},
         }
 
-    def _call_gemini(self, prompt_list):
+    def _call_gemini(self, prompt_list, escalate=False):
         prompt_text = ""
         for msg in prompt_list:
             role = msg["role"]
@@ -66,24 +66,37 @@ class AgentProcessor:
                 prompt_text += f"User: {content}\n"
             else:
                 prompt_text += f"Assistant: {content}\n"
-        return query_gemini(prompt_text).strip()
-
-    def extract_config(self, user_input: str) -> dict:
-        prompt = [dict(p) for p in self.FEW_SHOT_COT_PROMPT]
-        prompt[-1]["content"] = prompt[-1]["content"].format(user_input=user_input)
-
-        response = self._call_gemini(prompt)
-        print("\n=== Gemini Extraction ===\n", response, "\n")
+        return query_gemini(prompt_text, stage="processor", escalate=escalate).strip()
 
+    @staticmethod
+    def _parse_final(response: str):
         match = re.search(r"FINAL:\s*(\{.*\})", response, flags=re.DOTALL)
         if not match:
             print("[Processor] No FINAL JSON found.")
-            return {}
+            return None
 
         try:
             parsed = json.loads(match.group(1))
         except Exception:
             print("[Processor] JSON parse error.")
+            return None
+        return parsed if isinstance(parsed, dict) else None
+
+    def extract_config(self, user_input: str) -> dict:
+        prompt = [dict(p) for p in self.FEW_SHOT_COT_PROMPT]
+        prompt[-1]["content"] = prompt[-1]["content"].format(user_input=user_input)
+
+        response = self._call_gemini(prompt)
+        print("\n=== Gemini Extraction ===\n", response, "\n")
+        parsed = self._parse_final(response)
+
+        # Fast model could not produce usable JSON → retry once on the strong model
+        if parsed is None:
+            print("[Processor] Escalating extraction to the strong model.")
+            response = self._call_gemini(prompt, escalate=True)
+            print("\n=== Gemini Extraction (escalated) ===\n", response, "\n")
+            parsed = self._parse_final(response)
+        if parsed is None:
             return {}
 
         # Normalize paths
@@ -6,6 +6,7 @@ from pygments import highlight
 from pygments.lexers import PythonLexer
 from pygments.formatters import TerminalFormatter
 from utils.gemini_client import query_gemini_quota_safe, query_gemini_with_retry
+from utils.param_schema import param_registry
 from langchain_core.prompts import PromptTemplate
 
 # ------------------------ Updated Test Prompt ------------------------
@@ -80,6 +81,8 @@ class AgentReviewer:
         folder = "generated_scripts"
         os.makedirs(folder, exist_ok=True)
         script_path = os.path.join(folder, f"{algorithm_name}_test.py")
+        schema = param_registry.get(algorithm_name, package_name)
+        constructor_hint = f"\nCONSTRUCTOR: {schema.hints()}\n" if schema else ""
 
         for attempt in range(1, self.MAX_RETRIES + 1):
             print(f"\n=== [Reviewer] Attempt {attempt} for {algorithm_name} ({package_name}) ===")
@@ -97,7 +100,7 @@ TASK: Modify or extend the given script so it can run standalone with synthetic
 
 ALGORITHM: {algorithm_name}
 PACKAGE: {package_name}
-
+{constructor_hint}
 THINK STEP BY STEP:
 1. Generate small synthetic data (e.g., 200 samples, 10 features).
 2. Ensure the model trains and evaluates correctly.
@@ -108,7 +111,7 @@ THINK STEP BY STEP:
 """
 
             # --- Step 2: Query Gemini for synthetic testable variant ---
-            response = query_gemini_with_retry(test_prompt_cot)
+            response = query_gemini_with_retry(test_prompt_cot, stage="reviewer")
             cleaned_code = self._clean_markdown(response)
 
             print("\n[DEBUG] Gemini Synthetic Test Code:\n")
@@ -142,7 +145,7 @@ The following Python script failed during testing.
 
 Error encountered:
 {res.stderr}
-
+{constructor_hint}
 THINK STEP BY STEP:
 1. Identify the exact cause of failure (imports, parameters, data handling, etc.).
 2. Infer the correct fix from context.
@@ -151,7 +154,7 @@ THINK STEP BY STEP:
 5. **IMPORTANT:** For models like DeepSVDD, always pass `n_features=X_train.shape[1]` when initializing.
 6. Output only the corrected runnable Python code (no markdown or explanation).
 """
-            raw_fix = query_gemini_with_retry(fix_prompt_cot)
+            raw_fix = query_gemini_with_retry(fix_prompt_cot, stage="reviewer", use_cache=False)
             cleaned_code = self._clean_markdown(raw_fix)
 
         print(f"❌ {algorithm_name} could not be fixed after {self.MAX_RETRIES} attempts.\n")
@@ -1,11 +1,15 @@
 import os
 import sys
-import numpy as np
+from config.config import Config
+from data_loader import io_pool
 from data_loader.data_loader import DataLoader
+from data_loader.dataset_profile import DatasetProfile
+from ad_model_selection.local_selector import get_local_selector
 from ad_model_selection.prompts.pygod_ms_prompt import generate_model_selection_prompt_from_pygod
 from ad_model_selection.prompts.pyod_ms_prompt import generate_model_selection_prompt_from_pyod
 from ad_model_selection.prompts.timeseries_ms_prompt import generate_model_selection_prompt_from_timeseries
 from utils.gemini_client import query_gemini
+from utils.retrieval_index import load_vectorstore
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -18,8 +22,8 @@ class AgentSelector:
         self.data_path_test = user_input.get("dataset_test")
         self.parameters = user_input.get("parameters", {}) or {}
 
-        # Load datasets
-        self._load_data()
+        # Probe datasets (shapes and label stats only, no payload)
+        self._probe_data()
 
         # Detect package type
         self._detect_package()
@@ -29,50 +33,91 @@ class AgentSelector:
 
         # Final outputs expected by pipeline
         self.tools = [self.algorithm_name]
-        self.vectorstore = None
+        self.vectorstore = load_vectorstore()
 
         print("\n=== Selector Summary ===")
         print(f"[INFO] Package Detected: {self.package_name}")
         print(f"[INFO] Final Algorithm Selected: {self.algorithm_name}")
-        print(f"[INFO] Parameters: {self.parameters}\n")
+        print(f"[INFO] Parameters: {self.parameters}")
+        print(f"[INFO] Dtype Policy: {self.dtype_policy}\n")
 
-    # -------------------- Data Loading --------------------
-    def _load_data(self):
-        train_loader = DataLoader(self.data_path_train, store_script=True, store_path="train_data_loader.py")
-        self.X_train, self.y_train = train_loader.load_data(split_data=False)
-
-        # If test dataset exists → load it
+    # -------------------- Data Probing --------------------
+    def _probe_data(self):
+        # Selection only needs shapes and label stats, never the arrays themselves;
+        # train and test are probed concurrently on the shared data I/O pool.
+        # Auto mode also profiles the training set (one pass over X) for the selection prompt.
+        # columns / label_column only apply to Parquet/Feather files.
+        columnar = {"columns": self.user_input.get("columns"), "label_column": self.user_input.get("label_column")}
+        paths = {"train": self.data_path_train}
         if self.data_path_test and os.path.exists(self.data_path_test):
-            test_loader = DataLoader(self.data_path_test, store_script=True, store_path="test_data_loader.py")
-            self.X_test, self.y_test = test_loader.load_data(split_data=False)
+            paths["test"] = self.data_path_test
+
+        self.load_timings = {role: {"path": path} for role, path in paths.items()}
+        futures = {role: io_pool.submit(io_pool.timed, self._probe_one, path, role, columnar,
+                                        role == "train" and self._auto_mode())
+                   for role, path in paths.items()}
+        infos = {}
+        for role, future in futures.items():
+            (infos[role], profile), seconds = future.result()
+            self.load_timings[role]["probe_seconds"] = round(seconds, 4)
+            if role == "train":
+                self.train_profile = profile
+        self.train_info = infos["train"]
+
+        # If test dataset exists → use its probe
+        if "test" in infos:
+            self.test_info = infos["test"]
         else:
             # ✅ NEW: No test dataset → use training dataset as test dataset
             print("[Selector] No test dataset detected → using training dataset as test set.")
-            self.X_test = self.X_train.copy()
-            self.y_test = self.y_train.copy() if isinstance(self.y_train, np.ndarray) else None
+            self.test_info = self.train_info
 
         # Determine supervised mode (binary labels)
-        self.supervised = (
-            isinstance(self.y_train, np.ndarray)
-            and set(np.unique(self.y_train)).issubset({0, 1})
-        )
+        self.supervised = self.train_profile.binary_labels
+
+        # Feature dtype the generated scripts should load with
+        self.dtype_policy = DataLoader.resolve_dtype_policy(self.user_input.get("dtype_policy"), self.train_info)
+
+        # Parse the full files in the background so the generated scripts open them from the dataset cache
+        if Config.DATA_PRELOAD_ENABLED:
+            for role, path in paths.items():
+                io_pool.submit_background(self._preload, path, role, columnar)
+
+    def _auto_mode(self):
+        algo_list = self.user_input.get("algorithm") or []
+        return len(algo_list) != 1
+
+    @staticmethod
+    def _probe_one(path, role, columnar, with_profile=False):
+        """(probe info, DatasetProfile); the profile is probe-only unless with_profile."""
+        loader = DataLoader(path, store_script=True, store_path=f"{role}_data_loader.py", **columnar)
+        info = loader.probe()
+        return info, loader.profile() if with_profile else DatasetProfile.from_probe(info)
+
+    def _preload(self, path, role, columnar):
+        try:
+            loader = DataLoader(path, store_script=False, dtype_policy=self.dtype_policy, **columnar)
+            _, seconds = io_pool.timed(loader.load_data, split_data=False, mmap=True)
+            self.load_timings[role]["preload_seconds"] = round(seconds, 4)
+        except Exception as e:
+            print(f"[Selector] Background load of {path} failed: {e}")
 
     # -------------------- Package Detection --------------------
     def _detect_package(self):
         # Graph dataset → PyGOD
-        if hasattr(self.X_train, "num_nodes"):
+        if self.train_info["num_nodes"] is not None:
             self.package_name = "pygod"
             return
 
         # Standard numeric / time-series arrays
-        if isinstance(self.X_train, np.ndarray):
+        if self.train_info["format"] in DataLoader.ARRAY_FORMATS:
             # Unsupervised anomaly detection → PYOD
             if not self.supervised:
                 self.package_name = "pyod"
             # Supervised forecasting / sequence learning → Darts
             else:
                 self.package_name = "darts"
-                dim = self.X_train.shape[1] if len(self.X_train.shape) > 1 else 1
+                dim = self.train_info["columns"]
                 # Ensure darts model gets proper dimensionality
                 self.parameters["enc_in"] = dim
                 self.parameters["c_out"] = dim
@@ -85,6 +130,9 @@ class AgentSelector:
     def _select_algorithm(self):
         algo_list = self.user_input.get("algorithm") or []
 
+        # How the model was chosen (reported in /metadata): user | all | local | llm | default
+        self.selection = {"source": "user"}
+
         # ✅ STRICT MODE (User manually specified exactly one model)
         if len(algo_list) == 1 and algo_list[0].lower() != "all":
             self.algorithm_name = algo_list[0]
@@ -97,41 +145,106 @@ class AgentSelector:
                 "ALL_PYGOD" if self.package_name == "pygod" else
                 "ALL_TIMESERIES"
             )
+            self.selection = {"source": "all"}
             return
 
+        # ✅ LOCAL FAST PATH (past runs on the most similar datasets, no LLM call)
+        if Config.LOCAL_SELECTOR_ENABLED:
+            local = self._select_locally()
+            if local is not None:
+                self.algorithm_name = local.algorithm
+                return
+
         # ✅ AUTO-SMART MODE (No model specified → Ask Gemini)
         name = os.path.basename(self.data_path_train)
 
         try:
+            info = self.train_info
+            meta_features = self.train_profile.meta_features()
             if self.package_name == "pyod":
-                size, dim = self.X_train.shape
-                prompts = generate_model_selection_prompt_from_pyod(name, size, dim)
+                size, dim = info["rows"], info["columns"]
+                prompts = generate_model_selection_prompt_from_pyod(name, size, dim, meta_features)
 
             elif self.package_name == "pygod":
-                num_node = self.X_train.num_nodes
-                num_edge = self.X_train.num_edges
-                num_feature = self.X_train.num_features
+                num_node = info["num_nodes"]
+                num_edge = info["num_edges"]
+                num_feature = info["num_features"]
                 avg_degree = num_edge / max(num_node, 1)
-                prompts = generate_model_selection_prompt_from_pygod(name, num_node, num_edge, num_feature, avg_degree)
+                prompts = generate_model_selection_prompt_from_pygod(name, num_node, num_edge, num_feature, avg_degree,
+                                                                     meta_features)
 
             else:  # darts / time-series
-                dim = self.X_train.shape[1] if len(self.X_train.shape) > 1 else 1
+                dim = info["columns"]
                 series_type = "multivariate" if dim > 1 else "univariate"
-                prompts = generate_model_selection_prompt_from_timeseries(name, len(self.X_train), dim, series_type)
+                prompts = generate_model_selection_prompt_from_timeseries(name, info["rows"], dim, series_type,
+                                                                          meta_features)
 
         except Exception:
             # If something unexpected happens → safe fallback
             prompts = [{"content": "Return ONLY JSON {\"choice\":\"model\"}"}]
 
         prompt = "\n".join([p["content"] for p in prompts]) + '\nReturn ONLY JSON: {"choice": "MODEL_NAME"}'
-        out = query_gemini(prompt)
+        out = query_gemini(prompt, stage="selector")
         choice = self._parse_gemini_choice(out)
 
+        # Unparsable fast-model answer → ask the strong model once before falling back
+        if not choice:
+            out = query_gemini(prompt, stage="selector", escalate=True)
+            choice = self._parse_gemini_choice(out)
+
         # Robust fallback defaults
         self.algorithm_name = (
             choice
             or ("ECOD" if self.package_name == "pyod" else "SCAN" if self.package_name == "pygod" else "RNNModel")
         )
+        self.selection["source"] = "llm" if choice else "default"
+
+    # -------------------- Local Selector --------------------
+    def _select_locally(self):
+        try:
+            local_selector = get_local_selector()
+            selection = local_selector.rank(self.package_name, self.train_profile)
+        except Exception as e:
+            print(f"[Selector] Local selector failed: {e}")
+            return None
+        if selection is None:
+            self.selection = {"source": "llm", "local_confidence": None}
+            return None
+
+        self.selection = {"source": "llm", "local_choice": selection.algorithm,
+                          "local_confidence": round(selection.confidence, 4),
+                          "local_ranking": [(a, round(score, 4)) for a, score in selection.ranking[:5]],
+                          "neighbors": [(name, round(d, 4)) for name, d in selection.neighbors],
+                          "local_seconds": round(selection.seconds, 4)}
+        if selection.confidence < local_selector.min_confidence:
+            print(f"[Selector] Local pick {selection.algorithm} not confident enough "
+                  f"({selection.confidence:.2f}) → asking LLM")
+            return None
+        self.selection["source"] = "local"
+        print(f"[Selector] Local pick {selection.algorithm} (confidence {selection.confidence:.2f}, "
+              f"{self.selection['local_seconds'] * 1000:.1f} ms)")
+        return selection
+
+    def record_result(self, algorithm, metrics):
+        """Add a finished run with a valid AUROC to the local selector's history."""
+        auroc = (metrics or {}).get("auroc")
+        if not Config.LOCAL_SELECTOR_ENABLED or auroc is None or auroc < 0 or algorithm.startswith("ALL_"):
+            return
+        # Strict / run-all modes only probed the data; profiling the arrays stays off the optimizer node
+        io_pool.submit_background(self._record, algorithm, auroc, metrics.get("auprc"))
+
+    def _record(self, algorithm, auroc, auprc):
+        try:
+            profile = self.train_profile
+            if profile.source != "arrays":
+                profile = DataLoader(self.data_path_train, store_script=False,
+                                     columns=self.user_input.get("columns"),
+                                     label_column=self.user_input.get("label_column")).profile()
+                self.train_profile = profile  # later records (run-all) and the run's dataset stats reuse it
+            dataset = f"{os.path.basename(self.data_path_train)}:{profile.rows}x{profile.columns}"
+            get_local_selector().record(self.package_name, dataset, profile, algorithm, auroc, auprc)
+        except Exception as e:
+            print(f"[Selector] Could not record run for the local selector: {e}")
 
     # -------------------- Gemini Response Parser --------------------
     def _parse_gemini_choice(self, text: str):
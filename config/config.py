@@ -6,3 +6,101 @@ load_dotenv()
 
 class Config:
     GEMINI_API_KEY =""
+
+    # Local cache root (LLM responses, docs, datasets)
+    CACHE_DIR = os.getenv("AD_AGENT_CACHE_DIR", ".cache")
+
+    # LLM response cache
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_responses.sqlite3"))
+    LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256"))
+    LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+    # Shared Gemini admission control (across all concurrent runs in the process)
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+    LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))
+    LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "1024"))
+    LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "2"))
+    LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "60"))
+
+    # LLM backend: "gemini" (real API), "local" (in-process stand-in) or "http" (utils/llm_standin.py server)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+    LLM_STANDIN_URL = os.getenv("LLM_STANDIN_URL", "http://127.0.0.1:8765/generate")
+    LLM_STANDIN_LATENCY_SECONDS = float(os.getenv("LLM_STANDIN_LATENCY_SECONDS", "0"))
+    LLM_STANDIN_RESPONSES = os.getenv("LLM_STANDIN_RESPONSES", "")
+
+    # Model tiers used by the per-stage routing table (utils/llm_routing.py)
+    LLM_FAST_MODEL = os.getenv("LLM_FAST_MODEL", "gemini-2.5-flash")
+    LLM_STRONG_MODEL = os.getenv("LLM_STRONG_MODEL", "gemini-2.5-pro")
+
+    # Stream code generation (early syntax checks, partial code in /logs)
+    LLM_STREAM_CODEGEN = os.getenv("LLM_STREAM_CODEGEN", "1") == "1"
+
+    # Per-run LLM usage ledger (utils/llm_usage.py): runs kept in memory, least recently active dropped first
+    LLM_USAGE_MAX_RUNS = int(os.getenv("LLM_USAGE_MAX_RUNS", "200"))
+
+    # Offline documentation index parsed from docs/*_models_page.txt (utils/doc_index.py)
+    DOC_INDEX_ENABLED = os.getenv("DOC_INDEX_ENABLED", "1") == "1"
+    DOC_INDEX_PATH = os.getenv("DOC_INDEX_PATH", os.path.join(CACHE_DIR, "doc_index.json"))
+
+    # Documentation cache for query_docs (utils/doc_store.py); cache.json is imported once if present
+    DOC_CACHE_PATH = os.getenv("DOC_CACHE_PATH", os.path.join(CACHE_DIR, "docs.sqlite3"))
+    DOC_CACHE_TTL_SECONDS = int(os.getenv("DOC_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    DOC_CACHE_MAX_ENTRIES = int(os.getenv("DOC_CACHE_MAX_ENTRIES", "5000"))
+    DOC_CACHE_LEGACY_JSON = os.getenv("DOC_CACHE_LEGACY_JSON", "cache.json")
+
+    # Introspected constructor schemas, one file per package version (utils/param_schema.py)
+    PARAM_SCHEMA_DIR = os.getenv("PARAM_SCHEMA_DIR", os.path.join(CACHE_DIR, "param_schema"))
+
+    # Background doc fetch started by the processor node (utils/doc_prefetch.py)
+    DOC_PREFETCH_ENABLED = os.getenv("DOC_PREFETCH_ENABLED", "1") == "1"
+    DOC_PREFETCH_WORKERS = int(os.getenv("DOC_PREFETCH_WORKERS", "4"))
+    DOC_PREFETCH_CANDIDATES = int(os.getenv("DOC_PREFETCH_CANDIDATES", "3"))
+    DOC_PREFETCH_TIMEOUT_SECONDS = float(os.getenv("DOC_PREFETCH_TIMEOUT_SECONDS", "300"))
+
+    # Local BM25 index over docs/*_models_page.txt, the query_docs fallback (utils/retrieval_index.py)
+    RETRIEVAL_INDEX_DIR = os.getenv("RETRIEVAL_INDEX_DIR", os.path.join(CACHE_DIR, "retrieval"))
+
+    # Parsed datasets shared across loads (key: "stat" = path/size/mtime, "content" = file hash)
+    DATASET_CACHE_ENABLED = os.getenv("DATASET_CACHE_ENABLED", "1") == "1"
+    DATASET_CACHE_DIR = os.getenv("DATASET_CACHE_DIR", os.path.join(CACHE_DIR, "datasets"))
+    DATASET_CACHE_MAX_BYTES = int(os.getenv("DATASET_CACHE_MAX_BYTES", str(10 * 1024 ** 3)))
+    DATASET_CACHE_KEY = os.getenv("DATASET_CACHE_KEY", "stat")
+    GRAPH_CACHE_DIR = os.getenv("GRAPH_CACHE_DIR", os.path.join(CACHE_DIR, "graphs"))  # .pt graphs, content-keyed
+
+    # Shared thread pools: DATA_IO_WORKERS for the selector's blocking probes, DATA_BACKGROUND_WORKERS for
+    # the train/test preloads into the dataset cache and local-selector recording
+    DATA_IO_WORKERS = int(os.getenv("DATA_IO_WORKERS", "4"))
+    DATA_BACKGROUND_WORKERS = int(os.getenv("DATA_BACKGROUND_WORKERS", "2"))
+    DATA_PRELOAD_ENABLED = os.getenv("DATA_PRELOAD_ENABLED", "1") == "1"
+
+    # Streaming CSV reader (data_loader/csv_reader.py): "pandas" parses floats exactly like pd.read_csv;
+    # "pyarrow" ("auto" when installed) is faster but can differ from it in the last bit of some floats
+    CSV_ENGINE = os.getenv("CSV_ENGINE", "pandas")
+    CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", "100000"))
+
+    # Feature dtype policy for DataLoader: "keep", "float32" or "auto" (float32 when lossless,
+    # or when float64 X would exceed DATA_MAX_MEMORY_MB and the relative error stays within tolerance)
+    DATA_DTYPE_POLICY = os.getenv("DATA_DTYPE_POLICY", "keep")
+    DATA_MAX_MEMORY_MB = int(os.getenv("DATA_MAX_MEMORY_MB", "0"))  # 0 = no budget
+    DATA_FLOAT32_MAX_REL_ERROR = float(os.getenv("DATA_FLOAT32_MAX_REL_ERROR", "1e-6"))
+
+    # Parquet/Feather inputs: label column to return as y (empty = unsupervised) and
+    # columns never used as features (case-insensitive)
+    DATA_LABEL_COLUMN = os.getenv("DATA_LABEL_COLUMN", "")
+    COLUMNAR_DROP_COLUMNS = [c.strip() for c in os.getenv(
+        "COLUMNAR_DROP_COLUMNS", "id,index,timestamp,time,date,datetime,__index_level_0__").split(",") if c.strip()]
+
+    # Dataset profiles (data_loader/dataset_profile.py): rows sampled for the PCA / distance landmarkers
+    PROFILE_SAMPLE_ROWS = int(os.getenv("PROFILE_SAMPLE_ROWS", "1000"))
+
+    # Local model selector (ad_model_selection/local_selector.py): k nearest past datasets by meta-features,
+    # tried before the LLM in auto mode and used when its confidence reaches LOCAL_SELECTOR_MIN_CONFIDENCE
+    LOCAL_SELECTOR_ENABLED = os.getenv("LOCAL_SELECTOR_ENABLED", "1") == "1"
+    MODEL_HISTORY_PATH = os.getenv("MODEL_HISTORY_PATH", os.path.join(CACHE_DIR, "model_history.sqlite3"))
+    LOCAL_SELECTOR_K = int(os.getenv("LOCAL_SELECTOR_K", "5"))
+    LOCAL_SELECTOR_MIN_SUPPORT = int(os.getenv("LOCAL_SELECTOR_MIN_SUPPORT", "3"))
+    LOCAL_SELECTOR_MIN_CONFIDENCE = float(os.getenv("LOCAL_SELECTOR_MIN_CONFIDENCE", "0.6"))
+    # AUROC margin over chance (0.5) a local pick must reach before the LLM is skipped
+    LOCAL_SELECTOR_MIN_MARGIN = float(os.getenv("LOCAL_SELECTOR_MIN_MARGIN", "0.1"))
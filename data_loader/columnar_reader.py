@@ -0,0 +1,134 @@
+# data_loader/columnar_reader.py
+"""
+Parquet and Feather / Arrow IPC inputs. Only the feature columns (numeric,
+minus configured id/timestamp names) and the optional label column are read;
+Arrow buffers are viewed as NumPy without conversion where the dtype allows
+and copied once into the output array.
+"""
+
+import os
+
+import numpy as np
+
+from config.config import Config
+
+PARQUET_EXTS = (".parquet", ".pq")
+FEATHER_EXTS = (".feather", ".arrow", ".ipc")
+COLUMNAR_EXTS = PARQUET_EXTS + FEATHER_EXTS
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError("pyarrow is required to read Parquet/Feather files: pip install pyarrow")
+    return pyarrow
+
+
+def _open_ipc(source):
+    """Reader for an Arrow IPC file (Feather v2) or stream, or None for a Feather v1 file."""
+    pa = _pyarrow()
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        pass
+    source.seek(0)
+    try:
+        return pa.ipc.open_stream(source)
+    except pa.ArrowInvalid:
+        return None
+
+
+def read_schema(path: str):
+    pa = _pyarrow()
+    if path.lower().endswith(PARQUET_EXTS):
+        return pa.parquet.read_schema(path)
+    with pa.memory_map(path, "r") as source:
+        reader = _open_ipc(source)
+        if reader is not None:
+            return reader.schema
+    return pa.feather.read_table(path, memory_map=True).schema
+
+
+def count_rows(path: str) -> int:
+    pa = _pyarrow()
+    if path.lower().endswith(PARQUET_EXTS):
+        return pa.parquet.ParquetFile(path).metadata.num_rows
+    with pa.memory_map(path, "r") as source:
+        reader = _open_ipc(source)
+        # Batches of a memory-mapped IPC file/stream are views; counting reads no column data
+        if isinstance(reader, pa.ipc.RecordBatchFileReader):
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        if reader is not None:
+            return sum(batch.num_rows for batch in reader)
+    return pa.feather.read_table(path, memory_map=True).num_rows
+
+
+def feature_columns(schema, columns=None, label_column=None, drop_columns=None) -> list:
+    """
+    Columns to read as X: the requested ones, else every numeric column except the
+    label and the configured drop list (ids, timestamps, ...).
+    """
+    pa = _pyarrow()
+    names = schema.names
+    if label_column and label_column not in names:
+        raise KeyError(f"label column '{label_column}' not in file")
+    if columns:
+        missing = [c for c in columns if c not in names]
+        if missing:
+            raise KeyError(f"columns not in file: {', '.join(missing)}")
+        return [c for c in columns if c != label_column]
+    drop = {c.lower() for c in (Config.COLUMNAR_DROP_COLUMNS if drop_columns is None else drop_columns)}
+    return [f.name for f in schema
+            if f.name != label_column and f.name.lower() not in drop
+            and (pa.types.is_integer(f.type) or pa.types.is_floating(f.type) or pa.types.is_boolean(f.type))]
+
+
+def _read_table(path: str, columns: list):
+    pa = _pyarrow()
+    if path.lower().endswith(PARQUET_EXTS):
+        return pa.parquet.read_table(path, columns=columns, use_threads=True)
+    with pa.memory_map(path, "r") as source:
+        reader = _open_ipc(source)
+        # feather.read_table covers IPC files and Feather v1 but not the IPC stream format
+        if reader is not None and not isinstance(reader, pa.ipc.RecordBatchFileReader):
+            return reader.read_all().select(columns)
+    return pa.feather.read_table(path, columns=columns, memory_map=True)
+
+
+def _column_array(column) -> np.ndarray:
+    """NumPy view of an Arrow column; copies only for nulls, booleans or multiple chunks."""
+    if column.num_chunks == 1 and column.null_count == 0:
+        try:
+            return column.chunk(0).to_numpy(zero_copy_only=True)
+        except Exception:
+            pass
+    return column.to_numpy()
+
+
+def read_columnar(path: str, columns=None, label_column=None, drop_columns=None):
+    """(X, y) with y the label column's values, or "Unsupervised" without one."""
+    schema = read_schema(path)
+    features = feature_columns(schema, columns, label_column, drop_columns)
+    table = _read_table(path, features + ([label_column] if label_column else []))
+
+    arrays = [_column_array(table.column(name)) for name in features]
+    if len(arrays) == 1:
+        X = arrays[0].reshape(-1, 1)  # a view of the Arrow buffer when no copy was needed
+    elif arrays:
+        X = np.empty((table.num_rows, len(arrays)), dtype=np.result_type(*[a.dtype for a in arrays]))
+        for j, arr in enumerate(arrays):
+            X[:, j] = arr
+    else:
+        X = np.empty((table.num_rows, 0))
+    y = _column_array(table.column(label_column)) if label_column else "Unsupervised"
+    print(f"[Columnar] {os.path.basename(path)}: {len(features)} of {len(schema.names)} columns as X"
+          + (f", labels from '{label_column}'" if label_column else ""))
+    return X, y
+
+
+def read_label(path: str, label_column: str) -> np.ndarray:
+    return _column_array(_read_table(path, [label_column]).column(label_column))
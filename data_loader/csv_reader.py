@@ -0,0 +1,130 @@
+# data_loader/csv_reader.py
+
+import codecs
+import os
+
+import numpy as np
+import pandas as pd
+
+from config.config import Config
+
+
+def sniff_encoding(path: str, sample_bytes: int = 1024 * 1024) -> str:
+    """utf-8 (or utf-8-sig with a BOM) if the first MB decodes, else latin1."""
+    with open(path, "rb") as f:
+        sample = f.read(sample_bytes)
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut by the sample boundary is not an encoding error
+        if e.start < len(sample) - 3:
+            return "latin1"
+    return "utf-8"
+
+
+def infer_schema(path: str, encoding: str, sample_rows: int = 1000):
+    """
+    (columns, dtype) that df.values would produce, judged on the first rows, or
+    (columns, None) if any column is non-numeric (the frame would become an object array).
+    """
+    sample = pd.read_csv(path, nrows=sample_rows, encoding=encoding)
+    if sample.shape[1] == 0 or any(dt.kind not in "iuf" for dt in sample.dtypes):
+        return list(sample.columns), None
+    return list(sample.columns), np.result_type(*sample.dtypes)
+
+
+def count_rows(path: str, block_size: int = 16 * 1024 * 1024) -> int:
+    """Upper bound on data rows (lines minus header); blank lines are trimmed after reading."""
+    count, last = 0, b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            count += block.count(b"\n")
+            last = block[-1:]
+    return max(count + (last != b"\n") - 1, 0)
+
+
+class _Filler:
+    """Preallocated output array filled block by block."""
+
+    def __init__(self, rows: int, columns: int, dtype):
+        self.X = np.empty((rows, columns), dtype=dtype)
+        self.pos = 0
+
+    def reserve(self, n: int) -> None:
+        if self.pos + n > self.X.shape[0]:  # only if the row estimate was off
+            grown = np.empty((max(self.pos + n, 2 * self.X.shape[0]), self.X.shape[1]), dtype=self.X.dtype)
+            grown[:self.pos] = self.X[:self.pos]
+            self.X = grown
+
+    def result(self) -> np.ndarray:
+        return self.X if self.pos == self.X.shape[0] else self.X[:self.pos]
+
+
+def _read_pandas(path: str, encoding: str, columns: list, dtype, chunk_rows: int) -> np.ndarray:
+    filler = _Filler(count_rows(path), len(columns), dtype)
+    for chunk in pd.read_csv(path, encoding=encoding, dtype=dtype, chunksize=chunk_rows):
+        if chunk.shape[1] != len(columns):
+            raise ValueError(f"expected {len(columns)} columns, got {chunk.shape[1]}")
+        n = len(chunk)
+        filler.reserve(n)
+        filler.X[filler.pos:filler.pos + n] = chunk.to_numpy(dtype=dtype, copy=False)
+        filler.pos += n
+    return filler.result()
+
+
+def _read_pyarrow(path: str, encoding: str, columns: list, dtype, chunk_rows: int) -> np.ndarray:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    read_options = pacsv.ReadOptions(encoding="utf8" if encoding.startswith("utf-8") else encoding,
+                                     block_size=max(chunk_rows * len(columns) * 16, 1 << 20))
+    convert_options = pacsv.ConvertOptions(column_types={name: pa.from_numpy_dtype(dtype) for name in columns})
+    filler = _Filler(count_rows(path), len(columns), dtype)
+    for batch in pacsv.open_csv(path, read_options=read_options, convert_options=convert_options):
+        if batch.num_columns != len(columns):
+            raise ValueError(f"expected {len(columns)} columns, got {batch.num_columns}")
+        n = batch.num_rows
+        filler.reserve(n)
+        for j, column in enumerate(batch.columns):
+            if column.null_count and dtype.kind != "f":
+                raise ValueError(f"missing values in integer column {columns[j]}")
+            filler.X[filler.pos:filler.pos + n, j] = column.to_numpy(zero_copy_only=False)
+        filler.pos += n
+    return filler.result()
+
+
+def _engine(engine: str) -> str:
+    if engine != "auto":
+        return engine
+    try:
+        import pyarrow.csv  # noqa: F401
+        return "pyarrow"
+    except ImportError:
+        return "pandas"
+
+
+def read_csv_array(path: str, engine: str = None, chunk_rows: int = None) -> np.ndarray:
+    """
+    The CSV as df.values would give it, streamed in chunks into one preallocated
+    typed array, so peak memory stays close to the final array size.
+    Frames with non-numeric columns (object arrays) and schema surprises past the
+    sampled rows fall back to a plain pd.read_csv.
+    """
+    engine = _engine(engine or Config.CSV_ENGINE)
+    chunk_rows = chunk_rows or Config.CSV_CHUNK_ROWS
+    encoding = sniff_encoding(path)
+    try:
+        columns, dtype = infer_schema(path, encoding)
+        if dtype is not None:
+            reader = _read_pyarrow if engine == "pyarrow" else _read_pandas
+            return reader(path, encoding, columns, dtype, chunk_rows)
+    except Exception as e:
+        print(f"[CSV] Streaming read of {os.path.basename(path)} failed ({e}); using pandas")
+
+    try:
+        df = pd.read_csv(path, encoding=encoding)
+    except UnicodeDecodeError:
+        df = pd.read_csv(path, encoding='latin1')
+    return df.values
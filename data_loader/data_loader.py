@@ -5,22 +5,56 @@ import pandas as pd
 import torch
 import scipy.io
 from torch_geometric.data import Data
-import google.generativeai as genai
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+from config.config import Config
+from data_loader.csv_reader import count_rows, infer_schema, read_csv_array, sniff_encoding
+from data_loader.columnar_reader import COLUMNAR_EXTS, count_rows as columnar_count_rows, \
+    feature_columns, read_columnar, read_label, read_schema
+from data_loader.dataset_profile import PROFILE_VERSION, DatasetProfile, profile_arrays
+from data_loader.graph_cache import graph_metadata, load_graph
+from data_loader.mat_reader import list_variables, load_mat, read_variable, select_variables
+
+
+def float32_error(X, chunk_rows=65536):
+    """(max relative error, values overflowing float32) of casting X to float32, checked in row chunks."""
+    flat = X.reshape(X.shape[0], -1) if X.ndim > 1 else X.reshape(-1, 1)
+    max_rel_error, overflow = 0.0, 0
+    for start in range(0, flat.shape[0], chunk_rows):
+        block = np.asarray(flat[start:start + chunk_rows], dtype=np.float64)
+        with np.errstate(over="ignore", invalid="ignore"):
+            down = block.astype(np.float32).astype(np.float64)
+        finite = np.isfinite(block)
+        overflow += int(np.count_nonzero(finite & ~np.isfinite(down)))
+        ok = finite & np.isfinite(down) & (block != 0)
+        if ok.any():
+            rel = np.abs(down[ok] - block[ok]) / np.abs(block[ok])
+            max_rel_error = max(max_rel_error, float(rel.max()))
+    return max_rel_error, overflow
+
 
 class DataLoader:
     """
-    Optimized DataLoader supporting .csv, .mat, .npy, .pt files.
+    Optimized DataLoader supporting .csv, .mat, .npy, .pt, Parquet and Feather files.
     Generates scripts (head_*.py) and safely loads data.
     Handles supervised and unsupervised datasets.
     """
 
-    def __init__(self, filepath, desc='', store_script=True, store_path='generated_data_loader.py'):
+    def __init__(self, filepath, desc='', store_script=True, store_path='generated_data_loader.py',
+                 dtype_policy=None, max_memory_mb=None, x_var=None, y_var=None, columns=None, label_column=None):
         self.filepath = filepath.replace("\\", "/")
         self.desc = desc
         self.store_script = store_script
         self.store_path = store_path
+        # "keep" | "float32" | "auto" (float32 when lossless, or when float64 X exceeds max_memory_mb)
+        self.dtype_policy = dtype_policy or Config.DATA_DTYPE_POLICY
+        self.max_memory_mb = Config.DATA_MAX_MEMORY_MB if max_memory_mb is None else max_memory_mb
+        self.dtype_report = None
+        # .mat variable names for X / y (default: conventional names, then file order)
+        self.x_var = x_var
+        self.y_var = y_var
+        # Parquet/Feather: feature columns to read (default: numeric, minus COLUMNAR_DROP_COLUMNS) and label column
+        self.columns = list(columns) if columns else None
+        self.label_column = label_column or Config.DATA_LABEL_COLUMN or None
 
         if not os.path.exists(self.filepath):
             raise FileNotFoundError(f"File not found: {self.filepath}")
@@ -42,14 +76,9 @@ Type: {file_type}
 - Ensure X and y exist in locals()
 Return Python code only.
 """
-        model = genai.GenerativeModel("gemini-2.5-pro")
-        response = model.generate_content(prompt)
-
-        content = ""
-        if hasattr(response, "candidates") and response.candidates:
-            parts = response.candidates[0].content.parts
-            if parts:
-                content = "".join(part.text for part in parts if hasattr(part, "text") and part.text)
+        # Imported lazily: generated scripts import DataLoader but never need the LLM client
+        from utils.gemini_client import query_gemini
+        content = query_gemini(prompt, stage="data_loader")
 
         code_match = re.search(r"```python\n(.*?)\n```", content, re.DOTALL)
         extracted_code = code_match.group(1) if code_match else content
@@ -74,39 +103,106 @@ except:
 
         return extracted_code
 
-    def load_data(self, split_data=False):
+    # Formats that are slow to parse; .npy is already an array file and .pt holds graph objects
+    CACHED_TYPES = (".csv", ".mat") + COLUMNAR_EXTS
+
+    # probe() formats that load as plain X / y arrays
+    ARRAY_FORMATS = ("csv", "mat", "npy") + tuple(ext.lstrip(".") for ext in COLUMNAR_EXTS)
+
+    def _cache_options(self, float32=False):
+        """Loader options that change the arrays, part of the dataset cache key."""
+        options = {k: v for k, v in (("x_var", self.x_var), ("y_var", self.y_var), ("columns", self.columns),
+                                     ("label_column", self.label_column)) if v}
+        if float32:
+            options["dtype"] = "float32"  # entry holding X already downcast by the dtype policy
+        return options
+
+    def _cached_arrays(self, ext, mmap_mode="c", float32=False):
+        """(X, y) from the shared dataset cache, or None on a miss or when caching is off."""
+        if not Config.DATASET_CACHE_ENABLED or (ext not in self.CACHED_TYPES and not float32):
+            return None
+        options = self._cache_options(float32)
+        from data_loader.dataset_cache import dataset_cache
+        try:
+            cached = dataset_cache.get(self.filepath, options, mmap_mode=mmap_mode)
+        except OSError as e:
+            print(f"[DatasetCache] Lookup failed for {self.filepath}: {e}")
+            return None
+        if cached is not None:
+            print(f"[DatasetCache] Hit for {self.filepath}. X shape: {cached[0].shape}")
+        return cached
+
+    def load_data(self, split_data=False, mmap=False):
         """
         Load dataset safely.
         Returns X, y (or X_train, X_test, y_train, y_test if split_data=True)
         Forces unsupervised CSVs.
+        mmap=True returns read-only np.memmap views (.npy files directly, other
+        formats through the dataset cache) that concurrent runs share through
+        the page cache; callers must not modify them in place.
+        Features are downcast to float32 according to dtype_policy.
         """
-        X, y = None, None
         ext = os.path.splitext(self.filepath)[1].lower()
+        mmap_mode = "r" if mmap else "c"
+
+        # A float32 copy stored by an earlier load ("auto" re-checks, its answer depends on the budget)
+        variant = None
+        if self.dtype_policy == "float32":
+            variant = self._cached_arrays(ext, mmap_mode, float32=True)
+        if variant is not None:
+            X, y = variant
+        else:
+            X, y = self._load_arrays(ext, mmap)
+            if self.dtype_policy != "keep":
+                X, y = self._apply_dtype_policy(X, y, mmap)
+        self._check_memory_budget(X)
+
+        # Optional train/test split
+        if split_data and isinstance(X, np.ndarray) and isinstance(y, np.ndarray) and X.shape[0] == y.shape[0]:
+            from sklearn.model_selection import train_test_split
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+            return X_train, X_test, y_train, y_test
+
+        return X, y
+
+    def _load_arrays(self, ext, mmap=False):
+        """Parse the file (or open its dataset cache entry) into X, y."""
+        X, y = None, None
+        mmap_mode = "r" if mmap else "c"
+        cached = self._cached_arrays(ext, mmap_mode)
 
         try:
-            if ext == ".csv":
-                try:
-                    df = pd.read_csv(self.filepath, encoding='utf-8')
-                except UnicodeDecodeError:
-                    df = pd.read_csv(self.filepath, encoding='latin1')
+            if cached is not None:
+                X, y = cached
+
+            elif ext == ".csv":
+                X = read_csv_array(self.filepath)
 
                 # Force all CSVs to unsupervised
-                X = df.values
                 y = "Unsupervised"
                 print(f"⚠️ Forced unsupervised mode for CSV. X shape: {X.shape}")
 
             elif ext == ".mat":
-                mat = scipy.io.loadmat(self.filepath)
-                arrays = [v for k, v in mat.items() if not k.startswith("__")]
-                X = arrays[0] if len(arrays) >= 1 else np.empty((0,0))
-                y = arrays[1] if len(arrays) >= 2 else "Unsupervised"
+                # Reads only the X / y variables; v7.3 (HDF5) files go through h5py in row chunks
+                X, y = load_mat(self.filepath, self.x_var, self.y_var)
+
+            elif ext in COLUMNAR_EXTS:
+                X, y = read_columnar(self.filepath, self.columns, self.label_column)
 
             elif ext == ".npy":
-                X = np.load(self.filepath, allow_pickle=True)
+                try:
+                    X = np.load(self.filepath, mmap_mode="r") if mmap else np.load(self.filepath, allow_pickle=True)
+                except ValueError:
+                    # Object arrays are pickled and cannot be memory-mapped
+                    X = np.load(self.filepath, allow_pickle=True)
                 y = "time-series"
 
             elif ext == ".pt":
-                X = torch.load(self.filepath, map_location='cpu', weights_only=False)
+                # Unpickled once per file content, then rebuilt from memory-mapped CSR arrays
+                if Config.DATASET_CACHE_ENABLED:
+                    X = load_graph(self.filepath)
+                else:
+                    X = torch.load(self.filepath, map_location='cpu', weights_only=False)
                 y = "graph"
 
             else:
@@ -116,14 +212,191 @@ except:
         except Exception as e:
             print(f"❌ Error loading {self.filepath}: {e}")
             X, y = np.empty((0,0)), "Unsupervised"
+        else:
+            if cached is None and ext in self.CACHED_TYPES and Config.DATASET_CACHE_ENABLED:
+                from data_loader.dataset_cache import dataset_cache
+                options = self._cache_options()
+                if dataset_cache.put(self.filepath, X, y, options) and mmap:
+                    # Hand out the shared read-only mapping instead of this process's private parse
+                    X, y = dataset_cache.get(self.filepath, options, mmap_mode="r") or (X, y)
+        return X, y
 
-        # Optional train/test split
-        if split_data and isinstance(X, np.ndarray) and isinstance(y, np.ndarray) and X.shape[0] == y.shape[0]:
-            from sklearn.model_selection import train_test_split
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-            return X_train, X_test, y_train, y_test
+    # ------------------------ Dtype Policy ------------------------
+    def _apply_dtype_policy(self, X, y, mmap=False):
+        """Downcast float64 features to float32 if the policy allows it, recording the precision loss."""
+        if not isinstance(X, np.ndarray) or X.dtype != np.float64 or X.size == 0:
+            return X, y
+        max_rel_error, overflow = float32_error(X)
+        lossless = max_rel_error == 0 and not overflow
+        over_budget = bool(self.max_memory_mb) and X.nbytes > self.max_memory_mb * 1024 ** 2
+        tolerable = not overflow and max_rel_error <= Config.DATA_FLOAT32_MAX_REL_ERROR
+        self.dtype_report = {"policy": self.dtype_policy, "from": "float64", "to": "float64",
+                             "max_rel_error": max_rel_error, "overflow": overflow,
+                             "bytes_before": int(X.nbytes), "bytes_after": int(X.nbytes)}
 
-        return X, y
+        if overflow:
+            print(f"[DataLoader] Keeping float64: {overflow} values exceed the float32 range")
+            return X, y
+        if self.dtype_policy == "auto" and not (lossless or (over_budget and tolerable)):
+            return X, y
+
+        X32 = X.astype(np.float32)
+        self.dtype_report.update(to="float32", bytes_after=int(X32.nbytes))
+        print(f"[DataLoader] X float64 → float32 ({X.nbytes / 1024 ** 2:.1f} MB → {X32.nbytes / 1024 ** 2:.1f} MB, "
+              f"max relative error {max_rel_error:.2e})")
+
+        if Config.DATASET_CACHE_ENABLED:
+            from data_loader.dataset_cache import dataset_cache
+            options = self._cache_options(float32=True)
+            if dataset_cache.put(self.filepath, X32, y, options) and mmap:
+                X32, y = dataset_cache.get(self.filepath, options, mmap_mode="r") or (X32, y)
+        return X32, y
+
+    @staticmethod
+    def resolve_dtype_policy(policy, info, max_memory_mb=None):
+        """
+        Settle "auto" from probe() output where the answer is already known:
+        float64 features over the memory budget are downcast. Otherwise the
+        policy is returned unchanged and decided at load time.
+        """
+        policy = policy or Config.DATA_DTYPE_POLICY
+        budget = Config.DATA_MAX_MEMORY_MB if max_memory_mb is None else max_memory_mb
+        estimated = (info.get("rows") or 0) * (info.get("columns") or 0) * 8
+        if policy == "auto" and budget and info.get("dtype") == "float64" and estimated > budget * 1024 ** 2:
+            return "float32"
+        return policy
+
+    def _check_memory_budget(self, X):
+        if self.max_memory_mb and isinstance(X, np.ndarray) and not isinstance(X, np.memmap) \
+                and X.nbytes > self.max_memory_mb * 1024 ** 2:
+            print(f"[DataLoader] ⚠️ X holds {X.nbytes / 1024 ** 2:.1f} MB in memory, over the "
+                  f"{self.max_memory_mb} MB budget (try dtype_policy='float32' or mmap=True)")
+
+    # ------------------------ Metadata Probe ------------------------
+    PROBE_VERSION = 3
+
+    @staticmethod
+    def _label_stats(y):
+        """(binary, num_anomalies) for a label array; num_anomalies is None unless labels are 0/1."""
+        values = np.unique(np.asarray(y))
+        binary = bool(values.size) and set(values.tolist()).issubset({0, 1})
+        return binary, int(np.count_nonzero(np.asarray(y) == 1)) if binary else None
+
+    def probe(self):
+        """
+        Shape and label information without loading the payload:
+        npy header, scipy.io.whosmat (+ the label variable only), CSV header and
+        a line count, Parquet/Feather schema and row counts, graph sizes for .pt. Cached next to the dataset cache entry.
+
+        Returns a dict with format, rows, columns, dtype, label ('array',
+        'Unsupervised', 'time-series' or 'graph'), has_labels, binary_labels,
+        num_anomalies and, for graphs, num_nodes/num_edges/num_features.
+        """
+        if Config.DATASET_CACHE_ENABLED:
+            from data_loader.dataset_cache import dataset_cache
+            cached = dataset_cache.get_probe(self.filepath, self.PROBE_VERSION, self._cache_options())
+            if cached is not None:
+                return cached
+
+        ext = os.path.splitext(self.filepath)[1].lower()
+        info = {"version": self.PROBE_VERSION, "format": ext.lstrip("."), "rows": 0, "columns": 0,
+                "dtype": None, "label": "Unsupervised", "has_labels": False, "binary_labels": False,
+                "num_anomalies": None, "num_nodes": None, "num_edges": None, "num_features": None}
+        try:
+            if ext == ".csv":
+                columns, dtype = infer_schema(self.filepath, sniff_encoding(self.filepath))
+                info.update(rows=count_rows(self.filepath), columns=len(columns),
+                            dtype=str(dtype) if dtype is not None else "object")
+
+            elif ext == ".mat":
+                listed = list_variables(self.filepath)
+                variables = {name: (shape, dtype) for name, shape, dtype in listed}
+                x_name, y_name = select_variables(listed, self.x_var, self.y_var)
+                if x_name:
+                    shape, dtype = variables[x_name]
+                    info.update(rows=shape[0] if shape else 0, columns=shape[1] if len(shape) > 1 else 1,
+                                dtype=dtype, x_var=x_name)
+                if y_name:
+                    binary, anomalies = self._label_stats(read_variable(self.filepath, y_name))
+                    info.update(label="array", has_labels=True, binary_labels=binary, num_anomalies=anomalies,
+                                y_var=y_name)
+
+            elif ext in COLUMNAR_EXTS:
+                # Schema and row count come from file metadata; only the label column is read
+                schema = read_schema(self.filepath)
+                features = feature_columns(schema, self.columns, self.label_column)
+                dtypes = [schema.field(name).type.to_pandas_dtype() for name in features]
+                info.update(rows=columnar_count_rows(self.filepath), columns=len(features),
+                            dtype=str(np.result_type(*dtypes)) if dtypes else None)
+                if self.label_column:
+                    binary, anomalies = self._label_stats(read_label(self.filepath, self.label_column))
+                    info.update(label="array", has_labels=True, binary_labels=binary, num_anomalies=anomalies)
+
+            elif ext == ".npy":
+                try:
+                    arr = np.load(self.filepath, mmap_mode="r")  # maps the file, reads only the header
+                except ValueError:
+                    arr = np.load(self.filepath, allow_pickle=True)
+                shape, dtype = arr.shape, arr.dtype
+                info.update(rows=shape[0] if shape else 0, columns=shape[1] if len(shape) > 1 else 1,
+                            dtype=str(dtype), label="time-series")
+
+            elif ext == ".pt":
+                # Sizes and label stats from the graph cache's meta.json (the file is converted on first sight)
+                meta = graph_metadata(self.filepath)
+                info.update(rows=meta["num_nodes"], columns=meta["num_features"], label="graph",
+                            num_nodes=meta["num_nodes"], num_edges=meta["num_edges"],
+                            num_features=meta["num_features"], has_labels=meta["has_labels"],
+                            binary_labels=meta["binary_labels"], num_anomalies=meta["num_anomalies"])
+
+            else:
+                print(f"❌ Unsupported file: {self.filepath}")
+                return info
+
+        except Exception as e:
+            print(f"❌ Error probing {self.filepath}: {e}")
+            return info
+
+        if Config.DATASET_CACHE_ENABLED:
+            dataset_cache.put_probe(self.filepath, info, self._cache_options())
+        return info
+
+    # ------------------------ Dataset Profile ------------------------
+    def profile(self):
+        """
+        DatasetProfile (meta-features) of the file: one chunked pass over X as
+        stored (memory-mapped from the dataset cache, before any dtype policy),
+        node features for graphs. Cached next to the dataset cache entry.
+        """
+        options = self._cache_options()
+        if Config.DATASET_CACHE_ENABLED:
+            from data_loader.dataset_cache import dataset_cache
+            cached = dataset_cache.get_probe(self.filepath, PROFILE_VERSION, options, kind="profile")
+            if cached is not None:
+                return DatasetProfile.from_dict(cached)
+
+        info = self.probe()
+        ext = os.path.splitext(self.filepath)[1].lower()
+        try:
+            if info["format"] in self.ARRAY_FORMATS and info["rows"]:
+                X, y = self._load_arrays(ext, mmap=True)
+                profile = profile_arrays(X, y) if isinstance(X, np.ndarray) and X.dtype != object \
+                    else DatasetProfile.from_probe(info)
+            elif ext == ".pt" and info["num_nodes"] is not None:
+                data, _ = self._load_arrays(ext, mmap=True)
+                x, y = getattr(data, "x", None), getattr(data, "y", None)
+                profile = profile_arrays(x.numpy(), y.numpy() if y is not None else "graph") if x is not None \
+                    else DatasetProfile.from_probe(info)
+                profile.label, profile.num_nodes, profile.num_edges = "graph", info["num_nodes"], info["num_edges"]
+            else:
+                profile = DatasetProfile.from_probe(info)
+        except Exception as e:
+            print(f"❌ Error profiling {self.filepath}: {e}")
+            return DatasetProfile.from_probe(info)
+
+        if Config.DATASET_CACHE_ENABLED:
+            dataset_cache.put_probe(self.filepath, profile.to_dict(), options, kind="profile")
+        return profile
 
 
 if __name__ == "__main__":
@@ -0,0 +1,207 @@
+# data_loader/dataset_cache.py
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Optional
+
+import numpy as np
+
+from config.config import Config
+
+
+class DatasetCache:
+    """
+    On-disk cache of parsed datasets as .npy files, shared by every process
+    that loads the same file (selector, generated scripts, server stats).
+
+    Entries are keyed by the source file's identity (absolute path, size and
+    mtime, or a content hash with key_mode="content") plus the loader options
+    that shaped the arrays. Hits are opened memory-mapped instead of re-parsed.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 10 * 1024 ** 3, key_mode: str = "stat"):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.key_mode = key_mode
+        self._lock = threading.Lock()
+
+    # ------------------------ Keys ------------------------
+    @staticmethod
+    def _content_hash(path: str, block_size: int = 8 * 1024 * 1024) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def content_hash(self, path: str) -> str:
+        """Hash of the file's bytes, remembered per path/size/mtime so unchanged files are read once."""
+        st = os.stat(path)
+        stat_id = hashlib.sha1(f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}".encode("utf-8")).hexdigest()
+        memo = os.path.join(self.cache_dir, "hashes", stat_id)
+        try:
+            with open(memo, "r", encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            pass
+        digest = self._content_hash(path)
+        try:
+            os.makedirs(os.path.dirname(memo), exist_ok=True)
+            with open(memo, "w", encoding="utf-8") as f:
+                f.write(digest)
+        except OSError:
+            pass
+        return digest
+
+    def make_key(self, path: str, options: dict = None) -> str:
+        st = os.stat(path)
+        if self.key_mode == "content":
+            source = f"content:{self.content_hash(path)}:{st.st_size}"
+        else:
+            source = f"stat:{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}"
+        payload = source + "|" + json.dumps(options or {}, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    # ------------------------ Lookup ------------------------
+    def get(self, path: str, options: dict = None, mmap_mode: Optional[str] = "c"):
+        """
+        (X, y) for a cached parse of path, or None.
+        Arrays are memory-mapped; the default copy-on-write mode keeps them
+        writable for callers without touching the cached files.
+        """
+        entry = self._entry_dir(self.make_key(path, options))
+        meta_path = os.path.join(entry, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            X = np.load(os.path.join(entry, "X.npy"), mmap_mode=mmap_mode)
+            y = np.load(os.path.join(entry, "y.npy"), mmap_mode=mmap_mode) if meta["y_kind"] == "array" \
+                else meta["y_label"]
+        except (OSError, ValueError, KeyError, json.JSONDecodeError) as e:
+            print(f"[DatasetCache] Dropping unreadable entry for {path}: {e}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        os.utime(meta_path)  # recency for LRU eviction
+        return X, y
+
+    @staticmethod
+    def cacheable(X, y) -> bool:
+        """Only plain numeric arrays can be stored without pickling and memory-mapped back."""
+        if not isinstance(X, np.ndarray) or X.dtype == object or X.size == 0:
+            return False
+        return isinstance(y, str) or (isinstance(y, np.ndarray) and y.dtype != object)
+
+    def put(self, path: str, X, y, options: dict = None) -> bool:
+        if not self.cacheable(X, y):
+            return False
+        key = self.make_key(path, options)
+        entry = self._entry_dir(key)
+        if os.path.exists(os.path.join(entry, "meta.json")):
+            return True
+
+        # Write into a private directory and rename it into place, so concurrent
+        # writers never expose a half-written entry
+        tmp = f"{entry}.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(tmp, exist_ok=True)
+        try:
+            np.save(os.path.join(tmp, "X.npy"), X)
+            meta = {"source": os.path.abspath(path), "x_shape": list(X.shape), "x_dtype": str(X.dtype),
+                    "y_kind": "label", "y_label": y, "created_at": time.time()}
+            if isinstance(y, np.ndarray):
+                np.save(os.path.join(tmp, "y.npy"), y)
+                meta.update(y_kind="array", y_label=None)
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            try:
+                os.rename(tmp, entry)
+            except OSError:
+                shutil.rmtree(tmp, ignore_errors=True)  # another process stored it first
+        except OSError as e:
+            print(f"[DatasetCache] Could not store {path}: {e}")
+            shutil.rmtree(tmp, ignore_errors=True)
+            return False
+        self._evict()
+        return True
+
+    # ------------------------ Probes ------------------------
+    # Small JSON summaries (shape, labels, graph size; "profile": meta-features)
+    # stored next to the entry for the same source file, so repeated probes skip even the headers
+    SIDECAR_KINDS = ("probe", "profile")
+
+    def _probe_path(self, path: str, options: dict = None, kind: str = "probe") -> str:
+        return self._entry_dir(self.make_key(path, options)) + f".{kind}.json"
+
+    def get_probe(self, path: str, version: int, options: dict = None, kind: str = "probe") -> Optional[dict]:
+        probe_path = self._probe_path(path, options, kind)
+        try:
+            with open(probe_path, "r", encoding="utf-8") as f:
+                info = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return info if info.get("version") == version else None
+
+    def put_probe(self, path: str, info: dict, options: dict = None, kind: str = "probe") -> None:
+        probe_path = self._probe_path(path, options, kind)
+        tmp = f"{probe_path}.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        try:
+            os.makedirs(os.path.dirname(probe_path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(info, f)
+            os.replace(tmp, probe_path)
+        except OSError as e:
+            print(f"[DatasetCache] Could not store {kind} for {path}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    # ------------------------ Maintenance ------------------------
+    def _entries(self) -> list:
+        """[(last_used, size_bytes, entry_dir)] for every complete entry."""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for shard in os.listdir(self.cache_dir):
+            shard_dir = os.path.join(self.cache_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                entry = os.path.join(shard_dir, name)
+                meta_path = os.path.join(entry, "meta.json")
+                if ".tmp-" in name or not os.path.exists(meta_path):
+                    continue
+                size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+                entries.append((os.path.getmtime(meta_path), size, entry))
+        return entries
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                for kind in self.SIDECAR_KINDS:
+                    if os.path.exists(f"{entry}.{kind}.json"):
+                        os.remove(f"{entry}.{kind}.json")
+                total -= size
+
+    def clear(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {"entries": len(entries), "bytes": sum(size for _, size, _ in entries)}
+
+
+dataset_cache = DatasetCache(Config.DATASET_CACHE_DIR, Config.DATASET_CACHE_MAX_BYTES, Config.DATASET_CACHE_KEY)
@@ -0,0 +1,244 @@
+# data_loader/dataset_profile.py
+"""
+Dataset meta-features for model selection and run statistics: sizes, missing
+and constant features, label contamination, per-feature moments (one chunked
+pass over X, so memory-mapped arrays are streamed) and a few landmarkers
+computed on an evenly spaced row sample.
+"""
+
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+import numpy as np
+
+from config.config import Config
+
+PROFILE_VERSION = 1
+
+
+@dataclass
+class DatasetProfile:
+    rows: int = 0
+    columns: int = 0
+    dtype: Optional[str] = None
+    label: str = "Unsupervised"
+    has_labels: bool = False
+    binary_labels: bool = False
+    num_anomalies: Optional[int] = None
+    contamination: Optional[float] = None
+    # Graphs (.pt): sizes from the graph cache, moments over node features
+    num_nodes: Optional[int] = None
+    num_edges: Optional[int] = None
+    # "arrays" when computed from the data, "probe" when only shapes and labels are known
+    source: str = "probe"
+    nan_count: int = 0
+    nan_columns: int = 0
+    constant_columns: int = 0
+    # Per-feature moments over finite values; kurtosis is excess kurtosis (0 for a normal)
+    mean: list = field(default_factory=list)
+    std: list = field(default_factory=list)
+    skewness: list = field(default_factory=list)
+    kurtosis: list = field(default_factory=list)
+    landmarkers: dict = field(default_factory=dict)
+    version: int = PROFILE_VERSION
+
+    @classmethod
+    def from_probe(cls, info: dict) -> "DatasetProfile":
+        """Profile limited to what DataLoader.probe() reports (no pass over the data)."""
+        profile = cls(rows=info.get("rows") or 0, columns=info.get("columns") or 0, dtype=info.get("dtype"),
+                      label=info.get("label", "Unsupervised"), has_labels=bool(info.get("has_labels")),
+                      binary_labels=bool(info.get("binary_labels")), num_anomalies=info.get("num_anomalies"),
+                      num_nodes=info.get("num_nodes"), num_edges=info.get("num_edges"))
+        if profile.binary_labels and profile.num_anomalies is not None and profile.rows:
+            profile.contamination = profile.num_anomalies / profile.rows
+        return profile
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DatasetProfile":
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def summary(self) -> dict:
+        """to_dict() with the per-feature lists reduced to aggregates, for /metadata."""
+        data = {k: v for k, v in self.to_dict().items() if k not in ("mean", "std", "skewness", "kurtosis")}
+        data.update(_moment_aggregates(self))
+        return data
+
+    def meta_features(self) -> dict:
+        """Readable meta-features for the model selection prompts; empty for probe-only profiles."""
+        features = {}
+        if self.contamination is not None:
+            features["Contamination"] = f"{self.contamination:.2%} ({self.num_anomalies} labeled anomalies)"
+        if self.source != "arrays":
+            return features
+        features["Missing Values"] = f"{self.nan_count} in {self.nan_columns} features"
+        features["Constant Features"] = self.constant_columns
+        aggregates = _moment_aggregates(self)
+        if aggregates["mean_abs_skewness"] is not None:
+            features["Mean |Skewness|"] = f"{aggregates['mean_abs_skewness']:.3f}"
+            features["Mean Excess Kurtosis"] = f"{aggregates['mean_kurtosis']:.3f}"
+            features["Heavy-Tailed Features"] = f"{aggregates['heavy_tailed_fraction']:.0%}"
+        names = {"pca_top1_variance": ("Top Principal Component Variance", "{:.0%}"),
+                 "pca_components_90": ("Principal Components for 90% Variance", "{}"),
+                 "mean_abs_correlation": ("Mean |Feature Correlation|", "{:.3f}"),
+                 "distance_contrast": ("Relative Distance Contrast", "{:.3f}"),
+                 "knn_auc": ("kNN Outlier Score AUC on Labels", "{:.3f}")}
+        for key, (name, fmt) in names.items():
+            if self.landmarkers.get(key) is not None:
+                features[name] = fmt.format(self.landmarkers[key])
+        return features
+
+
+def _moment_aggregates(profile: DatasetProfile) -> dict:
+    skew = np.array([v for v in profile.skewness if v is not None], dtype=np.float64)
+    kurt = np.array([v for v in profile.kurtosis if v is not None], dtype=np.float64)
+    if not skew.size:
+        return {"mean_abs_skewness": None, "mean_kurtosis": None, "heavy_tailed_fraction": None}
+    return {"mean_abs_skewness": float(np.abs(skew).mean()), "mean_kurtosis": float(kurt.mean()),
+            "heavy_tailed_fraction": float(np.mean(kurt > 3))}
+
+
+# ------------------------ Moments ------------------------
+def _merge_moments(a, b):
+    """
+    Combine per-column (n, mean, M2, M3, M4) of two row blocks (pairwise update
+    formulas of Chan et al. / Pebay), so the pass never holds more than a chunk.
+    """
+    na, mean_a, m2a, m3a, m4a = a
+    nb, mean_b, m2b, m3b, m4b = b
+    n = na + nb
+    safe = np.maximum(n, 1)
+    delta = mean_b - mean_a
+    mean = mean_a + delta * nb / safe
+    m2 = m2a + m2b + delta ** 2 * na * nb / safe
+    m3 = (m3a + m3b + delta ** 3 * na * nb * (na - nb) / safe ** 2
+          + 3 * delta * (na * m2b - nb * m2a) / safe)
+    m4 = (m4a + m4b + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / safe ** 3
+          + 6 * delta ** 2 * (na ** 2 * m2b + nb ** 2 * m2a) / safe ** 2 + 4 * delta * (na * m3b - nb * m3a) / safe)
+    return n, mean, m2, m3, m4
+
+
+def _block_moments(block: np.ndarray, valid: np.ndarray):
+    n = valid.sum(axis=0).astype(np.float64)
+    mean = np.where(valid, block, 0).sum(axis=0) / np.maximum(n, 1)
+    d = np.where(valid, block - mean, 0)
+    d2 = d * d
+    return n, mean, d2.sum(axis=0), (d2 * d).sum(axis=0), (d2 * d2).sum(axis=0)
+
+
+def _as_2d(X) -> np.ndarray:
+    if X.ndim == 1:
+        return X.reshape(-1, 1)
+    return X.reshape(X.shape[0], -1) if X.ndim > 2 else X
+
+
+# ------------------------ Landmarkers ------------------------
+def _rank_auc(scores: np.ndarray, labels: np.ndarray) -> Optional[float]:
+    from scipy.stats import rankdata
+    pos = labels == 1
+    n_pos, n_neg = int(pos.sum()), int((~pos).sum())
+    if not n_pos or not n_neg:
+        return None
+    ranks = rankdata(scores)
+    return float((ranks[pos].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))
+
+
+def _landmarkers(sample: np.ndarray, mean: np.ndarray, std: np.ndarray, labels=None, k: int = 5) -> dict:
+    """Cheap structure indicators on a row sample: PCA spectrum, correlation, distance contrast, kNN AUC."""
+    keep = std > 0
+    if sample.shape[0] < 3 or not keep.any():
+        return {}
+    Z = (sample[:, keep] - mean[keep]) / std[keep]
+    Z = np.where(np.isfinite(Z), Z, 0.0)  # missing values at the column mean
+    result = {}
+
+    singular = np.linalg.svd(Z, compute_uv=False)
+    var = singular ** 2
+    if var.sum() > 0:
+        ratio = var / var.sum()
+        result["pca_top1_variance"] = float(ratio[0])
+        result["pca_components_90"] = int(np.searchsorted(np.cumsum(ratio), 0.9) + 1)
+
+    cols = Z[:, :256]  # correlation of the first features bounds the cost on wide data
+    if cols.shape[1] > 1:
+        corr = (cols.T @ cols) / (cols.shape[0] - 1)
+        off = ~np.eye(corr.shape[0], dtype=bool)
+        result["mean_abs_correlation"] = float(np.clip(np.abs(corr[off]), 0, 1).mean())
+
+    sq = np.einsum("ij,ij->i", Z, Z)
+    dist = np.sqrt(np.maximum(sq[:, None] + sq[None, :] - 2 * (Z @ Z.T), 0))
+    np.fill_diagonal(dist, np.nan)
+    nearest, farthest = np.nanmin(dist, axis=1), np.nanmax(dist, axis=1)
+    ok = nearest > 0
+    if ok.any():
+        # (farthest - nearest) / nearest shrinks towards 0 as distances concentrate in high dimensions
+        result["distance_contrast"] = float(np.median((farthest[ok] - nearest[ok]) / nearest[ok]))
+    if labels is not None:
+        k = min(k, Z.shape[0] - 1)
+        knn = np.sort(np.where(np.isnan(dist), np.inf, dist), axis=1)[:, :k].mean(axis=1)
+        result["knn_auc"] = _rank_auc(knn, labels)
+    return result
+
+
+# ------------------------ Profiling ------------------------
+def profile_arrays(X, y=None, chunk_rows: int = 65536, sample_rows: int = None) -> DatasetProfile:
+    """
+    Profile of features X (any numeric array, including np.memmap) and labels y
+    (an array, or a string label such as "Unsupervised").
+    """
+    sample_rows = sample_rows or Config.PROFILE_SAMPLE_ROWS
+    flat = _as_2d(X)
+    rows, columns = flat.shape
+    profile = DatasetProfile(rows=rows, columns=columns, dtype=str(X.dtype), source="arrays")
+
+    labels = None
+    if isinstance(y, np.ndarray):
+        labels = y.reshape(-1)
+        values = np.unique(labels)
+        profile.label, profile.has_labels = "array", True
+        profile.binary_labels = bool(values.size) and set(values.tolist()).issubset({0, 1})
+        if profile.binary_labels:
+            profile.num_anomalies = int(np.count_nonzero(labels == 1))
+            profile.contamination = profile.num_anomalies / max(labels.size, 1)
+        if labels.size != rows or not profile.binary_labels:
+            labels = None  # only 0/1 labels aligned with X feed the kNN landmarker
+    elif isinstance(y, str):
+        profile.label = y
+
+    if not rows or not columns:
+        return profile
+
+    acc = (np.zeros(columns),) * 5
+    nan_per_column = np.zeros(columns, dtype=np.int64)
+    low, high = np.full(columns, np.inf), np.full(columns, -np.inf)
+    for start in range(0, rows, chunk_rows):
+        block = np.asarray(flat[start:start + chunk_rows], dtype=np.float64)
+        nan_per_column += np.isnan(block).sum(axis=0)
+        valid = np.isfinite(block)
+        acc = _merge_moments(acc, _block_moments(block, valid))
+        np.minimum(low, np.where(valid, block, np.inf).min(axis=0), out=low)
+        np.maximum(high, np.where(valid, block, -np.inf).max(axis=0), out=high)
+
+    n, mean, m2, m3, m4 = acc
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = np.where(n > 0, m2 / np.maximum(n, 1), np.nan)
+        std = np.sqrt(var)
+        skew = np.where(var > 0, (m3 / np.maximum(n, 1)) / var ** 1.5, np.nan)
+        kurt = np.where(var > 0, (m4 / np.maximum(n, 1)) / var ** 2 - 3, np.nan)
+
+    def as_list(a):
+        return [float(v) if np.isfinite(v) else None for v in a]
+
+    profile.nan_count = int(nan_per_column.sum())
+    profile.nan_columns = int(np.count_nonzero(nan_per_column))
+    # All-missing columns count as constant
+    profile.constant_columns = int(np.count_nonzero(~(high > low)))
+    profile.mean, profile.std, profile.skewness, profile.kurtosis = (as_list(mean), as_list(std),
+                                                                     as_list(skew), as_list(kurt))
+
+    idx = np.unique(np.linspace(0, rows - 1, min(rows, sample_rows)).astype(np.int64))
+    sample = np.asarray(flat[idx], dtype=np.float64)
+    profile.landmarkers = _landmarkers(sample, mean, np.nan_to_num(std), labels[idx] if labels is not None else None)
+    return profile
@@ -0,0 +1,199 @@
+# data_loader/graph_cache.py
+"""
+Compact, memory-mappable copies of PyGOD .pt graphs (pickled torch_geometric
+Data objects), so each file is unpickled once instead of in every process.
+
+An entry holds node features, CSR adjacency (indptr / indices), labels and any
+other node- or edge-level tensors as .npy files, plus a meta.json with the
+graph sizes that probe() reads without touching the arrays.
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Optional
+
+import numpy as np
+
+from config.config import Config
+from data_loader.dataset_cache import DatasetCache
+
+GRAPH_FORMAT_VERSION = 1
+
+
+def _torch_load(path: str):
+    import torch
+    try:
+        # Zip-format checkpoints: tensor storages are mapped, not read, until used
+        return torch.load(path, map_location="cpu", weights_only=False, mmap=True)
+    except (RuntimeError, TypeError):  # legacy (non-zip) files, or a torch without mmap support
+        return torch.load(path, map_location="cpu", weights_only=False)
+
+
+def _label_stats(y: np.ndarray):
+    values = np.unique(y)
+    binary = bool(values.size) and set(values.tolist()).issubset({0, 1})
+    return binary, int(np.count_nonzero(y == 1)) if binary else None
+
+
+def to_csr(edge_index: np.ndarray, num_nodes: int):
+    """(indptr, indices, order) with edges sorted by (source, target); order maps CSR slots to input edges."""
+    src, dst = edge_index[0], edge_index[1]
+    order = np.lexsort((dst, src))
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=num_nodes), out=indptr[1:])
+    index_dtype = np.int32 if num_nodes < 2 ** 31 else np.int64
+    return indptr, dst[order].astype(index_dtype), order
+
+
+def csr_edge_index(indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    src = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+    return np.stack([src, indices.astype(np.int64)])
+
+
+class GraphCache(DatasetCache):
+    """DatasetCache keyed by file content, holding graphs instead of X / y arrays."""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 10 * 1024 ** 3):
+        super().__init__(cache_dir, max_bytes, key_mode="content")
+
+    # ------------------------ Convert ------------------------
+    def convert(self, path: str, data) -> Optional[dict]:
+        """
+        Store the graph loaded from path in compact form; returns its metadata,
+        or None if it has attributes the layout cannot represent.
+        """
+        import torch
+
+        if not hasattr(data, "num_nodes") or getattr(data, "edge_index", None) is None:
+            print(f"[GraphCache] {path} is not a torch_geometric graph; not cached")
+            return None
+        num_nodes, num_edges = int(data.num_nodes), int(data.edge_index.size(1))
+
+        node_attrs, edge_attrs = [], []
+        for key in data.keys():
+            value = data[key]
+            if key in ("edge_index", "num_nodes"):  # stored as CSR / in meta.json
+                continue
+            if not isinstance(value, torch.Tensor) or value.is_sparse:
+                print(f"[GraphCache] {path}: attribute '{key}' is not a dense tensor; not cached")
+                return None
+            if data.is_edge_attr(key):
+                edge_attrs.append(key)
+            elif data.is_node_attr(key):
+                node_attrs.append(key)
+            else:
+                print(f"[GraphCache] {path}: attribute '{key}' is neither node- nor edge-level; not cached")
+                return None
+
+        edge_index = data.edge_index.cpu().numpy()
+        indptr, indices, order = to_csr(edge_index, num_nodes)
+        arrays = {"indptr": indptr, "indices": indices}
+        for key in node_attrs:
+            arrays[f"node_{key}"] = data[key].detach().cpu().numpy()
+        for key in edge_attrs:
+            arrays[f"edge_{key}"] = data[key].detach().cpu().numpy()[order]  # follow the CSR edge order
+
+        meta = {"version": GRAPH_FORMAT_VERSION, "source": os.path.abspath(path), "num_nodes": num_nodes,
+                "num_edges": num_edges, "num_features": int(data.num_features), "node_attrs": node_attrs,
+                "edge_attrs": edge_attrs, "has_labels": "y" in node_attrs, "binary_labels": False,
+                "num_anomalies": None, "created_at": time.time()}
+        if "y" in node_attrs:
+            meta["binary_labels"], meta["num_anomalies"] = _label_stats(arrays["node_y"])
+
+        entry = self._entry_dir(self.make_key(path))
+        tmp = f"{entry}.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(tmp, exist_ok=True)
+        try:
+            for name, arr in arrays.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), arr)
+            self._validate(tmp, meta, edge_index[:, order], arrays)
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            try:
+                os.rename(tmp, entry)
+            except OSError:
+                shutil.rmtree(tmp, ignore_errors=True)  # another process stored it first
+        except (OSError, ValueError) as e:
+            print(f"[GraphCache] Could not store {path}: {e}")
+            shutil.rmtree(tmp, ignore_errors=True)
+            return None
+        self._evict()
+        print(f"[GraphCache] Stored {path}: {num_nodes} nodes, {num_edges} edges")
+        return meta
+
+    @staticmethod
+    def _validate(entry: str, meta: dict, sorted_edges: np.ndarray, arrays: dict) -> None:
+        """Check the written files reproduce the graph (edges in CSR order) once, at conversion time."""
+        indptr = np.load(os.path.join(entry, "indptr.npy"), mmap_mode="r")
+        indices = np.load(os.path.join(entry, "indices.npy"), mmap_mode="r")
+        if indptr[-1] != meta["num_edges"] or len(indptr) != meta["num_nodes"] + 1:
+            raise ValueError("CSR sizes do not match the graph")
+        if not np.array_equal(csr_edge_index(indptr, indices), sorted_edges):
+            raise ValueError("CSR adjacency does not reproduce edge_index")
+        for name, arr in arrays.items():
+            stored = np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="r")
+            if stored.shape != arr.shape or stored.dtype != arr.dtype:
+                raise ValueError(f"{name} changed shape or dtype on disk")
+
+    # ------------------------ Lookup ------------------------
+    def metadata(self, path: str) -> Optional[dict]:
+        entry = self._entry_dir(self.make_key(path))
+        try:
+            with open(os.path.join(entry, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return meta if meta.get("version") == GRAPH_FORMAT_VERSION else None
+
+    def get_graph(self, path: str, meta: dict):
+        """Rebuild the Data object over copy-on-write memory maps of the entry's arrays."""
+        import torch
+        from torch_geometric.data import Data
+
+        entry = self._entry_dir(self.make_key(path))
+
+        def load(name):
+            return torch.from_numpy(np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="c"))
+
+        indptr = np.load(os.path.join(entry, "indptr.npy"), mmap_mode="r")
+        indices = np.load(os.path.join(entry, "indices.npy"), mmap_mode="r")
+        attrs = {key: load(f"node_{key}") for key in meta["node_attrs"]}
+        attrs.update({key: load(f"edge_{key}") for key in meta["edge_attrs"]})
+        data = Data(edge_index=torch.from_numpy(csr_edge_index(indptr, indices)), **attrs)
+        if "x" not in attrs:
+            data.num_nodes = meta["num_nodes"]
+        os.utime(os.path.join(entry, "meta.json"))  # recency for LRU eviction
+        return data
+
+
+graph_cache = GraphCache(Config.GRAPH_CACHE_DIR, Config.DATASET_CACHE_MAX_BYTES)
+
+
+def graph_metadata(path: str) -> dict:
+    """num_nodes / num_edges / num_features / label stats, converting the file on first sight."""
+    meta = graph_cache.metadata(path)
+    if meta is None:
+        data = _torch_load(path)
+        meta = graph_cache.convert(path, data)
+        if meta is None:
+            meta = {"num_nodes": int(data.num_nodes), "num_edges": int(data.num_edges),
+                    "num_features": int(data.num_features), "has_labels": False, "binary_labels": False,
+                    "num_anomalies": None}
+            if getattr(data, "y", None) is not None:
+                meta["has_labels"] = True
+                meta["binary_labels"], meta["num_anomalies"] = _label_stats(data.y.cpu().numpy())
+    return meta
+
+
+def load_graph(path: str):
+    """The graph at path, from the compact cache when possible."""
+    meta = graph_cache.metadata(path)
+    if meta is None:
+        data = _torch_load(path)
+        meta = graph_cache.convert(path, data)
+        if meta is None:
+            return data
+    return graph_cache.get_graph(path, meta)
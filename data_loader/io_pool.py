@@ -0,0 +1,31 @@
+# data_loader/io_pool.py
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from config.config import Config
+
+# Shared by all runs in the process; dataset reads are mostly I/O and C-level
+# parsing (pandas / pyarrow / numpy release the GIL), so threads overlap well
+_executor = ThreadPoolExecutor(max_workers=Config.DATA_IO_WORKERS, thread_name_prefix="data-io")
+
+# Fire-and-forget work (full-file preloads, run recording) gets its own workers so
+# a run's blocking probes never queue behind other runs' multi-second parses
+_background = ThreadPoolExecutor(max_workers=Config.DATA_BACKGROUND_WORKERS, thread_name_prefix="data-io-bg")
+
+
+def submit(fn, *args, **kwargs) -> Future:
+    """Work a caller is waiting for (probes)."""
+    return _executor.submit(fn, *args, **kwargs)
+
+
+def submit_background(fn, *args, **kwargs) -> Future:
+    """Work nobody waits for; runs behind other background jobs, never ahead of submit()."""
+    return _background.submit(fn, *args, **kwargs)
+
+
+def timed(fn, *args, **kwargs):
+    """(result, seconds) of fn(*args, **kwargs)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
@@ -0,0 +1,116 @@
+# data_loader/mat_reader.py
+"""
+.mat access by variable: scipy.io for v4/v5 files, h5py for v7.3 (HDF5) files.
+Only the selected X / y variables are read; v7.3 variables are opened lazily
+and copied in row chunks into a preallocated array.
+"""
+
+import numpy as np
+import scipy.io
+import scipy.sparse
+
+# Preferred variable names, checked before falling back to file order
+X_NAMES = ("X", "x", "data", "Data", "features", "feature", "fea")
+Y_NAMES = ("y", "Y", "label", "labels", "Label", "gt", "gnd", "target")
+
+# MATLAB classes reported by scipy.io.whosmat -> NumPy dtype names
+MAT_DTYPES = {"double": "float64", "single": "float32", "logical": "bool", "int8": "int8",
+              "uint8": "uint8", "int16": "int16", "uint16": "uint16", "int32": "int32",
+              "uint32": "uint32", "int64": "int64", "uint64": "uint64",
+              # MATLAB sparse matrices are double (or logical); read_variable densifies them
+              "sparse": "float64"}
+
+
+def is_v73(path: str) -> bool:
+    return scipy.io.matlab.matfile_version(path)[0] == 2
+
+
+def _h5py():
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("h5py is required to read MATLAB v7.3 (.mat HDF5) files: pip install h5py")
+    return h5py
+
+
+def list_variables(path: str) -> list:
+    """[(name, shape, dtype name)] of the numeric (dense or sparse) variables, in file order."""
+    if not is_v73(path):
+        return [(name, tuple(shape), MAT_DTYPES[cls]) for name, shape, cls in scipy.io.whosmat(path)
+                if cls in MAT_DTYPES and not name.startswith("__")]
+    h5py = _h5py()
+    variables = []
+    with h5py.File(path, "r") as f:
+        for name, obj in f.items():
+            # MATLAB keeps cell/struct payloads under "#refs#" and stores object references otherwise
+            if name.startswith("#") or not isinstance(obj, h5py.Dataset) or obj.dtype.kind not in "biuf":
+                continue
+            # HDF5 holds MATLAB's column-major arrays transposed
+            variables.append((name, tuple(obj.shape[::-1]), str(obj.dtype)))
+    return variables
+
+
+def select_variables(variables: list, x_name: str = None, y_name: str = None):
+    """(x_name, y_name) for load_data: explicit names, then conventional names, then file order."""
+    names = [v[0] for v in variables]
+    for wanted in (x_name, y_name):
+        if wanted and wanted not in names:
+            raise KeyError(f"variable '{wanted}' not in file (has {', '.join(names) or 'none'})")
+    x_name = x_name or next((n for n in X_NAMES if n in names), None) or \
+        next((n for n in names if n != y_name), None)
+    rest = [n for n in names if n != x_name]
+    y_name = y_name or next((n for n in Y_NAMES if n in rest), None) or (rest[0] if rest else None)
+    return x_name, y_name
+
+
+class LazyMatVariable:
+    """A v7.3 variable read on demand: shape/dtype from metadata, rows sliced from disk."""
+
+    def __init__(self, path: str, name: str):
+        self._file = _h5py().File(path, "r")
+        self._ds = self._file[name]
+        self.name = name
+        self.shape = tuple(self._ds.shape[::-1])
+        self.dtype = self._ds.dtype
+
+    def __len__(self):
+        return self.shape[0]
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        """Rows [start, stop) in MATLAB orientation (HDF5 stores them as columns)."""
+        if self._ds.ndim == 1:
+            return self._ds[start:stop]
+        return self._ds[..., start:stop].T
+
+    def read(self, chunk_rows: int = 65536) -> np.ndarray:
+        out = np.empty(self.shape, dtype=self.dtype)
+        for start in range(0, self.shape[0], chunk_rows):
+            stop = min(start + chunk_rows, self.shape[0])
+            out[start:stop] = self.rows(start, stop)
+        return out
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_variable(path: str, name: str, chunk_rows: int = 65536) -> np.ndarray:
+    if not is_v73(path):
+        value = scipy.io.loadmat(path, variable_names=[name])[name]
+        # Sparse X/y (v5 "sparse" class) load as scipy.sparse; the loaders and dataset cache expect ndarrays
+        return value.toarray() if scipy.sparse.issparse(value) else value
+    with LazyMatVariable(path, name) as var:
+        return var.read(chunk_rows)
+
+
+def load_mat(path: str, x_name: str = None, y_name: str = None):
+    """(X, y) with y = "Unsupervised" when the file has no label variable."""
+    x_name, y_name = select_variables(list_variables(path), x_name, y_name)
+    X = read_variable(path, x_name) if x_name else np.empty((0, 0))
+    y = read_variable(path, y_name) if y_name else "Unsupervised"
+    return X, y
@@ -1,4 +1,5 @@
 import logging, sys, operator
+from functools import wraps
 from typing import TypedDict, Annotated, Sequence, Any, Tuple
 
 from langgraph.graph import StateGraph, END
@@ -11,6 +12,10 @@ from agents.agent_reviewer import AgentReviewer
 from agents.agent_evaluator import AgentEvaluator
 from agents.agent_optimizer import AgentOptimizer
 from entity.code_quality import CodeQuality
+from config.config import Config
+from utils.llm_usage import set_run_context, usage_tracker
+from utils.doc_prefetch import DocPrefetch
+from utils.retrieval_index import load_vectorstore
 
 logging.basicConfig(stream=sys.stdout, level=logging.ERROR)
 
@@ -36,11 +41,32 @@ class FullToolState(TypedDict):
     results: dict | None
     algorithm_doc: str | None
     log_fn: Any
+    run_id: str | None
+    llm_usage: dict | None
+    doc_prefetch: Any | None
+    dtype_policy: str | None
+
+
+def bind_run(node):
+    """Tag LLM calls made inside a graph node with the state's run_id."""
+    @wraps(node)
+    def wrapper(state: FullToolState):
+        set_run_context(state.get("run_id"))
+        return node(state)
+    return wrapper
 
 
 def call_processor(state: FullToolState) -> dict:
     state["log_fn"]("[Processor] Starting pipeline…")
     state["log_fn"](f"[Processor] Parsed config → {state['experiment_config']}")
+
+    # Docs do not depend on the data: fetch them while the selector loads the dataset
+    if Config.DOC_PREFETCH_ENABLED and state.get("agent_info_miner"):
+        prefetch = DocPrefetch(state["agent_info_miner"], state.get("vectorstore") or load_vectorstore())
+        targets = prefetch.start(state["experiment_config"] or {})
+        if targets:
+            state["log_fn"](f"[Prefetch] Fetching docs in background → {', '.join(a for a, _ in targets)}")
+        state["doc_prefetch"] = prefetch
     return state
 
 
@@ -55,6 +81,7 @@ def call_selector(state: FullToolState) -> dict:
         package_name=selector.package_name,
         vectorstore=selector.vectorstore,
         current_tool=selector.tools[0],
+        dtype_policy=selector.dtype_policy,
     )
     state["log_fn"](f"[Selector] Final model → {state['current_tool']}")
     return state
@@ -63,7 +90,14 @@ def call_selector(state: FullToolState) -> dict:
 def call_info_miner(state: FullToolState) -> dict:
     tool = state["current_tool"]
     state["log_fn"](f"[InfoMiner] Fetching documentation for {tool}…")
-    doc = state["agent_info_miner"].query_docs(tool, state["vectorstore"], state["package_name"])
+    prefetch = state.get("doc_prefetch")
+    doc = prefetch.get(tool, state["package_name"]) if prefetch else None
+    if prefetch:
+        prefetch.cancel_pending()
+    if doc:
+        state["log_fn"](f"[InfoMiner] Using prefetched documentation for {tool}")
+    else:
+        doc = state["agent_info_miner"].query_docs(tool, state["vectorstore"], state["package_name"])
     return {"algorithm_doc": doc}
 
 
@@ -76,9 +110,12 @@ def call_code_generator(state: FullToolState) -> dict:
         state["data_path_test"],
         state["algorithm_doc"],
         state["input_parameters"],
-        state["package_name"]
+        state["package_name"],
+        stream=Config.LLM_STREAM_CODEGEN,
+        log_fn=state["log_fn"],
+        dtype_policy=state.get("dtype_policy"),
     )
-    params = state["agent_code_generator"]._extract_init_params_dict(state["algorithm_doc"])
+    params = state["agent_code_generator"].init_params(tool, state["package_name"], state["algorithm_doc"])
     state["code_quality"] = CodeQuality(code, tool, params, "", "", -1, -1, [], 0)
     return state
 
@@ -119,18 +156,24 @@ def call_optimizer(state: FullToolState):
         }
     }
 
+    # Feed the local model selector's history (runs with a valid AUROC only)
+    if state.get("agent_selector"):
+        state["agent_selector"].record_result(tool, final_result["metrics"])
+
+    state["llm_usage"] = usage_tracker.summary(state.get("run_id"))
+    final_result["llm_usage"] = state["llm_usage"]
     state["results"] = final_result
     return state
 
 
 graph = StateGraph(FullToolState)
-graph.add_node("processor", call_processor)
-graph.add_node("selector", call_selector)
-graph.add_node("info", call_info_miner)
-graph.add_node("code", call_code_generator)
-graph.add_node("review", call_reviewer)
-graph.add_node("eval", call_evaluator)
-graph.add_node("opt", call_optimizer)
+graph.add_node("processor", bind_run(call_processor))
+graph.add_node("selector", bind_run(call_selector))
+graph.add_node("info", bind_run(call_info_miner))
+graph.add_node("code", bind_run(call_code_generator))
+graph.add_node("review", bind_run(call_reviewer))
+graph.add_node("eval", bind_run(call_evaluator))
+graph.add_node("opt", bind_run(call_optimizer))
 
 graph.set_entry_point("processor")
 graph.add_edge("processor", "selector")
@@ -17,6 +17,8 @@ from agents.agent_code_generator import AgentCodeGenerator
 from agents.agent_reviewer import AgentReviewer
 from agents.agent_evaluator import AgentEvaluator
 from agents.agent_optimizer import AgentOptimizer
+from utils.llm_usage import set_run_context, usage_tracker
+from utils.gemini_client import get_client_stats
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'ad-agent-secret-key-change-in-production'
@@ -47,7 +49,10 @@ METADATA = {}
 
 def run_pipeline(run_id, cmd, train, test):
     LOG_BUFFERS[run_id] = []
-    METADATA[run_id] = {"processor_output": None, "selector_output": None, "dataset_stats": {}}
+    METADATA[run_id] = {"processor_output": None, "selector_output": None, "dataset_stats": {}, "llm_usage": None,
+                        "data_load": {}, "dataset_profile": {}}
+    # Every LLM call made by this pipeline thread is accounted under run_id
+    set_run_context(run_id)
 
     def log(msg):
         print(msg)
@@ -110,6 +115,10 @@ def run_pipeline(run_id, cmd, train, test):
             "results": None,
             "algorithm_doc": None,
             "log_fn": log,
+            "run_id": run_id,
+            "llm_usage": None,
+            "doc_prefetch": None,
+            "dtype_policy": None,
         }
 
         log("PIPELINE START")
@@ -119,29 +128,30 @@ def run_pipeline(run_id, cmd, train, test):
             selector = final["agent_selector"]
             METADATA[run_id]["selector_output"] = {
                 "algorithm": selector.algorithm_name,
-                "package": selector.package_name
+                "package": selector.package_name,
+                "selection": selector.selection
             }
+            # Per-file probe / background load seconds (preload may still be running)
+            METADATA[run_id]["data_load"] = {role: dict(t) for role, t in selector.load_timings.items()}
 
-        # Compute dataset statistics
+        # Compute dataset statistics from the selector's profile of the run's columns (probe-only in
+        # strict / run-all mode); without a selector only the header is probed, never the full file
         try:
             from data_loader.data_loader import DataLoader
-            train_loader = DataLoader(train, store_script=False)
-            X_train, y_train = train_loader.load_data(split_data=False)
-
-            import numpy as np
-            if isinstance(X_train, np.ndarray):
-                num_samples = X_train.shape[0]
-                num_features = X_train.shape[1] if len(X_train.shape) > 1 else 1
-
-                if isinstance(y_train, np.ndarray) and set(np.unique(y_train)).issubset({0, 1}):
-                    num_anomalies = int(np.sum(y_train == 1))
-                else:
-                    num_anomalies = "Unknown"
-
+            from data_loader.dataset_profile import DatasetProfile
+            selector = final.get("agent_selector")
+            profile = getattr(selector, "train_profile", None)
+            if profile is None:
+                loader = DataLoader(cfg["dataset_train"], store_script=False, columns=cfg.get("columns"),
+                                    label_column=cfg.get("label_column"))
+                profile = DatasetProfile.from_probe(loader.probe())
+            METADATA[run_id]["dataset_profile"] = profile.summary()
+
+            if profile.label != "graph" and profile.rows:
                 METADATA[run_id]["dataset_stats"] = {
-                    "num_samples": num_samples,
-                    "num_features": num_features,
-                    "num_anomalies": num_anomalies
+                    "num_samples": profile.rows,
+                    "num_features": profile.columns,
+                    "num_anomalies": profile.num_anomalies if profile.binary_labels else "Unknown"
                 }
             else:
                 METADATA[run_id]["dataset_stats"] = {
@@ -157,13 +167,16 @@ def run_pipeline(run_id, cmd, train, test):
                 "num_anomalies": "Unknown"
             }
 
+        METADATA[run_id]["llm_usage"] = usage_tracker.summary(run_id)
         result_data = final.get("results", {})
         if isinstance(result_data, dict):
             result_data["dataset_stats"] = METADATA[run_id]["dataset_stats"]
+            result_data["llm_usage"] = METADATA[run_id]["llm_usage"]
         RESULTS[run_id] = result_data
         log("DONE")
 
     except Exception as e:
+        METADATA[run_id]["llm_usage"] = usage_tracker.summary(run_id)
         RESULTS[run_id] = []
         LOG_BUFFERS[run_id].append(f"[ERROR] {str(e)}")
         LOG_BUFFERS[run_id].append("DONE")
@@ -224,6 +237,20 @@ def get_metadata(run_id):
     return jsonify(metadata), 200
 
 
+@app.get("/usage/<run_id>")
+def get_usage(run_id):
+    if run_id not in METADATA:
+        return jsonify({"error": "No usage found"}), 404
+    summary = usage_tracker.summary(run_id)
+    summary["calls"] = usage_tracker.records(run_id)
+    return jsonify(summary), 200
+
+
+@app.get("/usage")
+def get_llm_stats():
+    return jsonify(get_client_stats()), 200
+
+
 # ========== AUTH ENDPOINTS ==========
 @app.route("/auth/signup", methods=["POST", "OPTIONS"])
 def signup():
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from data_loader.csv_reader import read_csv_array
+
+
+def _write(tmp_path, frame):
+    path = tmp_path / "data.csv"
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_default_engine_matches_read_csv_bit_for_bit(tmp_path):
+    rng = np.random.default_rng(0)
+    path = _write(tmp_path, pd.DataFrame(rng.normal(scale=1e3, size=(2500, 8))))
+    expected = pd.read_csv(path).values
+
+    X = read_csv_array(path, chunk_rows=300)
+    assert X.dtype == expected.dtype
+    assert np.array_equal(X.view(np.uint64), expected.view(np.uint64))
+
+
+def test_integer_and_mixed_frames_match_read_csv(tmp_path):
+    rng = np.random.default_rng(1)
+    frame = pd.DataFrame({"a": rng.integers(0, 100, 500), "b": rng.random(500), "label": rng.integers(0, 2, 500)})
+    path = _write(tmp_path, frame)
+    expected = pd.read_csv(path).values
+
+    X = read_csv_array(path, chunk_rows=64)
+    assert X.dtype == expected.dtype
+    assert np.array_equal(X, expected)
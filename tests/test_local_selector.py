@@ -0,0 +1,53 @@
+import numpy as np
+import scipy.io
+
+import agents.agent_selector as agent_selector
+from ad_model_selection.local_selector import LocalSelector, RunHistory
+from data_loader.dataset_profile import profile_arrays
+
+
+def _profile(seed, rows=500):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, 4))
+    y = (rng.random(rows) < 0.5).astype(int)
+    return profile_arrays(X, y)
+
+
+def _selector(tmp_path, algorithm, auroc, datasets=5):
+    selector = LocalSelector(RunHistory(str(tmp_path / "history.sqlite3")), k=5, min_support=3)
+    for i in range(datasets):
+        selector.record("darts", f"d{i}", _profile(i), algorithm, auroc)
+    return selector
+
+
+def test_agreement_on_a_good_model_is_confident(tmp_path):
+    selection = _selector(tmp_path, "DLinear", 0.85).rank("darts", _profile(99))
+    assert selection.algorithm == "DLinear"
+    assert selection.confidence >= 0.6
+
+
+def test_agreement_on_a_poor_model_is_not_confident(tmp_path):
+    # Every neighbour only ever ran DLinear, and it did worse than chance there
+    selection = _selector(tmp_path, "DLinear", 0.2).rank("darts", _profile(99))
+    assert selection.algorithm == "DLinear"
+    assert selection.confidence == 0.0
+
+
+def test_selector_defers_to_llm_on_poor_history(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    selector = _selector(tmp_path, "DLinear", 0.2)
+    calls = []
+    monkeypatch.setattr(agent_selector, "get_local_selector", lambda: selector)
+    monkeypatch.setattr(agent_selector, "load_vectorstore", lambda: None)
+    monkeypatch.setattr(agent_selector, "query_gemini",
+                        lambda prompt, **kwargs: calls.append(prompt) or '{"choice": "TimesNet"}')
+
+    rng = np.random.default_rng(7)
+    scipy.io.savemat(tmp_path / "train.mat", {"X": rng.normal(size=(300, 4)),
+                                              "y": (rng.random((300, 1)) < 0.5).astype(float)})
+    agent = agent_selector.AgentSelector({"algorithm": [], "dataset_train": str(tmp_path / "train.mat")})
+
+    assert agent.package_name == "darts"
+    assert agent.selection["source"] == "llm"
+    assert agent.selection["local_choice"] == "DLinear"
+    assert calls and agent.algorithm_name == "TimesNet"
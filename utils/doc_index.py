@@ -0,0 +1,300 @@
+# utils/doc_index.py
+"""
+Offline documentation index built from docs/*_models_page.txt.
+
+Each `class pkg.module.Name(...)` entry is parsed into a record (signature,
+defaults, required args, parameter descriptions, attributes) and stored as one
+JSON file keyed by package and lower-cased class name, so AgentInfoMiner can
+answer known models without an LLM call:
+
+    python -m utils.doc_index --build
+    python -m utils.doc_index --show IForest
+"""
+
+import argparse
+import ast
+import glob
+import json
+import os
+import re
+import threading
+import time
+
+from config.config import Config
+
+DOCS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "docs")
+INDEX_VERSION = 1
+
+_CLASS_RE = re.compile(r"^class\s+((?:[\w]+\.)+)?(\w+)\((.*)\)(?:\[source\])?\s*$")
+_METHOD_RE = re.compile(r"^\w+\(.*\)(?:\[source\])?\s*$")
+_HEADING_RE = re.compile(r"^(Parameters|Attributes|Methods|Returns|Return type|Note|Notes|References|Examples?)\s*:?\s*$")
+_BARE_NAME_RE = re.compile(r"^[A-Za-z_]\w*$")
+
+# -------------------------------------------------------------------
+# Parsing
+# -------------------------------------------------------------------
+def _split_args(arg_str: str) -> list:
+    """Split a signature's argument list on top-level commas."""
+    args, current, depth, quote = [], [], 0, None
+    for ch in arg_str:
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch in "([{<":
+            depth += 1
+        elif ch in ")]}>":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            args.append("".join(current).strip())
+            current = []
+            continue
+        current.append(ch)
+    if "".join(current).strip():
+        args.append("".join(current).strip())
+    return args
+
+
+def _literal(value: str):
+    """Python literal if possible, otherwise the source text (e.g. "LinearRegression()")."""
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def parse_signature(arg_str: str):
+    """Return ({param: default}, [required params]) for an __init__ argument list."""
+    defaults, required = {}, []
+    for arg in _split_args(arg_str):
+        if not arg or arg.startswith("*"):
+            continue
+        name, sep, default = arg.partition("=")
+        name = name.split(":")[0].strip()
+        if sep:
+            defaults[name] = _literal(default.strip())
+        else:
+            defaults[name] = None
+            required.append(name)
+    return defaults, required
+
+
+def _paragraphs(lines: list) -> list:
+    paras, current = [], []
+    for line in lines:
+        if line.strip():
+            current.append(line.rstrip())
+        elif current:
+            paras.append(current)
+            current = []
+    if current:
+        paras.append(current)
+    return paras
+
+
+def _param_descriptions(lines: list, names: list) -> dict:
+    """Attach each paragraph of a Parameters section to the parameter it starts with."""
+    by_length = sorted(names, key=len, reverse=True)
+    descriptions, current = {}, None
+    for para in _paragraphs(lines):
+        text = " ".join(para).strip()
+        if text.startswith("*"):
+            current = None  # **kwargs is not a named parameter
+            continue
+        owner = next((n for n in by_length if re.match(re.escape(n) + r"(?!\w)", text)), None)
+        if owner is None and " – " not in para[0]:
+            # pyod glues name and type together ("contaminationfloat in ...")
+            owner = next((n for n in by_length if text.startswith(n)), None)
+        if owner:
+            current = owner
+            descriptions[current] = text
+        elif current:
+            descriptions[current] += "\n" + text
+    return descriptions
+
+
+def _parse_class(package: str, qualifier: str, name: str, arg_str: str, body: list) -> dict:
+    defaults, required = parse_signature(arg_str)
+    summary, params, attributes = [], [], []
+    section = "intro"
+    for line in body:
+        stripped = line.strip()
+        if _METHOD_RE.match(stripped):
+            break  # method docs follow; their Parameters are not __init__ parameters
+        heading = _HEADING_RE.match(stripped)
+        if heading:
+            kind = heading.group(1).lower()
+            if kind == "methods":
+                break
+            section = {"parameters": "params", "attributes": "attributes"}.get(kind, "skip")
+            continue
+        if section == "params" and _BARE_NAME_RE.match(stripped) and stripped not in defaults:
+            # pygod lists attributes right after the parameters without a heading
+            section = "attributes"
+        if section == "intro" and not stripped.startswith("Bases:"):
+            summary.append(line)
+        elif section == "params":
+            params.append(line)
+        elif section == "attributes":
+            attributes.append(line)
+
+    return {
+        "name": name,
+        "package": package,
+        "qualified_name": f"{qualifier or ''}{name}",
+        "signature": f"{qualifier or ''}{name}({arg_str})",
+        "summary": "\n".join(summary).strip(),
+        "defaults": defaults,
+        "required": required,
+        "parameters": _param_descriptions(params, list(defaults)),
+        "attributes": "\n".join(attributes).strip(),
+    }
+
+
+def parse_doc_page(path: str, package: str) -> list:
+    """Parse one docs/*_models_page.txt into class records."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    records, header, body = [], None, []
+    for line in lines + ["class __end__()"]:
+        m = _CLASS_RE.match(line.strip())
+        if not m:
+            if header:
+                body.append(line)
+            continue
+        if header:
+            # The line right before the next class is often just its title
+            if body and _BARE_NAME_RE.match(body[-1].strip()):
+                body = body[:-1]
+            records.append(_parse_class(package, *header, body))
+        header, body = (m.group(1), m.group(2), m.group(3)), []
+    return records
+
+# -------------------------------------------------------------------
+# Index
+# -------------------------------------------------------------------
+def _page_package(path: str) -> str:
+    return os.path.basename(path).split("_")[0]
+
+
+def _source_state(docs_dir: str) -> dict:
+    return {os.path.basename(p): os.path.getmtime(p)
+            for p in sorted(glob.glob(os.path.join(docs_dir, "*_models_page.txt")))}
+
+
+def render_doc(record: dict) -> str:
+    """Render a record in the same shape as the Gemini doc answers (ends with the python params dict)."""
+    lines = [f"`{record['name']}` ({record['qualified_name']}), from the offline documentation index.", "",
+             "**Initialization Function:**", f"class {record['signature']}", ""]
+    if record["summary"]:
+        lines += [record["summary"], ""]
+    if record["parameters"]:
+        lines.append("**Parameters:**")
+        for name, text in record["parameters"].items():
+            flag = " (required)" if name in record["required"] else ""
+            lines.append(f"- {text}{flag}")
+        lines.append("")
+    if record["attributes"]:
+        lines += ["**Attributes:**", record["attributes"], ""]
+    body = ",\n".join(f"    {json.dumps(k)}: {v!r}" for k, v in record["defaults"].items())
+    lines += ["```python", "{\n" + body + "\n}" if body else "{}", "```"]
+    return "\n".join(lines)
+
+
+class DocIndex:
+    """Lazily loaded {package: {lower-cased name: record}} map with alias lookup."""
+
+    def __init__(self, path: str = None, docs_dir: str = DOCS_DIR):
+        self.path = path or Config.DOC_INDEX_PATH
+        self.docs_dir = docs_dir
+        self._data = None
+        self._lock = threading.Lock()
+
+    def build(self) -> dict:
+        start = time.perf_counter()
+        packages, aliases = {}, {}
+        for path in sorted(glob.glob(os.path.join(self.docs_dir, "*_models_page.txt"))):
+            package = _page_package(path)
+            for record in parse_doc_page(path, package):
+                key = record["name"].lower()
+                packages.setdefault(package, {})[key] = record
+                # Module names ("deep_svdd", "auto_encoder") resolve to their class too
+                module = record["qualified_name"].split(".")[-2] if record["qualified_name"].count(".") >= 2 else ""
+                if module and module not in packages[package]:
+                    aliases.setdefault(package, {})[module] = key
+
+        data = {"version": INDEX_VERSION, "sources": _source_state(self.docs_dir),
+                "packages": packages, "aliases": aliases}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        count = sum(len(v) for v in packages.values())
+        print(f"[DocIndex] Built {count} records in {time.perf_counter() - start:.2f}s -> {self.path}")
+        return data
+
+    def _load(self) -> dict:
+        if self._data is not None:
+            return self._data
+        with self._lock:
+            if self._data is None:
+                data = None
+                if os.path.exists(self.path):
+                    try:
+                        with open(self.path, "r", encoding="utf-8") as f:
+                            data = json.load(f)
+                    except (OSError, json.JSONDecodeError):
+                        print("[DocIndex] Index unreadable, rebuilding...")
+                if (not data or data.get("version") != INDEX_VERSION
+                        or data.get("sources") != _source_state(self.docs_dir)):
+                    data = self.build()
+                self._data = data
+        return self._data
+
+    def lookup(self, algorithm: str, package_name: str = None):
+        """Record for `algorithm` (case-insensitive), or None if it is not in the docs."""
+        if not algorithm:
+            return None
+        data = self._load()
+        key = algorithm.strip().lower()
+        packages = [package_name] if package_name in data["packages"] else list(data["packages"])
+        for package in packages:
+            records = data["packages"][package]
+            record = records.get(key) or records.get(data["aliases"].get(package, {}).get(key, ""))
+            if record:
+                return record
+        return None
+
+    def get_doc(self, algorithm: str, package_name: str = None):
+        record = self.lookup(algorithm, package_name)
+        return render_doc(record) if record else None
+
+    def names(self, package_name: str = None) -> list:
+        data = self._load()
+        packages = [package_name] if package_name else list(data["packages"])
+        return sorted(r["name"] for p in packages for r in data["packages"].get(p, {}).values())
+
+
+doc_index = DocIndex()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or inspect the offline documentation index.")
+    parser.add_argument("--build", action="store_true", help="(Re)build the index from docs/*_models_page.txt")
+    parser.add_argument("--show", metavar="ALGORITHM", help="Print the rendered doc for one algorithm")
+    parser.add_argument("--package", default=None)
+    args = parser.parse_args()
+
+    if args.build:
+        doc_index.build()
+    if args.show:
+        t0 = time.perf_counter()
+        doc = doc_index.get_doc(args.show, args.package)
+        print(doc or f"[DocIndex] {args.show} not found")
+        print(f"[DocIndex] Lookup took {(time.perf_counter() - t0) * 1000:.3f} ms")
+    if not args.build and not args.show:
+        for package in ("pyod", "pygod", "darts"):
+            print(f"{package}: {', '.join(doc_index.names(package))}")
@@ -0,0 +1,111 @@
+# utils/doc_prefetch.py
+
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Optional
+
+from config.config import Config
+from utils.doc_index import doc_index
+
+# Shared by all runs in the process; doc fetches are I/O bound (LLM / SQLite)
+_executor = ThreadPoolExecutor(max_workers=Config.DOC_PREFETCH_WORKERS, thread_name_prefix="doc-prefetch")
+
+# What AgentSelector falls back to when the auto-mode choice cannot be parsed
+_FALLBACK_MODELS = {"pyod": "ECOD", "pygod": "SCAN", "darts": "RNNModel"}
+
+
+def guess_package(algorithm: Optional[str], dataset_path: Optional[str]) -> str:
+    """
+    Best guess of AgentSelector's package before any data is loaded:
+    the doc index knows which library a model belongs to, otherwise the file type decides.
+    """
+    from ad_model_selection.prompts.pygod_ms_prompt import PYGOD_MODEL_OPTIONS
+    from ad_model_selection.prompts.timeseries_ms_prompt import TIMESERIES_MODEL_OPTIONS
+
+    if algorithm:
+        record = doc_index.lookup(algorithm)
+        if record:
+            return record["package"]
+        if algorithm in PYGOD_MODEL_OPTIONS:
+            return "pygod"
+        if algorithm in TIMESERIES_MODEL_OPTIONS:
+            return "darts"
+    ext = os.path.splitext(dataset_path or "")[1].lower()
+    return "pygod" if ext == ".pt" else "pyod"
+
+
+def auto_candidates(package: str) -> list:
+    """
+    Models AgentSelector can pick in auto mode that the offline index documents.
+    Unindexed candidates would each cost a speculative strong-model doc call for
+    a model that is usually not picked; the info node fetches the chosen one.
+    """
+    from ad_model_selection.prompts.pygod_ms_prompt import PYGOD_MODEL_OPTIONS
+    from ad_model_selection.prompts.pyod_ms_prompt import PYOD_MODEL_OPTIONS
+    from ad_model_selection.prompts.timeseries_ms_prompt import TIMESERIES_MODEL_OPTIONS
+
+    options = {"pyod": PYOD_MODEL_OPTIONS, "pygod": PYGOD_MODEL_OPTIONS}.get(package, TIMESERIES_MODEL_OPTIONS)
+    candidates = list(options) + [_FALLBACK_MODELS.get(package, "ECOD")]
+    return [name for name in dict.fromkeys(candidates) if doc_index.lookup(name, package) is not None]
+
+
+class DocPrefetch:
+    """
+    Starts AgentInfoMiner.query_docs in the background for the algorithm(s)
+    the processor named, so doc latency overlaps dataset loading in the selector.
+    The info node collects the result with get(); a miss just means it queries normally.
+    """
+
+    def __init__(self, info_miner, vectorstore=None):
+        self.info_miner = info_miner
+        self.vectorstore = vectorstore
+        self._futures = {}  # (algorithm, package) -> Future
+        self._lock = threading.Lock()
+
+    def start(self, experiment_config: dict) -> list:
+        """Submit prefetches for this run's config; returns the (algorithm, package) pairs started."""
+        algorithms = [a for a in (experiment_config.get("algorithm") or []) if a]
+        dataset = experiment_config.get("dataset_train")
+        if len(algorithms) == 1 and algorithms[0].lower() == "all":
+            return []  # run-all mode resolves models per package later
+        if algorithms:
+            targets = [(a, guess_package(a, dataset)) for a in algorithms]
+        else:
+            package = guess_package(None, dataset)
+            targets = [(a, package) for a in auto_candidates(package)[:Config.DOC_PREFETCH_CANDIDATES]]
+        for algorithm, package in targets:
+            self.submit(algorithm, package)
+        return targets
+
+    def submit(self, algorithm: str, package: str) -> None:
+        key = (algorithm, package)
+        with self._lock:
+            if key in self._futures:
+                return
+            # Copy the context so the LLM calls are billed to this run's usage ledger
+            ctx = contextvars.copy_context()
+            self._futures[key] = _executor.submit(
+                ctx.run, self.info_miner.query_docs, algorithm, self.vectorstore, package
+            )
+
+    def get(self, algorithm: str, package: str, timeout: float = None) -> Optional[str]:
+        """Prefetched doc, waiting for it if still running; None if it was never started or failed."""
+        with self._lock:
+            future = self._futures.get((algorithm, package))
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=Config.DOC_PREFETCH_TIMEOUT_SECONDS if timeout is None else timeout)
+        except FutureTimeout:
+            print(f"[Prefetch] Timed out waiting for {algorithm} docs")
+        except Exception as e:
+            print(f"[Prefetch] Failed for {algorithm}: {e}")
+        return None
+
+    def cancel_pending(self) -> None:
+        """Drop prefetches that have not started (e.g. auto-mode candidates that were not chosen)."""
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
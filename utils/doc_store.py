@@ -0,0 +1,173 @@
+# utils/doc_store.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from config.config import Config
+
+# Reads refresh accessed_at (for LRU eviction) at most this often, so hot docs
+# do not turn every read into a write
+_TOUCH_INTERVAL_SECONDS = 3600
+
+
+class DocStore:
+    """
+    Per-key store for algorithm documentation (replaces cache.json).
+    SQLite in WAL mode with one connection per thread: readers never wait on
+    each other or on a writer, and a write only touches its own row.
+    Entries expire after ttl_seconds; past max_entries the least recently
+    used docs are evicted.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 5000,
+                 legacy_json_path: str = ""):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                algorithm TEXT NOT NULL,
+                package TEXT NOT NULL,
+                document TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (algorithm, package)
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_accessed ON docs(accessed_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.commit()
+        if legacy_json_path:
+            self.migrate_json(legacy_json_path)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ------------------------ Lookup ------------------------
+    def get(self, algorithm: str, package: str = "") -> Optional[str]:
+        """Cached doc for (algorithm, package); entries migrated from cache.json have no package."""
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT package, document, created_at, accessed_at FROM docs "
+            "WHERE algorithm = ? AND package IN (?, '') ORDER BY package DESC LIMIT 1",
+            (algorithm, package or ""),
+        ).fetchone()
+        if row is None:
+            return None
+        row_package, document, created_at, accessed_at = row
+        if now - created_at >= self.ttl_seconds:
+            print(f"[Cache Expired] Re-querying {algorithm}")
+            return None
+        if now - accessed_at >= _TOUCH_INTERVAL_SECONDS:
+            conn.execute("UPDATE docs SET accessed_at = ? WHERE algorithm = ? AND package = ?",
+                         (now, algorithm, row_package))
+            conn.commit()
+        return document
+
+    def put(self, algorithm: str, document: str, package: str = "", created_at: float = None) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO docs (algorithm, package, document, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (algorithm, package or "", document, created_at or now, now),
+        )
+        self._evict(conn, now)
+        conn.commit()
+
+    def delete(self, algorithm: str, package: str = "") -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM docs WHERE algorithm = ? AND package IN (?, '')", (algorithm, package or ""))
+        conn.commit()
+
+    # ------------------------ Maintenance ------------------------
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired docs, then least-recently-used docs beyond max_entries."""
+        conn.execute("DELETE FROM docs WHERE created_at <= ?", (now - self.ttl_seconds,))
+        conn.execute(
+            "DELETE FROM docs WHERE rowid IN (SELECT rowid FROM docs ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def migrate_json(self, json_path: str) -> int:
+        """Import a legacy cache.json ({algorithm: {query_datetime, document}}) once."""
+        if not os.path.exists(json_path):
+            return 0
+        conn = self._conn()
+        marker = f"migrated:{os.path.abspath(json_path)}"
+        if conn.execute("SELECT 1 FROM meta WHERE key = ?", (marker,)).fetchone():
+            return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            print(f"[DocStore] {json_path} unreadable, skipping migration")
+            legacy = {}
+
+        count = 0
+        for algorithm, entry in legacy.items():
+            try:
+                created_at = datetime.fromisoformat(entry["query_datetime"]).timestamp()
+                document = entry["document"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            conn.execute(
+                "INSERT OR IGNORE INTO docs (algorithm, package, document, created_at, accessed_at) "
+                "VALUES (?, '', ?, ?, ?)",
+                (algorithm, document, created_at, created_at),
+            )
+            count += 1
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (marker, str(time.time())))
+        conn.commit()
+        print(f"[DocStore] Migrated {count} docs from {json_path}")
+        return count
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        total = conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+        expired = conn.execute(
+            "SELECT COUNT(*) FROM docs WHERE created_at <= ?", (time.time() - self.ttl_seconds,)
+        ).fetchone()[0]
+        return {"entries": total, "expired": expired}
+
+
+_stores = {}  # absolute path -> DocStore
+_store_lock = threading.Lock()
+
+
+def get_doc_store(path: str = None) -> DocStore:
+    """
+    Process-wide DocStore for path (Config.DOC_CACHE_PATH by default), created on
+    first use; only the default store imports the legacy cache.json.
+    """
+    key = os.path.abspath(path or Config.DOC_CACHE_PATH)
+    with _store_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = DocStore(
+                path or Config.DOC_CACHE_PATH,
+                ttl_seconds=Config.DOC_CACHE_TTL_SECONDS,
+                max_entries=Config.DOC_CACHE_MAX_ENTRIES,
+                legacy_json_path="" if path else Config.DOC_CACHE_LEGACY_JSON,
+            )
+        return store
@@ -2,53 +2,413 @@
 
 import os
 import time
-import google.generativeai as genai
-from google.api_core import exceptions
+import asyncio
+import concurrent.futures
+import queue
+import threading
+from dataclasses import dataclass, replace
 
 # -------------------------------------------------------------------
 # Gemini API setup
 # -------------------------------------------------------------------
 from config.config import Config
+from utils.response_cache import ResponseCache
+from utils.rate_limiter import RateLimiter, backoff_delay
+from utils.llm_backends import LLMBackend, BackendResult, RateLimitError, BackendTimeout, create_backend
+from utils.llm_routing import ModelRoute, get_route
+from utils.llm_usage import usage_tracker, current_run_id
 api_key = Config.GEMINI_API_KEY
-# Use your default model (you can adjust if you’re using 2.0 / 2.5 Pro)
-MODEL_NAME = "gemini-2.5-pro"
+# Default (strong) model; per-stage models come from utils/llm_routing.py
+MODEL_NAME = Config.LLM_STRONG_MODEL
 
 # -------------------------------------------------------------------
-# Basic query function
+# Backend selection (Config.LLM_BACKEND: gemini | local | http)
+# -------------------------------------------------------------------
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> LLMBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+            print(f"[Gemini] Using '{_backend.name}' LLM backend.")
+    return _backend
+
+
+def set_backend(backend: LLMBackend) -> None:
+    """Swap the backend at runtime (e.g. a stand-in for offline benchmarks)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+# -------------------------------------------------------------------
+# Response cache (shared by every agent / pipeline thread)
+# -------------------------------------------------------------------
+_response_cache = None
+if Config.LLM_CACHE_ENABLED:
+    try:
+        _response_cache = ResponseCache(
+            Config.LLM_CACHE_PATH,
+            max_memory_entries=Config.LLM_CACHE_MEMORY_ENTRIES,
+            max_disk_bytes=Config.LLM_CACHE_MAX_BYTES,
+            ttl_seconds=Config.LLM_CACHE_TTL_SECONDS,
+        )
+    except Exception as e:
+        print(f"[Gemini] ⚠️ Response cache disabled: {e}")
+
+
+def _make_key(model: str, prompt: str, temperature: float) -> str:
+    # Namespaced by backend so stand-in answers never leak into real runs
+    return ResponseCache.make_key(f"{get_backend().name}/{model}", prompt, temperature)
+
+
+def _cache_lookup(model: str, prompt: str, temperature: float, use_cache: bool):
+    if not (use_cache and _response_cache):
+        return None, None
+    key = _make_key(model, prompt, temperature)
+    return key, _response_cache.get(key)
+
+
+def _cache_store(key, text: str, model: str) -> None:
+    # Never cache empty or error responses, so a retry can still succeed
+    if key and _response_cache and text and not text.startswith("[Error]"):
+        _response_cache.put(key, text, model=model)
+
+
+def get_cache_stats() -> dict:
+    """Hit/miss counters of the response cache (empty dict if disabled)."""
+    return _response_cache.stats() if _response_cache else {}
+
+# -------------------------------------------------------------------
+# Shared admission control + event loop
 # -------------------------------------------------------------------
-def query_gemini(prompt: str, temperature: float = 0.3) -> str:
+# Every pipeline thread submits its calls to one background asyncio loop, so
+# the RPM/TPM budget is enforced across all concurrent runs in the process.
+_rate_limiter = RateLimiter(Config.LLM_REQUESTS_PER_MINUTE, Config.LLM_TOKENS_PER_MINUTE)
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="gemini-client-loop", daemon=True).start()
+    return _loop
+
+
+def _run_sync(coro, timeout: float = None):
     """
-    Basic Gemini API call (no quota protection).
+    Sync facade: run a coroutine on the shared loop and wait for its result.
+    timeout bounds the time outside RPM/TPM admission: while requests are queued
+    in the rate limiter the deadline moves out, so a saturated limiter never makes
+    callers abandon calls that are still waiting their turn.
     """
-    model = genai.GenerativeModel(MODEL_NAME)
-    response = model.generate_content(prompt, generation_config={"temperature": temperature})
-    return response.text.strip() if response and response.text else ""
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    if timeout is None:
+        return future.result()
+    start, queued = time.monotonic(), _rate_limiter.queued_seconds()
+    while True:
+        remaining = start + timeout + (_rate_limiter.queued_seconds() - queued) - time.monotonic()
+        try:
+            return future.result(timeout=max(remaining, 0))
+        except concurrent.futures.TimeoutError as e:
+            if start + timeout + (_rate_limiter.queued_seconds() - queued) > time.monotonic():
+                continue  # admission wait grew while we slept
+            future.cancel()
+            raise BackendTimeout(f"LLM call did not finish within {timeout:g}s (plus admission wait)") from e
+
+
+def _sync_timeout(route: ModelRoute, retries: int) -> float:
+    # Every attempt may use the route's full timeout plus one maximal backoff before the next;
+    # _run_sync adds the time spent queued for rate-limit admission on top
+    return retries * (route.timeout + Config.LLM_BACKOFF_MAX_SECONDS)
+
+
+def _estimate_tokens(prompt: str, max_output_tokens: int = None) -> int:
+    # ~4 characters per token for the prompt, plus a typical completion
+    return len(prompt) // 4 + min(max_output_tokens or Config.LLM_EXPECTED_OUTPUT_TOKENS,
+                                  Config.LLM_EXPECTED_OUTPUT_TOKENS)
+
+
+def get_rate_limiter_stats() -> dict:
+    """Admission counters: admitted calls, queueing delay and throttling events."""
+    return _rate_limiter.stats()
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    model: str
+    queue_delay: float = 0.0
+    latency: float = 0.0
+    retries: int = 0
+    cached: bool = False
+    coalesced: bool = False
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
 
 # -------------------------------------------------------------------
-# Quota-aware / retry-safe Gemini query
+# Single-flight: identical in-flight prompts share one API call
+# -------------------------------------------------------------------
+# Only touched from the shared loop, so no extra locking is needed.
+_inflight = {}
+_flight_stats = {"leaders": 0, "coalesced": 0}
+
+
+def get_coalescing_stats() -> dict:
+    """How many calls went out vs. how many piggy-backed on an in-flight twin."""
+    return dict(_flight_stats)
+
+def get_client_stats() -> dict:
+    """Process-wide counters: response cache, rate limiter and coalescing."""
+    return {
+        "cache": get_cache_stats(),
+        "rate_limiter": get_rate_limiter_stats(),
+        "coalescing": get_coalescing_stats(),
+    }
+
 # -------------------------------------------------------------------
-def query_gemini_quota_safe(prompt: str, temperature: float = 0.3, retries: int = 3, delay: int = 10) -> str:
+# Async client
+# -------------------------------------------------------------------
+async def query_gemini_async(prompt: str, temperature: float = None, retries: int = 3,
+                             delay: float = None, use_cache: bool = True,
+                             raise_on_error: bool = False, stage: str = "default",
+                             escalate: bool = False, run_id: str = None) -> LLMResponse:
     """
-    Quota-aware Gemini query with retry logic for transient errors or quota exhaustion.
-    Automatically retries on ResourceExhausted, DeadlineExceeded, or other API errors.
+    Rate-limited Gemini call with exponential backoff and jitter.
+    Model, temperature, output cap and timeout come from the stage's route
+    (an explicit temperature overrides the route's).
+    Returns an LLMResponse that reports queueing delay, latency and retries.
+    Concurrent identical requests are coalesced into a single API call.
+    Every call is recorded in the usage ledger under (run_id, stage).
     """
+    route = get_route(stage, escalate)
+    if temperature is None:
+        temperature = route.temperature
+
+    start = time.monotonic()
+    try:
+        response = await _query(prompt, temperature, route, retries, delay, use_cache, raise_on_error)
+    except Exception as e:
+        # Retries actually made before giving up (set by _call_gemini; 0 if it never got that far)
+        usage_tracker.record(run_id, stage, route.model, latency=time.monotonic() - start,
+                             retries=getattr(e, "llm_retries", 0), cache_status="error")
+        raise
+
+    if response.cached:
+        status = "hit"
+    elif response.coalesced:
+        status = "coalesced"
+    elif response.text.startswith("[Error]"):
+        status = "error"
+    else:
+        status = "miss" if use_cache else "bypass"
+    usage_tracker.record(
+        run_id, stage, response.model,
+        prompt_tokens=response.prompt_tokens, completion_tokens=response.completion_tokens,
+        latency=response.latency, queue_delay=response.queue_delay, retries=response.retries,
+        cache_status=status,
+    )
+    return response
+
+
+async def _query(prompt: str, temperature: float, route: ModelRoute, retries: int, delay,
+                 use_cache: bool, raise_on_error: bool) -> LLMResponse:
+    # SQLite reads/writes run in a worker thread so they never stall the shared loop
+    key, cached = await asyncio.to_thread(_cache_lookup, route.model, prompt, temperature, use_cache)
+    if cached is not None:
+        return LLMResponse(text=cached, model=route.model, cached=True)
+
+    # A cache bypass asks for a fresh sample, so it never joins another flight
+    if not use_cache:
+        return await _call_gemini(prompt, temperature, route, retries, delay, raise_on_error, key)
+
+    flight_key = (_make_key(route.model, prompt, temperature), raise_on_error)
+    leader = _inflight.get(flight_key)
+    if leader is not None:
+        _flight_stats["coalesced"] += 1
+        start = time.monotonic()
+        result = await asyncio.shield(leader)
+        return replace(result, coalesced=True, queue_delay=0.0, latency=time.monotonic() - start)
+
+    _flight_stats["leaders"] += 1
+    task = asyncio.ensure_future(_call_gemini(prompt, temperature, route, retries, delay, raise_on_error, key))
+    _inflight[flight_key] = task
+    task.add_done_callback(lambda _: _inflight.pop(flight_key, None))
+    return await asyncio.shield(task)
+
+
+async def _call_gemini(prompt: str, temperature: float, route: ModelRoute, retries: int, delay,
+                       raise_on_error: bool, cache_key) -> LLMResponse:
+    base_delay = Config.LLM_BACKOFF_BASE_SECONDS if delay is None else delay
+    estimated = _estimate_tokens(prompt, route.max_output_tokens)
+    queue_delay = 0.0
+    start = time.monotonic()
+    last_error = None
+
     for attempt in range(retries):
+        queue_delay += await _rate_limiter.acquire(estimated)
         try:
-            model = genai.GenerativeModel(MODEL_NAME)
-            response = model.generate_content(prompt, generation_config={"temperature": temperature})
-            if response and response.text:
-                return response.text.strip()
+            try:
+                result = await asyncio.wait_for(
+                    get_backend().generate(route.model, prompt, temperature, route.max_output_tokens),
+                    timeout=route.timeout,
+                )
+            except asyncio.TimeoutError as e:
+                raise BackendTimeout(f"{route.model} did not answer within {route.timeout}s") from e
+            _rate_limiter.settle(estimated, result.total_tokens)
+
+            text = result.text
+            if queue_delay > 1.0:
+                print(f"[Gemini] Queued {queue_delay:.1f}s waiting for rate budget.")
+            if not text:
+                text = "" if raise_on_error else "[Error] Gemini returned empty response."
             else:
-                return "[Error] Gemini returned empty response."
-        except exceptions.ResourceExhausted:
-            print(f"[Gemini] ⚠️ Quota exhausted. Waiting {delay}s before retry {attempt + 1}/{retries}...")
-            time.sleep(delay)
-        except exceptions.DeadlineExceeded:
-            print(f"[Gemini] ⏳ Timeout. Retrying ({attempt + 1}/{retries})...")
-            time.sleep(delay)
+                await asyncio.to_thread(_cache_store, cache_key, text, route.model)
+            return LLMResponse(text=text, model=route.model, queue_delay=queue_delay,
+                               latency=time.monotonic() - start, retries=attempt,
+                               prompt_tokens=result.prompt_tokens, completion_tokens=result.completion_tokens)
+        except RateLimitError as e:
+            last_error = e
+            _rate_limiter.throttled()
+            wait = backoff_delay(attempt, base_delay, Config.LLM_BACKOFF_MAX_SECONDS)
+            print(f"[Gemini] ⚠️ Quota exhausted. Waiting {wait:.1f}s before retry {attempt + 1}/{retries}...")
+        except BackendTimeout as e:
+            last_error = e
+            wait = backoff_delay(attempt, base_delay, Config.LLM_BACKOFF_MAX_SECONDS)
+            print(f"[Gemini] ⏳ Timeout. Retrying in {wait:.1f}s ({attempt + 1}/{retries})...")
         except Exception as e:
-            print(f"[Gemini] Unexpected error: {e}. Retrying ({attempt + 1}/{retries})...")
-            time.sleep(delay)
-    return "[Error] Gemini quota exhausted after retries."
+            last_error = e
+            wait = backoff_delay(attempt, base_delay, Config.LLM_BACKOFF_MAX_SECONDS)
+            print(f"[Gemini] Unexpected error: {e}. Retrying in {wait:.1f}s ({attempt + 1}/{retries})...")
+        if attempt + 1 < retries:
+            await asyncio.sleep(wait)
+
+    if raise_on_error and last_error is not None:
+        last_error.llm_retries = retries - 1
+        raise last_error
+    return LLMResponse(text="[Error] Gemini quota exhausted after retries.", model=route.model,
+                       queue_delay=queue_delay, latency=time.monotonic() - start, retries=retries - 1)
+
+# -------------------------------------------------------------------
+# Basic query function
+# -------------------------------------------------------------------
+def query_gemini(prompt: str, temperature: float = None, use_cache: bool = True,
+                 stage: str = "default", escalate: bool = False) -> str:
+    """
+    Basic Gemini API call (single attempt, errors are raised to the caller).
+    """
+    return _run_sync(query_gemini_async(
+        prompt, temperature, retries=1, use_cache=use_cache, raise_on_error=True,
+        stage=stage, escalate=escalate, run_id=current_run_id(),
+    ), timeout=_sync_timeout(get_route(stage, escalate), 1)).text
+
+# -------------------------------------------------------------------
+# Quota-aware / retry-safe Gemini query
+# -------------------------------------------------------------------
+def query_gemini_quota_safe(prompt: str, temperature: float = None, retries: int = 3, delay: int = None,
+                            use_cache: bool = True, stage: str = "default", escalate: bool = False) -> str:
+    """
+    Quota-aware Gemini query with retry logic for transient errors or quota exhaustion.
+    Retries on ResourceExhausted, DeadlineExceeded, or other API errors with jittered
+    exponential backoff; waiting never blocks the calling pipeline thread's peers.
+    """
+    return _run_sync(query_gemini_async(
+        prompt, temperature, retries=retries, delay=delay, use_cache=use_cache,
+        stage=stage, escalate=escalate, run_id=current_run_id(),
+    ), timeout=_sync_timeout(get_route(stage, escalate), retries)).text
 
 query_gemini_with_retry = query_gemini_quota_safe
+
+# -------------------------------------------------------------------
+# Streaming query
+# -------------------------------------------------------------------
+_STREAM_END = object()
+
+
+def query_gemini_stream(prompt: str, temperature: float = None, retries: int = 3, use_cache: bool = True,
+                        stage: str = "default", escalate: bool = False):
+    """
+    Yield response text chunks as the model produces them.
+    Closing the generator early (e.g. on malformed output) cancels the request.
+    Goes through the same admission control; a completed answer is cached.
+    """
+    route = get_route(stage, escalate)
+    if temperature is None:
+        temperature = route.temperature
+    run_id = current_run_id()
+
+    key, cached = _cache_lookup(route.model, prompt, temperature, use_cache)
+    if cached is not None:
+        usage_tracker.record(run_id, stage, route.model, cache_status="hit")
+        yield cached
+        return
+
+    chunks = queue.Queue()
+    stats = {"queue_delay": 0.0, "retries": 0, "usage": None}
+    estimated = _estimate_tokens(prompt, route.max_output_tokens)
+
+    async def pump():
+        for attempt in range(retries):
+            stats["retries"] = attempt
+            stats["queue_delay"] += await _rate_limiter.acquire(estimated)
+            started = False
+            try:
+                async for item in get_backend().stream(route.model, prompt, temperature, route.max_output_tokens):
+                    if isinstance(item, BackendResult):
+                        stats["usage"] = item
+                    elif item:
+                        started = True
+                        chunks.put(item)
+                chunks.put(_STREAM_END)
+                return
+            except Exception as e:
+                # Once text has been handed out a retry would duplicate it
+                if started or attempt + 1 >= retries:
+                    chunks.put(e)
+                    return
+                if isinstance(e, RateLimitError):
+                    _rate_limiter.throttled()
+                wait = backoff_delay(attempt, Config.LLM_BACKOFF_BASE_SECONDS, Config.LLM_BACKOFF_MAX_SECONDS)
+                print(f"[Gemini] Stream error: {e}. Retrying in {wait:.1f}s ({attempt + 1}/{retries})...")
+                await asyncio.sleep(wait)
+
+    start = time.monotonic()
+    # The route's timeout bounds the whole stream (admission, retries and every chunk)
+    deadline = start + route.timeout
+    future = asyncio.run_coroutine_threadsafe(pump(), _get_loop())
+    parts, status = [], "aborted"
+    try:
+        while True:
+            try:
+                item = chunks.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                status = "error"
+                raise BackendTimeout(f"{route.model} stream did not finish within {route.timeout}s")
+            if item is _STREAM_END:
+                status = "miss" if use_cache else "bypass"
+                break
+            if isinstance(item, BaseException):
+                status = "error"
+                raise item
+            parts.append(item)
+            yield item
+    finally:
+        future.cancel()
+        text = "".join(parts)
+        usage = stats["usage"]
+        if usage is None or not usage.total_tokens:
+            usage = BackendResult(text="", prompt_tokens=len(prompt) // 4, completion_tokens=len(text) // 4)
+        _get_loop().call_soon_threadsafe(_rate_limiter.settle, estimated, usage.total_tokens)
+        usage_tracker.record(
+            run_id, stage, route.model,
+            prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens,
+            latency=time.monotonic() - start, queue_delay=stats["queue_delay"],
+            retries=stats["retries"], cache_status=status,
+        )
+        if status in ("miss", "bypass"):
+            _cache_store(key, text.strip(), route.model)
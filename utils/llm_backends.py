@@ -0,0 +1,205 @@
+# utils/llm_backends.py
+
+import abc
+import asyncio
+import json
+import os
+import socket
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+
+from config.config import Config
+
+
+class RateLimitError(Exception):
+    """Backend rejected the call for quota / rate reasons."""
+
+
+class BackendTimeout(Exception):
+    """Backend did not answer in time."""
+
+
+@dataclass
+class BackendResult:
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class LLMBackend(abc.ABC):
+    """Interface every LLM backend implements (async, one prompt in, one text out)."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def generate(self, model: str, prompt: str, temperature: float,
+                       max_output_tokens: int = None) -> BackendResult:
+        """The complete answer to prompt with its token usage."""
+
+    async def stream(self, model: str, prompt: str, temperature: float,
+                     max_output_tokens: int = None):
+        """
+        Yield text chunks as they are produced, then (optionally) a final
+        BackendResult with empty text carrying the token usage.
+        Backends without native streaming yield the whole answer at once.
+        """
+        result = await self.generate(model, prompt, temperature, max_output_tokens)
+        yield result.text
+        yield BackendResult(text="", prompt_tokens=result.prompt_tokens,
+                            completion_tokens=result.completion_tokens)
+
+# -------------------------------------------------------------------
+# Gemini
+# -------------------------------------------------------------------
+class GeminiBackend(LLMBackend):
+    name = "gemini"
+
+    def __init__(self, api_key: str = ""):
+        # Imported lazily so the offline backends work without google-generativeai
+        import google.generativeai as genai
+        from google.api_core import exceptions
+        genai.configure(api_key=api_key or os.getenv("GEMINI_API_KEY"))
+        self._genai = genai
+        self._exceptions = exceptions
+
+    async def generate(self, model: str, prompt: str, temperature: float,
+                       max_output_tokens: int = None) -> BackendResult:
+        generation_config = {"temperature": temperature}
+        if max_output_tokens:
+            generation_config["max_output_tokens"] = max_output_tokens
+        try:
+            response = await self._genai.GenerativeModel(model).generate_content_async(
+                prompt, generation_config=generation_config
+            )
+        except self._exceptions.ResourceExhausted as e:
+            raise RateLimitError(str(e)) from e
+        except self._exceptions.DeadlineExceeded as e:
+            raise BackendTimeout(str(e)) from e
+
+        try:
+            text = response.text.strip() if response and response.text else ""
+        except ValueError:
+            # No text part (e.g. blocked or cut off at max_output_tokens)
+            text = ""
+        usage = getattr(response, "usage_metadata", None)
+        return BackendResult(
+            text=text,
+            prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+            completion_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+        )
+
+    async def stream(self, model: str, prompt: str, temperature: float,
+                     max_output_tokens: int = None):
+        generation_config = {"temperature": temperature}
+        if max_output_tokens:
+            generation_config["max_output_tokens"] = max_output_tokens
+        usage = None
+        try:
+            response = await self._genai.GenerativeModel(model).generate_content_async(
+                prompt, generation_config=generation_config, stream=True
+            )
+            async for chunk in response:
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                try:
+                    text = chunk.text
+                except ValueError:
+                    text = ""
+                if text:
+                    yield text
+        except self._exceptions.ResourceExhausted as e:
+            raise RateLimitError(str(e)) from e
+        except self._exceptions.DeadlineExceeded as e:
+            raise BackendTimeout(str(e)) from e
+        yield BackendResult(
+            text="",
+            prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+            completion_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+        )
+
+# -------------------------------------------------------------------
+# Local stand-ins (no network)
+# -------------------------------------------------------------------
+class LocalStandInBackend(LLMBackend):
+    """In-process deterministic responses with a configurable artificial latency."""
+
+    name = "local"
+
+    def __init__(self, latency: float = 0.0, responses_path: str = ""):
+        from utils.llm_standin import StandInResponder
+        self.latency = latency
+        self.responder = StandInResponder(responses_path)
+
+    async def generate(self, model: str, prompt: str, temperature: float,
+                       max_output_tokens: int = None) -> BackendResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        text = self.responder.respond(prompt)
+        return BackendResult(text=text, prompt_tokens=len(prompt) // 4, completion_tokens=len(text) // 4)
+
+    async def stream(self, model: str, prompt: str, temperature: float,
+                     max_output_tokens: int = None):
+        # Same answer as generate(), released line by line over the configured latency
+        text = self.responder.respond(prompt)
+        lines = text.splitlines(keepends=True) or [""]
+        for line in lines:
+            if self.latency:
+                await asyncio.sleep(self.latency / len(lines))
+            yield line
+        yield BackendResult(text="", prompt_tokens=len(prompt) // 4, completion_tokens=len(text) // 4)
+
+
+class HTTPStandInBackend(LLMBackend):
+    """Talks to `python -m utils.llm_standin` (or anything speaking the same JSON)."""
+
+    name = "http"
+
+    def __init__(self, url: str, timeout: float = 120.0):
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, payload: dict) -> dict:
+        req = urllib.request.Request(
+            self.url, data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST",
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                raise RateLimitError(str(e)) from e
+            raise
+        except urllib.error.URLError as e:
+            # Connect timeouts arrive wrapped: URLError(reason=socket.timeout(...))
+            if isinstance(e.reason, (TimeoutError, socket.timeout)):
+                raise BackendTimeout(str(e.reason)) from e
+            raise
+        except TimeoutError as e:
+            raise BackendTimeout(str(e)) from e
+
+    async def generate(self, model: str, prompt: str, temperature: float,
+                       max_output_tokens: int = None) -> BackendResult:
+        data = await asyncio.to_thread(self._post, {
+            "model": model, "prompt": prompt, "temperature": temperature,
+            "max_output_tokens": max_output_tokens,
+        })
+        return BackendResult(
+            text=data.get("text", ""),
+            prompt_tokens=data.get("prompt_tokens", 0),
+            completion_tokens=data.get("completion_tokens", 0),
+        )
+
+
+def create_backend(name: str = None) -> LLMBackend:
+    """Build the backend selected by Config.LLM_BACKEND (gemini | local | http)."""
+    name = (name or Config.LLM_BACKEND).lower()
+    if name == "local":
+        return LocalStandInBackend(Config.LLM_STANDIN_LATENCY_SECONDS, Config.LLM_STANDIN_RESPONSES)
+    if name == "http":
+        return HTTPStandInBackend(Config.LLM_STANDIN_URL)
+    return GeminiBackend(Config.GEMINI_API_KEY)
@@ -0,0 +1,50 @@
+# utils/llm_routing.py
+
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from config.config import Config
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    tier: str
+    model: str
+    temperature: float
+    max_output_tokens: Optional[int]
+    timeout: float
+
+
+# Model tiers: cheap/fast for extraction & selection, strong for code work
+MODEL_TIERS = {
+    "fast": Config.LLM_FAST_MODEL,
+    "strong": Config.LLM_STRONG_MODEL,
+}
+
+# stage -> (tier, temperature, max_output_tokens, timeout seconds).
+# gemini-2.5 models count thinking tokens against max_output_tokens, so the caps on
+# the short-JSON stages leave room for thinking before the answer
+STAGE_ROUTES = {
+    "processor":      ("fast",   0.0, 8192, 60),
+    "selector":       ("fast",   0.0, 8192, 60),
+    "info_miner":     ("strong", 0.3, None, 180),
+    "code_generator": ("strong", 0.3, None, 300),
+    "reviewer":       ("strong", 0.3, None, 300),
+    "evaluator":      ("strong", 0.3, None, 300),
+    "optimizer":      ("strong", 0.3, None, 180),
+    "data_loader":    ("strong", 0.3, None, 180),
+    "default":        ("strong", 0.3, None, 300),
+}
+
+
+def get_route(stage: str = "default", escalate: bool = False) -> ModelRoute:
+    """
+    Resolve the model settings for a pipeline stage.
+    escalate=True keeps the stage's settings but forces the strong model,
+    used when a fast-model answer could not be parsed.
+    """
+    tier, temperature, max_tokens, timeout = STAGE_ROUTES.get(stage, STAGE_ROUTES["default"])
+    route = ModelRoute(tier, MODEL_TIERS[tier], temperature, max_tokens, timeout)
+    if escalate and tier != "strong":
+        route = replace(route, tier="strong", model=MODEL_TIERS["strong"], max_output_tokens=None)
+    return route
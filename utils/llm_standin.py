@@ -0,0 +1,154 @@
+# utils/llm_standin.py
+"""
+Deterministic stand-in for the Gemini API.
+
+Serves canned or rule-based responses so the full pipeline can be run and
+load-tested without network access. Can be used in-process (LLM_BACKEND=local)
+or as a small HTTP server (LLM_BACKEND=http):
+
+    python -m utils.llm_standin --port 8765 --latency 0.5
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ------------------------ Rule-based responses ------------------------
+
+_CODE_TEMPLATE = '''import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from data_loader.data_loader import DataLoader
+
+# Stand-in script for {algorithm}: loads the data and reports fixed metrics
+X_train, y_train = DataLoader(r"{data_path_train}", store_script=False).load_data(split_data=False)
+print("Loaded X_train:", getattr(X_train, "shape", None))
+auroc_score = 0.5
+auprc_score = 0.5
+print(f"AUROC: {{auroc_score}}")
+print(f"AUPRC: {{auprc_score}}")
+'''
+
+
+def _first(pattern: str, text: str, default=None):
+    m = re.search(pattern, text, flags=re.DOTALL)
+    return m.group(1).strip() if m else default
+
+
+def _extraction_response(prompt: str) -> str:
+    instruction = _first(r"USER_INSTRUCTION:\s*<START>(.*?)<END>", prompt, "")
+    algos = re.findall(r"\brun\s+([A-Za-z][\w\-]*)", instruction, flags=re.IGNORECASE)
+    paths = re.findall(r"[\w./\\:\-]+\.(?:csv|mat|npy|pt|parquet|feather|arrow)\b", instruction)
+    params = dict(re.findall(r"(\w+)\s*=\s*([\w.\-]+)", instruction))
+    for k, v in params.items():
+        try:
+            params[k] = json.loads(v)
+        except ValueError:
+            pass
+    config = {
+        "algorithm": [a for a in algos if a.lower() not in ("on", "the")][:1],
+        "dataset_train": paths[0] if paths else None,
+        "dataset_test": paths[1] if len(paths) > 1 else None,
+        "parameters": params,
+    }
+    return "Extracted fields from the instruction.\nFINAL: " + json.dumps(config)
+
+
+def _selection_response(prompt: str) -> str:
+    options = _first(r"options include (.*?)\.?\"?\s*\n", prompt, "")
+    names = re.findall(r'"([^"]+)"', options)
+    choice = names[0] if names else "ECOD"
+    return json.dumps({"reason": "Deterministic stand-in choice.", "choice": choice})
+
+
+def _doc_response(prompt: str) -> str:
+    algorithm = _first(r"I want to run `([^`]+)`", prompt, "Model")
+    return (
+        f"`{algorithm}` stand-in documentation.\n\n"
+        "Parameters\ncontamination : float, optional (default=0.1)\n\n"
+        "```python\n{\n    \"contamination\": 0.1\n}\n```"
+    )
+
+
+def _code_response(prompt: str) -> str:
+    algorithm = _first(r"`([A-Za-z_][\w\-]*)`", prompt, "Model")
+    train = _first(r"TRAIN CSV path:\s*(\S+)", prompt, "")
+    return "```python\n" + _CODE_TEMPLATE.format(algorithm=algorithm, data_path_train=train) + "```"
+
+
+def _echo_code_response(prompt: str) -> str:
+    code = _first(r"--- (?:BEGIN|ORIGINAL) CODE ---\n(.*?)\n--- END CODE ---", prompt)
+    if code is None:
+        code = _first(r"### Original Code\n(.*)$", prompt, "")
+    return "```python\n" + code + "\n```"
+
+
+RULES = [
+    ("USER_INSTRUCTION:", _extraction_response),
+    ('{"choice"', _selection_response),
+    ("What is the Initialization function", _doc_response),
+    ("Produce executable Python", _code_response),
+    ("--- BEGIN CODE ---", _echo_code_response),
+    ("--- ORIGINAL CODE ---", _echo_code_response),
+    ("### Original Code", _echo_code_response),
+    ("ReAct", lambda prompt: "Thought: Defaults are adequate.\nFinal: keep current parameters"),
+]
+
+
+class StandInResponder:
+    """Canned responses first (substring/regex match), then the built-in rules."""
+
+    def __init__(self, responses_path: str = ""):
+        self.canned = []
+        if responses_path and os.path.exists(responses_path):
+            with open(responses_path, "r", encoding="utf-8") as f:
+                self.canned = json.load(f)
+
+    def respond(self, prompt: str) -> str:
+        for entry in self.canned:
+            if re.search(entry["match"], prompt):
+                return entry["response"]
+        for marker, rule in RULES:
+            if marker in prompt:
+                return rule(prompt)
+        return "OK"
+
+# ------------------------ HTTP server ------------------------
+
+def serve(port: int, latency: float, responses_path: str = "") -> None:
+    responder = StandInResponder(responses_path)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(latency)
+            text = responder.respond(body.get("prompt", ""))
+            payload = json.dumps({
+                "text": text,
+                "prompt_tokens": len(body.get("prompt", "")) // 4,
+                "completion_tokens": len(text) // 4,
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    print(f"[StandIn] Serving on http://127.0.0.1:{port} (latency {latency}s)")
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local deterministic stand-in for the Gemini API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before each response")
+    parser.add_argument("--responses", default="", help="JSON list of {match, response} canned entries")
+    args = parser.parse_args()
+    serve(args.port, args.latency, args.responses)
@@ -0,0 +1,131 @@
+# utils/llm_usage.py
+
+import contextvars
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from config.config import Config
+
+# USD per 1M tokens (input, output); unknown models are reported with cost 0
+MODEL_PRICES_PER_MTOK = {
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+}
+
+_run_id = contextvars.ContextVar("llm_run_id", default=None)
+
+
+def set_run_context(run_id: Optional[str]) -> None:
+    """Tag every LLM call made from this thread / context with run_id."""
+    _run_id.set(run_id)
+
+
+def current_run_id() -> Optional[str]:
+    return _run_id.get()
+
+
+@dataclass
+class UsageRecord:
+    run_id: Optional[str]
+    agent: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency: float
+    queue_delay: float
+    retries: int
+    cache_status: str  # miss | hit | coalesced | bypass | error | aborted
+    cost_usd: float
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    price_in, price_out = MODEL_PRICES_PER_MTOK.get(model, (0.0, 0.0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+
+class UsageTracker:
+    """
+    Thread-safe per-run ledger of every LLM call.
+    Only the max_runs most recently active runs are kept, so a long-running
+    server does not grow without bound.
+    """
+
+    def __init__(self, max_runs: int = 200):
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self._records = OrderedDict()  # run_id -> [UsageRecord], least recently active first
+        self._savings = {}  # run_id -> {agent: prompt tokens trimmed by utils/prompt_budget.py}
+
+    def _touch(self, run_id) -> None:
+        """Mark run_id as most recently active and drop the oldest runs past max_runs (lock held)."""
+        self._records.setdefault(run_id, [])
+        self._records.move_to_end(run_id)
+        while len(self._records) > self.max_runs:
+            oldest, _ = self._records.popitem(last=False)
+            self._savings.pop(oldest, None)
+
+    def record(self, run_id, agent: str, model: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+               latency: float = 0.0, queue_delay: float = 0.0, retries: int = 0,
+               cache_status: str = "miss") -> UsageRecord:
+        # Cache hits and coalesced calls did not spend any tokens themselves
+        if cache_status in ("hit", "coalesced"):
+            prompt_tokens = completion_tokens = 0
+        rec = UsageRecord(
+            run_id=run_id, agent=agent, model=model,
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+            latency=latency, queue_delay=queue_delay, retries=retries,
+            cache_status=cache_status,
+            cost_usd=estimate_cost(model, prompt_tokens, completion_tokens),
+        )
+        with self._lock:
+            self._touch(run_id)
+            self._records[run_id].append(rec)
+        return rec
+
+    def record_savings(self, run_id, agent: str, tokens_saved: int) -> None:
+        with self._lock:
+            self._touch(run_id)
+            per_agent = self._savings.setdefault(run_id, {})
+            per_agent[agent] = per_agent.get(agent, 0) + tokens_saved
+
+    def records(self, run_id) -> list:
+        with self._lock:
+            return [asdict(r) for r in self._records.get(run_id, [])]
+
+    def summary(self, run_id) -> dict:
+        """Totals for one run plus a per-agent breakdown."""
+        with self._lock:
+            records = list(self._records.get(run_id, []))
+            savings = dict(self._savings.get(run_id, {}))
+
+        def _bucket():
+            return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "latency": 0.0,
+                    "queue_delay": 0.0, "retries": 0, "cost_usd": 0.0, "prompt_tokens_saved": 0,
+                    "cache": {"miss": 0, "hit": 0, "coalesced": 0, "bypass": 0, "error": 0, "aborted": 0}}
+
+        total, by_agent = _bucket(), {}
+        for r in records:
+            for bucket in (total, by_agent.setdefault(r.agent, _bucket())):
+                bucket["calls"] += 1
+                bucket["prompt_tokens"] += r.prompt_tokens
+                bucket["completion_tokens"] += r.completion_tokens
+                bucket["latency"] += r.latency
+                bucket["queue_delay"] += r.queue_delay
+                bucket["retries"] += r.retries
+                bucket["cost_usd"] += r.cost_usd
+                bucket["cache"][r.cache_status] = bucket["cache"].get(r.cache_status, 0) + 1
+        for agent, saved in savings.items():
+            total["prompt_tokens_saved"] += saved
+            by_agent.setdefault(agent, _bucket())["prompt_tokens_saved"] += saved
+        return {"run_id": run_id, "total": total, "by_agent": by_agent}
+
+    def clear(self, run_id) -> None:
+        with self._lock:
+            self._records.pop(run_id, None)
+            self._savings.pop(run_id, None)
+
+
+usage_tracker = UsageTracker(Config.LLM_USAGE_MAX_RUNS)
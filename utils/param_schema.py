@@ -0,0 +1,290 @@
+# utils/param_schema.py
+"""
+Constructor parameter schemas for pyod / pygod / darts models.
+
+Classes are introspected once with inspect.signature and the result is cached
+on disk per package version (CACHE_DIR/param_schema/<package>-<version>-v<format>.json).
+When a package is not installed the offline doc index (utils/doc_index.py)
+supplies the signature instead.
+"""
+
+import ast
+import importlib
+import importlib.metadata
+import inspect
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import Any, Optional
+
+from config.config import Config
+from utils.doc_index import doc_index
+
+# Bump when ParamSpec / range semantics change; older cache files are ignored
+SCHEMA_FORMAT_VERSION = 2
+
+# Ranges for common detector arguments: name -> (low, high, low_inclusive, high_inclusive, applies_to).
+# applies_to limits the check to "int" or "float" values (None = any number): pyod's max_features is
+# a fraction when a float but a feature count when an int, PCA's n_components a count or a variance ratio
+KNOWN_RANGES = {
+    "contamination": (0.0, 0.5, False, True, None),
+    "dropout_rate": (0.0, 1.0, True, False, None),
+    "dropout": (0.0, 1.0, True, False, None),
+    "max_features": (0.0, 1.0, False, True, "float"),
+    "validation_size": (0.0, 1.0, True, False, None),
+    "n_neighbors": (1, None, True, False, None),
+    "n_estimators": (1, None, True, False, None),
+    "n_clusters": (1, None, True, False, None),
+    "n_components": (1, None, True, False, "int"),
+    "epochs": (1, None, True, False, None),
+    "epoch": (1, None, True, False, None),
+    "epoch_num": (1, None, True, False, None),
+    "batch_size": (0, None, True, False, None),
+    "learning_rate": (0.0, None, False, False, None),
+    "lr": (0.0, None, False, False, None),
+}
+
+# Doc phrases like "contaminationfloat in (0., 0.5), optional"
+_DOC_RANGE_RE = re.compile(r"in\s*([\(\[])\s*([-\d.]+)\s*,\s*([-\d.]+)\s*([\)\]])")
+_ADDRESS_RE = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+@dataclass
+class ParamSpec:
+    name: str
+    default: Any = None
+    required: bool = False
+    type: str = ""
+    range: Optional[list] = None  # [low, high, low_inclusive, high_inclusive, applies_to]
+
+
+@dataclass
+class ParamSchema:
+    algorithm: str
+    package: str
+    qualified_name: str
+    params: dict = field(default_factory=dict)  # name -> ParamSpec
+    accepts_kwargs: bool = False
+    source: str = "introspection"  # introspection | doc_index
+
+    # ------------------------ Queries ------------------------
+    def defaults(self) -> dict:
+        """{name: default}; required args map to None (same shape as the doc params dict)."""
+        return {name: spec.default for name, spec in self.params.items()}
+
+    def required(self) -> list:
+        return [name for name, spec in self.params.items() if spec.required]
+
+    def filter(self, params: dict) -> dict:
+        """Drop arguments the constructor does not take (none when it accepts **kwargs)."""
+        if self.accepts_kwargs:
+            return dict(params or {})
+        return {k: v for k, v in (params or {}).items() if k in self.params}
+
+    @staticmethod
+    def _in_range(value, spec_range) -> bool:
+        low, high, low_inc, high_inc = spec_range[:4]
+        applies_to = spec_range[4] if len(spec_range) > 4 else None
+        if (applies_to == "int" and not isinstance(value, int)) or \
+                (applies_to == "float" and not isinstance(value, float)):
+            return True
+        too_low = low is not None and (value < low or (value == low and not low_inc))
+        too_high = high is not None and (value > high or (value == high and not high_inc))
+        return not (too_low or too_high)
+
+    def validate(self, params: dict):
+        """Return (valid params, list of problems) for a proposed parameter dict."""
+        valid, problems = {}, []
+        for name, value in (params or {}).items():
+            spec = self.params.get(name)
+            if spec is None:
+                if self.accepts_kwargs:  # passed through **kwargs (e.g. pygod backbone arguments)
+                    valid[name] = value
+                else:
+                    problems.append(f"{name}: not a parameter of {self.algorithm}")
+                continue
+            if spec.range and isinstance(value, (int, float)) and not isinstance(value, bool):
+                if not self._in_range(value, spec.range):
+                    low, high, low_inc, high_inc = spec.range[:4]
+                    lb, rb = "[" if low_inc else "(", "]" if high_inc else ")"
+                    problems.append(f"{name}={value!r}: outside {lb}{low}, {'inf' if high is None else high}{rb}")
+                    continue
+            valid[name] = value
+        return valid, problems
+
+    def hints(self) -> str:
+        """Short constructor summary for prompts."""
+        parts = []
+        for name, spec in self.params.items():
+            if spec.required:
+                parts.append(f"{name} (required{', ' + spec.type if spec.type else ''})")
+            else:
+                parts.append(f"{name}={spec.default!r}")
+        text = f"{self.qualified_name}({', '.join(parts)}{', **kwargs' if self.accepts_kwargs else ''})"
+        if self.required():
+            text += f"\nRequired constructor arguments: {', '.join(self.required())}"
+        return text
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ParamSchema":
+        params = {name: ParamSpec(**spec) for name, spec in data.get("params", {}).items()}
+        return cls(**{**data, "params": params})
+
+# -------------------------------------------------------------------
+# Building schemas
+# -------------------------------------------------------------------
+def _portable_default(value):
+    """Literal defaults stay as-is; objects become their source-like text (e.g. "LinearRegression()")."""
+    try:
+        ast.literal_eval(repr(value))
+        json.dumps(value)
+        return value
+    except (ValueError, SyntaxError, TypeError):
+        return _ADDRESS_RE.sub("", repr(value))
+
+
+def _range_for(name: str, doc_text: str = ""):
+    m = _DOC_RANGE_RE.search(doc_text or "")
+    if m:
+        # Fractional bounds ("in (0., 1.]") describe float values; "int or float" docs overload ints
+        applies_to = "float" if "." in m.group(2) + m.group(3) else None
+        try:
+            return [float(m.group(2)), float(m.group(3)), m.group(1) == "[", m.group(4) == "]", applies_to]
+        except ValueError:
+            pass
+    known = KNOWN_RANGES.get(name)
+    return list(known) if known else None
+
+
+def _candidate_paths(algorithm: str, package: str) -> list:
+    record = doc_index.lookup(algorithm, package)
+    paths = [record["qualified_name"]] if record else []
+    if package == "pyod":
+        paths.append(f"pyod.models.{algorithm.lower()}.{algorithm}")
+    elif package == "pygod":
+        paths.append(f"pygod.detector.{algorithm}")
+    elif package == "darts":
+        paths += [f"darts.models.{algorithm}", f"darts.models.forecasting.{algorithm.lower()}.{algorithm}"]
+    return list(dict.fromkeys(paths))
+
+
+def introspect(algorithm: str, package: str) -> Optional[ParamSchema]:
+    """Build a schema from the installed class, or None if it cannot be imported."""
+    record = doc_index.lookup(algorithm, package)
+    docs = record["parameters"] if record else {}
+    for path in _candidate_paths(algorithm, package):
+        module_name, _, class_name = path.rpartition(".")
+        try:
+            cls = getattr(importlib.import_module(module_name), class_name)
+            sig = inspect.signature(cls.__init__)
+        except Exception:
+            continue
+
+        params, accepts_kwargs = {}, False
+        for name, p in sig.parameters.items():
+            if name == "self" or p.kind == p.VAR_POSITIONAL:
+                continue
+            if p.kind == p.VAR_KEYWORD:
+                accepts_kwargs = True
+                continue
+            required = p.default is p.empty
+            default = None if required else _portable_default(p.default)
+            if p.annotation is not p.empty:
+                type_name = getattr(p.annotation, "__name__", str(p.annotation))
+            else:
+                type_name = "" if required or default is None else type(default).__name__
+            params[name] = ParamSpec(name, default, required, type_name, _range_for(name, docs.get(name, "")))
+        return ParamSchema(class_name, package, path, params, accepts_kwargs, "introspection")
+    return None
+
+
+def from_doc_index(algorithm: str, package: str) -> Optional[ParamSchema]:
+    record = doc_index.lookup(algorithm, package)
+    if not record:
+        return None
+    params = {}
+    for name, default in record["defaults"].items():
+        required = name in record["required"]
+        type_name = "" if required or default is None else type(default).__name__
+        params[name] = ParamSpec(name, default, required, type_name,
+                                 _range_for(name, record["parameters"].get(name, "")))
+    return ParamSchema(record["name"], record["package"], record["qualified_name"], params,
+                       "**kwargs" in record["signature"], "doc_index")
+
+# -------------------------------------------------------------------
+# Registry
+# -------------------------------------------------------------------
+def _package_version(package: str) -> Optional[str]:
+    try:
+        return importlib.metadata.version(package)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+class ParamSchemaRegistry:
+    """Lazily introspected, disk-cached parameter schemas keyed by package version."""
+
+    PACKAGES = ("pyod", "pygod", "darts")
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = cache_dir or Config.PARAM_SCHEMA_DIR
+        self._schemas = {}   # (package, lower name) -> ParamSchema | None
+        self._files = {}     # package -> {lower name: schema dict} loaded from disk
+        self._lock = threading.Lock()
+
+    def _cache_file(self, package: str, version: str) -> str:
+        return os.path.join(self.cache_dir, f"{package}-{version}-v{SCHEMA_FORMAT_VERSION}.json")
+
+    def _disk_entries(self, package: str, version: str) -> dict:
+        if package not in self._files:
+            entries = {}
+            path = self._cache_file(package, version)
+            if os.path.exists(path):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        entries = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    entries = {}
+            self._files[package] = entries
+        return self._files[package]
+
+    def _save(self, package: str, version: str) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_file(package, version)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._files[package], f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def get(self, algorithm: str, package: str) -> Optional[ParamSchema]:
+        """Schema for algorithm in package, or None if it is unknown (e.g. tslib scripts)."""
+        if not algorithm or package not in self.PACKAGES:
+            return None
+        key = (package, algorithm.lower())
+        with self._lock:
+            if key in self._schemas:
+                return self._schemas[key]
+
+            schema = None
+            version = _package_version(package)
+            if version:
+                entries = self._disk_entries(package, version)
+                if key[1] in entries:
+                    schema = ParamSchema.from_dict(entries[key[1]])
+                else:
+                    schema = introspect(algorithm, package)
+                    if schema:
+                        entries[key[1]] = asdict(schema)
+                        try:
+                            self._save(package, version)
+                        except OSError as e:
+                            print(f"[ParamSchema] Could not write cache: {e}")
+            if schema is None:
+                schema = from_doc_index(algorithm, package)
+            self._schemas[key] = schema
+            return schema
+
+
+param_registry = ParamSchemaRegistry()
@@ -0,0 +1,152 @@
+# utils/prompt_budget.py
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from utils.llm_usage import usage_tracker, current_run_id
+
+# Token budget for the algorithm_doc excerpt embedded in each stage's prompt
+STAGE_DOC_BUDGETS = {
+    "code_generator": 1200,
+    "optimizer": 800,
+    "default": 1000,
+}
+
+# How much each doc section matters to a stage (unknown sections score 0)
+SECTION_WEIGHTS = {
+    "code_generator": {"signature": 5, "parameters": 3, "attributes": 1, "intro": 1},
+    "optimizer": {"signature": 5, "parameters": 4, "intro": 1},
+    "default": {"signature": 5, "parameters": 3, "attributes": 1, "intro": 1},
+}
+
+_HEADING_RE = re.compile(
+    r"^\s*(?:#+\s*|\*\*)?\s*(initiali[sz]ation[^\n]*|parameters?[^\n]*|attributes?[^\n]*|methods?[^\n]*|"
+    r"returns?[^\n]*|examples?[^\n]*|references?[^\n]*|notes?[^\n]*)\s*(?:\*\*)?:?\s*$",
+    re.IGNORECASE,
+)
+_DICT_BLOCK_RE = re.compile(r"```python\s*\{.*?\}\s*```", re.DOTALL)
+# Method signature lines in API pages, e.g. "decision_function(X)[source]"
+_METHOD_RE = re.compile(r"^\s*\w+\(.*\)(?:\[source\])?\s*$")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text or "") // 4
+
+
+def _split_blocks(doc: str) -> list:
+    """Split a doc into paragraphs, keeping fenced code blocks whole."""
+    blocks, current, in_fence = [], [], False
+    for line in doc.splitlines():
+        if line.strip().startswith("```"):
+            in_fence = not in_fence
+        if not line.strip() and not in_fence:
+            if current:
+                blocks.append("\n".join(current))
+                current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def _section_of(heading: str) -> str:
+    h = heading.lower()
+    for name in ("parameters", "attributes", "methods", "returns", "examples", "references", "notes"):
+        if h.startswith(name[:-1]):
+            return name
+    return "parameters" if "parameter" in h else "intro"
+
+
+def _param_names(doc: str) -> set:
+    m = _DICT_BLOCK_RE.search(doc)
+    return set(re.findall(r"[\"'](\w+)[\"']\s*:", m.group(0))) if m else set()
+
+
+def compress_doc(doc: str, stage: str = "default", budget: int = None) -> str:
+    """
+    Keep the parts of algorithm_doc that matter to `stage` within its token budget.
+    The class signature and the ```python {...}``` parameter dict are always kept;
+    remaining paragraphs are ranked by section and parameter mentions, then
+    re-emitted in their original order.
+    """
+    if not doc:
+        return doc
+    budget = budget or STAGE_DOC_BUDGETS.get(stage, STAGE_DOC_BUDGETS["default"])
+    if estimate_tokens(doc) <= budget:
+        return doc
+
+    weights = SECTION_WEIGHTS.get(stage, SECTION_WEIGHTS["default"])
+    params = _param_names(doc)
+    section, in_method = "intro", False
+    scored = []
+    for idx, block in enumerate(_split_blocks(doc)):
+        first_line = block.splitlines()[0]
+        if re.match(r"^\s*class\s+[\w.]+\(", first_line):
+            section, in_method = "intro", False
+        elif _METHOD_RE.match(first_line):
+            # Parameters/Returns after a method signature describe that method, not __init__
+            section, in_method = "methods", True
+        elif _HEADING_RE.match(first_line):
+            section = _section_of(_HEADING_RE.match(first_line).group(1))
+            if in_method:
+                section = "methods"
+
+        if _DICT_BLOCK_RE.search(block):
+            score = float("inf")
+        elif re.match(r"^\s*class\s+[\w.]+\(", block):
+            score = weights.get("signature", 0) + 10
+        else:
+            mentioned = sum(1 for p in params if p in block)
+            score = weights.get(section, 0) + min(mentioned, 3)
+        if score > 0:
+            scored.append((score, idx, block))
+
+    kept, used = [], 0
+    for score, idx, block in sorted(scored, key=lambda t: (-t[0], t[1])):
+        cost = estimate_tokens(block) + 1
+        if used + cost > budget and score != float("inf"):
+            continue
+        kept.append((idx, block))
+        used += cost
+
+    return "\n\n".join(block for _, block in sorted(kept))
+
+
+class PromptBudget:
+    """
+    Per-algorithm cache of compressed docs plus accounting of tokens saved.
+    The same doc is re-embedded on every optimizer step and fix attempt, so
+    compression runs once per (algorithm, stage, doc) and is reused.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def doc_for(self, algorithm_doc: str, stage: str, algorithm: str = "") -> str:
+        if not algorithm_doc:
+            return algorithm_doc or ""
+        digest = hashlib.sha1(algorithm_doc.encode("utf-8")).hexdigest()
+        key = (algorithm, stage, digest)
+        with self._lock:
+            compressed = self._cache.get(key)
+            if compressed is not None:
+                self._cache.move_to_end(key)
+        if compressed is None:
+            compressed = compress_doc(algorithm_doc, stage)
+            with self._lock:
+                self._cache[key] = compressed
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+
+        saved = estimate_tokens(algorithm_doc) - estimate_tokens(compressed)
+        if saved > 0:
+            usage_tracker.record_savings(current_run_id(), stage, saved)
+        return compressed
+
+
+prompt_budget = PromptBudget()
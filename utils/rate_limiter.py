@@ -0,0 +1,109 @@
+# utils/rate_limiter.py
+
+import asyncio
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Continuous-refill token bucket for use on a single asyncio loop.
+    Waiters are served FIFO, so concurrent callers never wake up in lockstep.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.fill_rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # A single request larger than the whole budget just waits for a full bucket
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.fill_rate)
+
+    def adjust(self, amount: float) -> None:
+        """Debit (positive) or refund (negative) tokens after the fact; may go negative."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+    def drain(self) -> None:
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class RateLimiter:
+    """Shared requests-per-minute + tokens-per-minute admission control."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._stats_lock = threading.Lock()
+        self._stats = {"admitted": 0, "total_queue_delay": 0.0, "max_queue_delay": 0.0, "throttled": 0}
+        # Wall time during which at least one request was waiting for admission
+        self._waiting = 0
+        self._busy_since = 0.0
+        self._busy_total = 0.0
+
+    async def acquire(self, estimated_tokens: int) -> float:
+        """Wait for admission; returns the queueing delay in seconds."""
+        start = time.monotonic()
+        with self._stats_lock:
+            if not self._waiting:
+                self._busy_since = start
+            self._waiting += 1
+        try:
+            await self.requests.acquire(1)
+            await self.tokens.acquire(estimated_tokens)
+        finally:
+            with self._stats_lock:
+                self._waiting -= 1
+                if not self._waiting:
+                    self._busy_total += time.monotonic() - self._busy_since
+        waited = time.monotonic() - start
+        with self._stats_lock:
+            self._stats["admitted"] += 1
+            self._stats["total_queue_delay"] += waited
+            self._stats["max_queue_delay"] = max(self._stats["max_queue_delay"], waited)
+        return waited
+
+    def queued_seconds(self) -> float:
+        """Monotonic total of the time requests spent queued for admission (overlaps counted once)."""
+        with self._stats_lock:
+            return self._busy_total + (time.monotonic() - self._busy_since if self._waiting else 0.0)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token budget once the real usage is known."""
+        if actual_tokens:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    def throttled(self) -> None:
+        """Server reported quota exhaustion: make every caller wait for a refill."""
+        self.requests.drain()
+        with self._stats_lock:
+            self._stats["throttled"] += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["avg_queue_delay"] = stats["total_queue_delay"] / stats["admitted"] if stats["admitted"] else 0.0
+        return stats
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with equal jitter: half fixed, half random."""
+    delay = min(cap, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
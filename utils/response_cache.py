@@ -0,0 +1,146 @@
+# utils/response_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class ResponseCache:
+    """
+    Content-addressed cache for LLM responses.
+    A bounded in-memory LRU sits in front of an on-disk SQLite store with
+    TTL and size-based eviction. Safe to share between pipeline threads.
+    """
+
+    def __init__(self, path: str, max_memory_entries: int = 256,
+                 max_disk_bytes: int = 256 * 1024 * 1024, ttl_seconds: int = 7 * 24 * 3600):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._memory = OrderedDict()  # key -> (response, created_at)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "writes": 0, "evictions": 0}
+
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._conn.commit()
+
+    # ------------------------ Keys ------------------------
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float) -> str:
+        """Key on (model, sha256(prompt), temperature)."""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{model}:{prompt_hash}:{float(temperature):.3f}"
+
+    # ------------------------ Lookup ------------------------
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                response, created_at = entry
+                if now - created_at < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return response
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            response, created_at = row
+            if now - created_at >= self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._stats["misses"] += 1
+                self._stats["evictions"] += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._remember(key, response, created_at)
+            self._stats["hits"] += 1
+            self._stats["disk_hits"] += 1
+            return response
+
+    def put(self, key: str, response: str, model: str = "") -> None:
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._remember(key, response, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._stats["writes"] += 1
+            self._evict(now)
+            self._conn.commit()
+
+    # ------------------------ Maintenance ------------------------
+    def _remember(self, key: str, response: str, created_at: float) -> None:
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then least-recently-used rows until under the size cap."""
+        cur = self._conn.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl_seconds,))
+        self._stats["evictions"] += max(cur.rowcount, 0)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_disk_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
+            self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
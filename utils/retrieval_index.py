@@ -0,0 +1,278 @@
+# utils/retrieval_index.py
+"""
+Local BM25 retrieval over docs/*_models_page.txt, used as the vectorstore
+fallback in AgentInfoMiner.query_docs (no network, no embeddings).
+
+The index is stored as flat .npy arrays (per-term postings in CSR layout with
+precomputed BM25 weights) plus a text blob, and memory-mapped when loaded:
+
+    python -m utils.retrieval_index --build
+    python -m utils.retrieval_index --bench
+    python -m utils.retrieval_index --query "class pyod.models.iforest.IForest"
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+
+from config.config import Config
+
+DOCS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "docs")
+INDEX_VERSION = 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+_CLASS_RE = re.compile(r"^class\s+([\w.]+)\(", re.MULTILINE)
+_MODULE_RE = re.compile(r"^[\w.]+ module$", re.MULTILINE)
+
+
+def tokenize(text: str) -> list:
+    # Dotted paths ("pyod.models.iforest.IForest") become separate terms
+    return _TOKEN_RE.findall(text.lower().replace(".", " "))
+
+
+def chunk_page(path: str, max_chars: int = 1500) -> list:
+    """
+    Split a docs page into chunks of whole paragraphs, never crossing a class
+    or module boundary. Chunks inside a class are prefixed with its class path
+    so lookups by name hit them.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    # Class signatures (with the title line pages put right above them) and
+    # "pyod.models.x module" headers always start a new paragraph
+    text = re.sub(r"\n((?:[\w][\w\- ]*\n)?class\s+[\w.]+\(|[\w.]+ module\n)", r"\n\n\1", text)
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+    chunks, current, owner = [], [], ""
+
+    def flush():
+        if current:
+            in_class = owner and not owner.endswith(" module")
+            header = f"class {owner}\n" if in_class and not _CLASS_RE.search("\n\n".join(current[:3])) else ""
+            chunks.append({"text": header + "\n\n".join(current),
+                           "metadata": {"source": os.path.basename(path), "class": owner}})
+
+    for para in paragraphs:
+        head = "\n".join(para.splitlines()[:2])
+        m = _CLASS_RE.search(head)
+        module = _MODULE_RE.match(head)
+        if m and owner.endswith(" module"):
+            owner = m.group(1)  # the module title stays with its class
+        elif m or module:
+            flush()
+            current, owner = [], m.group(1) if m else module.group(0)
+        if current and sum(len(p) for p in current) + len(para) > max_chars:
+            flush()
+            current = []
+        current.append(para)
+    flush()
+    return chunks
+
+
+def _source_state(docs_dir: str) -> dict:
+    return {os.path.basename(p): os.path.getmtime(p)
+            for p in sorted(glob.glob(os.path.join(docs_dir, "*_models_page.txt")))}
+
+
+class RetrievalIndex:
+    """BM25 index with a langchain-style similarity_search(query, k)."""
+
+    FILES = ("term_ptr.npy", "post_docs.npy", "post_weights.npy", "idf.npy", "text_offsets.npy")
+
+    def __init__(self, index_dir: str = None, docs_dir: str = DOCS_DIR, k1: float = 1.5, b: float = 0.75):
+        self.index_dir = index_dir or Config.RETRIEVAL_INDEX_DIR
+        self.docs_dir = docs_dir
+        self.k1, self.b = k1, b
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # ------------------------ Build ------------------------
+    def build(self) -> dict:
+        start = time.perf_counter()
+        chunks = []
+        for path in sorted(glob.glob(os.path.join(self.docs_dir, "*_models_page.txt"))):
+            chunks.extend(chunk_page(path))
+
+        vocab, doc_terms = {}, []
+        for chunk in chunks:
+            counts = {}
+            for token in tokenize(chunk["text"]):
+                tid = vocab.setdefault(token, len(vocab))
+                counts[tid] = counts.get(tid, 0) + 1
+            doc_terms.append(counts)
+
+        n_docs = len(chunks)
+        doc_len = np.array([sum(c.values()) for c in doc_terms], dtype=np.float32)
+        avg_len = float(doc_len.mean()) if n_docs else 0.0
+
+        # Postings grouped by term (CSR): term t owns post_docs[term_ptr[t]:term_ptr[t + 1]]
+        postings = [[] for _ in range(len(vocab))]
+        for doc_id, counts in enumerate(doc_terms):
+            norm = self.k1 * (1 - self.b + self.b * doc_len[doc_id] / max(avg_len, 1e-9))
+            for tid, tf in counts.items():
+                postings[tid].append((doc_id, tf * (self.k1 + 1) / (tf + norm)))
+        term_ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        term_ptr[1:] = np.cumsum([len(p) for p in postings])
+        post_docs = np.array([d for p in postings for d, _ in p], dtype=np.int32)
+        post_weights = np.array([w for p in postings for _, w in p], dtype=np.float32)
+        df = np.diff(term_ptr).astype(np.float32)
+        idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        blob = "".join(c["text"] for c in chunks).encode("utf-8")
+        text_offsets = np.zeros(n_docs + 1, dtype=np.int64)
+        text_offsets[1:] = np.cumsum([len(c["text"].encode("utf-8")) for c in chunks])
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        for name, arr in zip(self.FILES, (term_ptr, post_docs, post_weights, idf, text_offsets)):
+            np.save(os.path.join(self.index_dir, name), arr)
+        with open(os.path.join(self.index_dir, "texts.bin"), "wb") as f:
+            f.write(blob)
+        with open(os.path.join(self.index_dir, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(vocab, f, separators=(",", ":"))
+        with open(os.path.join(self.index_dir, "chunks_meta.json"), "w", encoding="utf-8") as f:
+            json.dump([c["metadata"] for c in chunks], f, separators=(",", ":"))
+        build_seconds = time.perf_counter() - start
+        meta = {"version": INDEX_VERSION, "sources": _source_state(self.docs_dir), "chunks": n_docs,
+                "terms": len(vocab), "k1": self.k1, "b": self.b, "build_seconds": build_seconds}
+        # meta.json is written last: its presence marks a complete index
+        with open(os.path.join(self.index_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        self._loaded = False
+        print(f"[Retrieval] Built {n_docs} chunks / {len(vocab)} terms in {build_seconds:.2f}s -> {self.index_dir}")
+        return meta
+
+    # ------------------------ Load ------------------------
+    def _is_current(self) -> bool:
+        path = os.path.join(self.index_dir, "meta.json")
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        return (meta.get("version") == INDEX_VERSION and meta.get("sources") == _source_state(self.docs_dir)
+                and meta.get("k1") == self.k1 and meta.get("b") == self.b)
+
+    def load(self) -> "RetrievalIndex":
+        if self._loaded:
+            return self
+        with self._lock:
+            if self._loaded:
+                return self
+            if not self._is_current():
+                self.build()
+            arrays = [np.load(os.path.join(self.index_dir, name), mmap_mode="r") for name in self.FILES]
+            self._term_ptr, self._post_docs, self._post_weights, self._idf, self._text_offsets = arrays
+            self._texts = np.memmap(os.path.join(self.index_dir, "texts.bin"), dtype=np.uint8, mode="r") \
+                if self._text_offsets[-1] else np.zeros(0, dtype=np.uint8)
+            with open(os.path.join(self.index_dir, "vocab.json"), "r", encoding="utf-8") as f:
+                self._vocab = json.load(f)
+            with open(os.path.join(self.index_dir, "chunks_meta.json"), "r", encoding="utf-8") as f:
+                self._meta = json.load(f)
+            self._loaded = True
+        return self
+
+    # ------------------------ Query ------------------------
+    def _text(self, doc_id: int) -> str:
+        start, end = int(self._text_offsets[doc_id]), int(self._text_offsets[doc_id + 1])
+        return bytes(self._texts[start:end]).decode("utf-8")
+
+    def search(self, query: str, k: int = 4) -> list:
+        """[(doc_id, score)] best first."""
+        self.load()
+        scores = np.zeros(len(self._meta), dtype=np.float32)
+        for token in set(tokenize(query)):
+            tid = self._vocab.get(token)
+            if tid is None:
+                continue
+            lo, hi = int(self._term_ptr[tid]), int(self._term_ptr[tid + 1])
+            # A chunk appears at most once per term, so plain fancy-index addition is safe
+            scores[self._post_docs[lo:hi]] += self._idf[tid] * self._post_weights[lo:hi]
+        k = min(k, int(np.count_nonzero(scores)))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def similarity_search(self, query: str, k: int = 4) -> list:
+        return [Document(page_content=self._text(i), metadata={**self._meta[i], "score": score})
+                for i, score in self.search(query, k)]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_retrieval_index() -> RetrievalIndex:
+    """Process-wide index, loaded (and built if missing or stale) on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = RetrievalIndex().load()
+        return _index
+
+
+def load_vectorstore():
+    """The retrieval index for query_docs' similarity_search fallback, or None if it cannot be loaded."""
+    try:
+        return get_retrieval_index()
+    except Exception as e:
+        print(f"[Retrieval] Index unavailable: {e}")
+        return None
+
+
+def benchmark(index: RetrievalIndex, rounds: int = 5) -> dict:
+    from utils.doc_index import doc_index
+
+    t0 = time.perf_counter()
+    meta = index.build()
+    build_seconds = time.perf_counter() - t0
+
+    fresh = RetrievalIndex(index.index_dir, index.docs_dir, index.k1, index.b)
+    t0 = time.perf_counter()
+    fresh.load()
+    load_seconds = time.perf_counter() - t0
+
+    records = [doc_index.lookup(name) for name in doc_index.names()]
+    queries = [f"class {r['qualified_name']}" for r in records if r]
+    latencies, correct = [], 0
+    for _ in range(rounds):
+        for q, r in zip(queries, records):
+            t0 = time.perf_counter()
+            hits = fresh.search(q, k=3)
+            latencies.append(time.perf_counter() - t0)
+            correct += bool(hits) and fresh._meta[hits[0][0]]["class"] == r["qualified_name"]
+    lat = np.array(latencies) * 1000
+    result = {"chunks": meta["chunks"], "terms": meta["terms"], "build_s": round(build_seconds, 3),
+              "load_ms": round(load_seconds * 1000, 2), "queries": len(latencies),
+              "p50_ms": round(float(np.percentile(lat, 50)), 3), "p95_ms": round(float(np.percentile(lat, 95)), 3),
+              "top1_class_accuracy": round(correct / max(len(latencies), 1), 3)}
+    print(f"[Retrieval] Benchmark: {result}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build, query or benchmark the local BM25 doc index.")
+    parser.add_argument("--build", action="store_true")
+    parser.add_argument("--bench", action="store_true", help="Time build, load and queries for every known class")
+    parser.add_argument("--query", default=None)
+    parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.build:
+        RetrievalIndex().build()
+    if args.bench:
+        benchmark(RetrievalIndex())
+    if args.query:
+        for doc in get_retrieval_index().similarity_search(args.query, k=args.k):
+            print(f"--- {doc.metadata['class']} ({doc.metadata['score']:.2f})\n{doc.page_content[:300]}\n")
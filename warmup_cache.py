@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Fill the documentation cache and parameter schemas for every supported model,
+so the first run of each algorithm after a deploy does not wait on Gemini.
+
+    python warmup_cache.py                      # all packages, 4 at a time
+    python warmup_cache.py --packages pyod --concurrency 8
+    python warmup_cache.py --dry-run            # only list what would be warmed
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ad_model_selection.prompts.pygod_ms_prompt import PYGOD_MODEL_OPTIONS
+from ad_model_selection.prompts.pyod_ms_prompt import PYOD_MODEL_OPTIONS
+from ad_model_selection.prompts.timeseries_ms_prompt import TIMESERIES_MODEL_OPTIONS
+from agents.agent_info_miner import AgentInfoMiner, web_dict
+from utils.doc_index import doc_index
+from utils.doc_store import get_doc_store
+from utils.param_schema import param_registry
+
+PACKAGES = ("pyod", "pygod", "darts")
+NO_DOC = "No documentation found."
+
+
+def supported_models(packages=PACKAGES) -> list:
+    """(algorithm, package) pairs from the selection prompts, web_dict and the offline doc index."""
+    sources = {
+        "pyod": PYOD_MODEL_OPTIONS + doc_index.names("pyod"),
+        "pygod": PYGOD_MODEL_OPTIONS + doc_index.names("pygod"),
+        "darts": TIMESERIES_MODEL_OPTIONS + list(web_dict) + doc_index.names("darts"),
+    }
+    return [(name, package) for package in packages for name in dict.fromkeys(sources[package])]
+
+
+def warm_one(info_miner: AgentInfoMiner, algorithm: str, package: str, refresh: bool = False) -> dict:
+    start = time.perf_counter()
+    if doc_index.lookup(algorithm, package):
+        doc_source = "index"
+    elif not refresh and get_doc_store().get(algorithm, package) is not None:
+        doc_source = "cache"
+    else:
+        if refresh:
+            get_doc_store().delete(algorithm, package)
+        doc = info_miner.query_docs(algorithm, None, package)
+        doc_source = "llm" if doc and doc != NO_DOC else "missing"
+    doc_seconds = time.perf_counter() - start
+
+    schema = param_registry.get(algorithm, package)
+    return {
+        "algorithm": algorithm,
+        "package": package,
+        "doc": doc_source,
+        "schema": schema.source if schema else "missing",
+        "doc_seconds": doc_seconds,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def warm_up(packages=PACKAGES, concurrency: int = 4, refresh: bool = False) -> list:
+    models = supported_models(packages)
+    info_miner = AgentInfoMiner()
+    results = []
+    print(f"[Warmup] {len(models)} models, concurrency {concurrency}")
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(warm_one, info_miner, a, p, refresh): (a, p) for a, p in models}
+        for future in as_completed(futures):
+            algorithm, package = futures[future]
+            try:
+                r = future.result()
+            except Exception as e:
+                r = {"algorithm": algorithm, "package": package, "doc": "error", "schema": "missing",
+                     "doc_seconds": 0.0, "seconds": 0.0, "error": str(e)}
+            results.append(r)
+            print(f"[Warmup] {package:<6} {algorithm:<22} doc={r['doc']:<8} schema={r['schema']:<14} "
+                  f"{r['seconds']:.2f}s")
+    return results
+
+
+def report(results: list, wall_seconds: float) -> None:
+    print("\n=== Warm-up Summary ===")
+    for package in sorted({r["package"] for r in results}):
+        rows = [r for r in results if r["package"] == package]
+        docs = sum(r["doc"] in ("index", "cache", "llm") for r in rows)
+        schemas = sum(r["schema"] != "missing" for r in rows)
+        by_source = {}
+        for r in rows:
+            by_source[r["doc"]] = by_source.get(r["doc"], 0) + 1
+        sources = ", ".join(f"{k}={v}" for k, v in sorted(by_source.items()))
+        print(f"{package:<6} docs {docs}/{len(rows)} ({sources})  schemas {schemas}/{len(rows)}  "
+              f"doc time {sum(r['doc_seconds'] for r in rows):.1f}s")
+    missing = [f"{r['package']}:{r['algorithm']}" for r in results if r["doc"] in ("missing", "error")]
+    if missing:
+        print(f"Missing docs: {', '.join(sorted(missing))}")
+    print(f"Wall time: {wall_seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm the doc cache and parameter schemas for all supported models.")
+    parser.add_argument("--packages", nargs="+", choices=PACKAGES, default=list(PACKAGES))
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum docs fetched at the same time")
+    parser.add_argument("--refresh", action="store_true", help="Re-query docs that are already cached")
+    parser.add_argument("--dry-run", action="store_true", help="List the models without fetching anything")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        for algorithm, package in supported_models(args.packages):
+            print(f"{package:<6} {algorithm}")
+    else:
+        t0 = time.perf_counter()
+        results = warm_up(args.packages, args.concurrency, args.refresh)
+        report(results, time.perf_counter() - t0)